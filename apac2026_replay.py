@@ -4,7 +4,7 @@ Parser for the 2026 ICPC Asia Pacific Championship scoreboard.
 Reads the HTML from the livesite and converts it to the replay JSON format.
 
 Usage:
-    python apac2026_parser.py <input.html> <output.json>
+    python apac2026_parser.py <input.html> <output.json> [--minify]
 
 The input HTML can be obtained by:
     - Saving the page source of https://icpcapac.firebaseapp.com/standings/
@@ -12,9 +12,11 @@ The input HTML can be obtained by:
 """
 
 import sys
-import json
 import re
-from bs4 import BeautifulSoup
+from scoreboard_rows import iter_rows, text, classes, has_class, find, find_all
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+from replay_model import Contest, ParseError
 
 
 def hhmm_to_sec(time_str):
@@ -33,141 +35,167 @@ def hhmm_to_sec(time_str):
         return None
 
 
-def parse_apac_standings(html_content):
-    soup = BeautifulSoup(html_content, "html.parser")
+def is_legend_or_team(el):
+    return el.get("data-key") is not None or has_class(el, "team-row legend")
 
-    # --- Extract problem letters from the legend row ---
-    legend = soup.find("div", class_="team-row legend")
-    if not legend:
-        print("ERROR: Could not find legend row.", file=sys.stderr)
-        sys.exit(1)
 
-    problem_divs = legend.find("div", class_="team-problems")
+def parse_apac_problems(legend):
+    problem_divs = find(legend, "div", "team-problems")
     problems = []
-    for prob_col in problem_divs.find_all("div", class_="team-col team-problem"):
-        span = prob_col.find("span")
-        if span:
-            letter = span.get_text(strip=True)
+    for prob_col in find_all(problem_divs, "div", "team-col team-problem"):
+        span = find(prob_col, "span")
+        if span is not None:
+            letter = text(span)
             if letter:
                 problems.append(letter)
+    return problems
+
+
+def parse_apac_standings(html_content):
+    return collect_replay(*stream_apac_standings(html_content))
+
+
+def stream_apac_standings(html_content):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set from the legend row.
+    """
+    contest = Contest(
+        "APAC 2026",
+        duration=5 * 3600,   # 5-hour contest
+        freeze=4 * 3600,     # freeze at 4 hours (typical ICPC)
+    )
+    return contest, iter_apac_teams(html_content, contest)
+
 
-    print(f"Found {len(problems)} problems: {problems}", file=sys.stderr)
+def iter_apac_teams(html_content, contest):
+    if isinstance(html_content, str):
+        html_content = html_content.encode("utf-8")
+
+    problems = None
 
     # --- Extract team rows ---
-    # Team rows are inside standings-teams sections, each wrapped in a div[data-key]
-    teams = []
+    # Team rows are inside standings-teams sections, each wrapped in a div[data-key].
+    # The legend row comes first and gives the problem letters.
+
+    for wrapper in iter_rows(html_content, "div", is_legend_or_team):
+        if wrapper.get("data-key") is None:
+            if problems is None:
+                problems = parse_apac_problems(wrapper)
+                contest.set_problems(problems)
+            continue
 
-    team_wrappers = soup.find_all("div", attrs={"data-key": True})
-    for wrapper in team_wrappers:
-        team_row = wrapper.find("div", class_="team-row")
-        if not team_row:
+        if problems is None:
+            raise ParseError("Could not find legend row.")
+
+        team_row = find(wrapper, "div", "team-row")
+        if team_row is None:
             continue
 
         # Team name is inside div.team-col.team-name > a > span.team-generic-col-content > span[title]
-        name_col = team_row.find("div", class_="team-col team-name")
-        if not name_col:
+        name_col = find(team_row, "div", "team-col team-name")
+        if name_col is None:
             continue
-        team_name_span = name_col.find("span", title=True)
-        team_name = team_name_span["title"] if team_name_span else name_col.get_text(" ", strip=True)
+        team_name_span = find(name_col, "span", attr="title")
+        team_name = team_name_span.get("title") if team_name_span is not None else text(name_col, " ")
 
         # University name
-        univ_span = name_col.find("span", class_="university-name")
-        university = univ_span["title"] if univ_span and univ_span.has_attr("title") else team_name
+        univ_span = find(name_col, "span", "university-name")
+        university = univ_span.get("title") if univ_span is not None and univ_span.get("title") is not None else team_name
 
         # Problem cells
-        problems_div = team_row.find("div", class_="team-problems")
-        if not problems_div:
+        problems_div = find(team_row, "div", "team-problems")
+        if problems_div is None:
             continue
 
-        prob_cols = problems_div.find_all("div", class_="team-col team-problem")
+        prob_cols = find_all(problems_div, "div", "team-col team-problem")
 
-        submissions = {}
+        team = contest.add_team(team_name, university)
         for idx, pc in enumerate(prob_cols):
             if idx >= len(problems):
                 break
             prob_letter = problems[idx]
 
             # Determine status from background class
-            bg_div = pc.find("div", class_=lambda c: c and "team-colored-col-bg" in c)
-            if not bg_div:
+            bg_div = next((d for d in pc.iterdescendants("div")
+                           if any("team-colored-col-bg" in c for c in classes(d))), None)
+            if bg_div is None:
                 continue
 
-            classes = bg_div.get("class", [])
-            is_first = "bg-solved-first" in classes
-            is_solved = is_first or "bg-solved" in classes
+            bg_classes = classes(bg_div)
+            is_first = "bg-solved-first" in bg_classes
+            is_solved = is_first or "bg-solved" in bg_classes
 
             if not is_solved:
                 continue  # unattempted or only wrong submissions — skip
 
             # Extract time from the fg div
-            fg_div = pc.find("div", class_="team-colored-col-fg")
-            if not fg_div:
+            fg_div = find(pc, "div", "team-colored-col-fg")
+            if fg_div is None:
                 continue
 
-            fg_spans = fg_div.find_all("span", recursive=False)
+            fg_spans = find_all(fg_div, "span", recursive=False)
             if not fg_spans:
                 continue
 
             # The first span contains "H:MM\n" then possibly a <small>
-            time_text = fg_spans[0].get_text(separator="\n").split("\n")[0].strip()
+            time_text = "\n".join(fg_spans[0].itertext()).split("\n")[0].strip()
             time_sec = hhmm_to_sec(time_text)
             if time_sec is None:
                 continue
 
             # Extract penalty tries from the <small> tag, e.g. "(+3)"
             penalty = 0
-            small = fg_spans[0].find("small")
-            if small:
-                small_text = small.get_text(strip=True)
+            small = find(fg_spans[0], "small")
+            if small is not None:
+                small_text = text(small)
                 match = re.search(r'\(\+(\d+)\)', small_text)
                 if match:
                     penalty = int(match.group(1))
 
             tries = 1 + penalty  # 1 successful + N failed before
 
-            submissions[prob_letter] = {
-                "time": time_sec,
-                "tries": tries,
-                "first": is_first,
-            }
-
-        teams.append({
-            "name": team_name,
-            "university": university,
-            "submissions": submissions,
-        })
+            team.solve(prob_letter, time_sec, tries, is_first)
 
-    print(f"Parsed {len(teams)} teams.", file=sys.stderr)
+        yield team
 
-    result = {
-        "name": "APAC 2026",
-        "duration": 5 * 3600,   # 5-hour contest
-        "freeze": 4 * 3600,     # freeze at 4 hours (typical ICPC)
-        "problems": problems,
-        "teams": teams,
-    }
-    return result
+    if problems is None:
+        raise ParseError("Could not find legend row.")
 
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python apac2026_parser.py <input.html> <output.json>")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+
+    if len(args) != 2:
+        print("Usage: python apac2026_parser.py <input.html> <output.json> [--minify] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    input_path = sys.argv[1]
-    output_path = sys.argv[2]
+    input_path = args[0]
+    output_path = args[1]
 
     print(f"Reading {input_path} ...", file=sys.stderr)
-    with open(input_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
+    with stage(profile, "read"):
+        with open(input_path, "rb") as f:
+            html_content = f.read()
 
-    data = parse_apac_standings(html_content)
+    contest, teams = stream_apac_standings(html_content)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    try:
+        stream_replay(contest, teams, output_path, ensure_ascii=False, minify=minify, profile=profile)
+    except ParseError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
 
+    print(f"Parsed {len(contest)} teams, {len(contest.problems)} problems.", file=sys.stderr)
     print(f"Saved replay JSON to {output_path}", file=sys.stderr)
 
+    if profile is not None:
+        profile.finish()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,214 @@
+"""
+Converts many saved scoreboards to replay JSON in one go, in parallel.
+
+Usage:
+    python batch_replay.py <manifest.json> [-j JOBS] [--force] [--no-cache]
+                           [--side-files] [--archive FILE] [--profile]
+
+The manifest is a JSON list of jobs:
+
+    [
+      {"format": "nerc", "input": "pages/neerc2026.html",
+       "output": "src/assets/neerc2026.json", "name": "NERC 2026"},
+      {"format": "domjudge", "input": "pages/nac2025.html",
+       "output": "src/assets/nac2025.json", "name": "NAC 2025",
+       "duration": 18000, "freeze": 14400}
+    ]
+
+"format" is one of the names in replay_formats.FORMATS. "name", "duration"
+and "freeze" are optional and override what the parser reports. "minify":
+true writes the output without indentation. Relative paths are resolved
+against the manifest's directory.
+
+--side-files (or "side_files": true on a job) also writes the timeline,
+keyframes and resolver side files next to each output (see
+replay_output.py; they are offline-only for now).
+
+Jobs run on a process pool (one worker per core by default). A failing job
+is reported and does not stop the others. An output that is newer than its
+input, the manifest, the parser module and every local module it imports
+(the ones the parse cache key covers) is considered up to date and skipped,
+so an interrupted batch can simply be started again.
+
+Parse results are cached by page content and parser source (see
+parse_cache.py), so rebuilding after a metadata-only change does not parse
+anything. --no-cache bypasses the cache.
+
+--archive also loads every output into that SQLite archive (see
+replay_archive.py); outputs whose bytes did not change are skipped there too.
+
+--profile adds each job's stage timings (read, cache, parse, write and any
+side files; see replay_profile.py) to its line, and the totals at the end.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import replay_formats
+from parse_cache import ParseCache, local_modules
+from replay_output import save_replay, side_paths
+from replay_profile import Profile, format_stages
+
+
+def load_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    for job in jobs:
+        for key in ("format", "input", "output"):
+            if key not in job:
+                raise ValueError(f"Manifest entry {job!r} is missing {key!r}")
+        job["input"] = os.path.join(base, job["input"])
+        job["output"] = os.path.join(base, job["output"])
+
+    return jobs
+
+
+def is_up_to_date(job, manifest_path):
+    """
+    Whether the job's outputs (its side files too, when it writes them)
+    are all newer than the input, the manifest and the parser's modules.
+    A missing output or dependency counts as stale.
+    """
+    outputs = [job["output"]]
+    if job.get("side_files"):
+        outputs += side_paths(job["output"])
+    module_name = replay_formats.FORMATS[job["format"]][0]
+    deps = [job["input"], manifest_path, *local_modules(module_name).values()]
+    try:
+        out_mtime = min(os.path.getmtime(path) for path in outputs)
+        return all(out_mtime >= os.path.getmtime(d) for d in deps)
+    except OSError:
+        return False
+
+
+def run_job(job, use_cache=True, profile=False):
+    """
+    Worker entry point. Returns (status, seconds, message, stats), where
+    stats is the job's Profile.as_dict() with profile=True, else None.
+    """
+    start = time.perf_counter()
+    cache = ParseCache() if use_cache else None
+    prof = Profile().start() if profile else None
+    try:
+        # The parsers print progress; keep the batch report readable
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            data = replay_formats.convert(job["format"], job["input"], job, cache, prof)
+        # save_replay writes atomically, so an interrupted job never leaves a
+        # half-written output that looks up to date
+        save_replay(data, job["output"], ensure_ascii=False, minify=job.get("minify", False),
+                    side_files=job.get("side_files", False), profile=prof)
+    except (Exception, SystemExit) as e:
+        return "FAIL", time.perf_counter() - start, f"{type(e).__name__}: {e}", None
+
+    message = f"{len(data['teams'])} teams, {len(data['problems'])} problems"
+    if cache and cache.stats["hits"]:
+        message += " (cached)"
+    return "ok", time.perf_counter() - start, message, prof and prof.stop().as_dict()
+
+
+def run_batch(manifest_path, jobs_count=None, force=False, use_cache=True, profile=False,
+              side_files=False):
+    jobs = load_manifest(manifest_path)
+    manifest_path = os.path.abspath(manifest_path)
+    for job in jobs:
+        job.setdefault("side_files", side_files)
+
+    pending = []
+    results = []
+    for job in jobs:
+        if job["format"] not in replay_formats.FORMATS:
+            results.append((job, "FAIL", 0.0, f"unknown format {job['format']!r}"))
+        elif not force and is_up_to_date(job, manifest_path):
+            results.append((job, "skip", 0.0, "up to date"))
+        else:
+            pending.append(job)
+
+    for job, status, seconds, message in results:
+        print(f"[{status:>4}] {job['output']}: {message}")
+
+    totals = {"stages": {}, "counts": {}}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs_count) as pool:
+        futures = {pool.submit(run_job, job, use_cache, profile): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                status, seconds, message, stats = future.result()
+            except Exception as e:
+                # Worker process died (e.g. killed); report and move on
+                status, seconds, message, stats = "FAIL", 0.0, f"{type(e).__name__}: {e}", None
+            results.append((job, status, seconds, message))
+            print(f"[{status:>4}] {job['output']} ({seconds:.2f}s): {message}")
+            if stats:
+                print(f"       {format_stages(stats)}")
+                for key in ("stages", "counts"):
+                    for name, value in stats[key].items():
+                        totals[key][name] = totals[key].get(name, 0) + value
+
+    elapsed = time.perf_counter() - start
+    counts = {s: sum(1 for r in results if r[1] == s) for s in ("ok", "skip", "FAIL")}
+    cached = sum(1 for r in results if r[1] == "ok" and r[3].endswith("(cached)"))
+    print(f"Converted {counts['ok']} ({cached} from the parse cache), skipped {counts['skip']}, "
+          f"failed {counts['FAIL']} in {elapsed:.2f}s")
+    if profile and totals["stages"]:
+        print(f"Stage totals across workers: {format_stages(totals)}")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+
+    use_cache = "--no-cache" not in args
+    if not use_cache:
+        args.remove("--no-cache")
+
+    archive = None
+    if "--archive" in args:
+        i = args.index("--archive")
+        archive = args[i + 1]
+        del args[i:i + 2]
+
+    profile = "--profile" in args
+    if profile:
+        args.remove("--profile")
+
+    side_files = "--side-files" in args
+    if side_files:
+        args.remove("--side-files")
+
+    jobs_count = None
+    if "-j" in args:
+        i = args.index("-j")
+        jobs_count = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) != 1:
+        print("Usage: python batch_replay.py <manifest.json> [-j JOBS] [--force] [--no-cache] "
+              "[--side-files] [--archive FILE] [--profile]")
+        sys.exit(1)
+
+    results = run_batch(args[0], jobs_count, force, use_cache, profile, side_files)
+
+    if archive:
+        import replay_archive
+
+        conn = replay_archive.connect(archive)
+        ingested = 0
+        for job, status, _, _ in results:
+            if status != "FAIL" and os.path.exists(job["output"]):
+                ingested += replay_archive.ingest_file(conn, job["output"])
+        print(f"Archived {ingested} changed contests in {archive}")
+
+    if any(status == "FAIL" for _, status, _, _ in results):
+        sys.exit(1)
@@ -0,0 +1,138 @@
+"""
+Compares converting a scoreboard from Contest API JSON (contest_api.py)
+with scraping the DOMjudge HTML page (domjudge_replay.py).
+
+For each team count it generates one synthetic contest (gen_scoreboard.py),
+serves it both as an HTML page and as a mock Contest API on localhost
+(snapshot_server.py), and times, best of --repeat runs:
+
+    html_parse    parsing the page bytes
+    api_parse     decoding the endpoint bodies and joining them
+    html_total    one GET of the page plus the parse
+    api_total     the five endpoint GETs (concurrent, pooled) plus the parse
+
+The API result is also checked against the expected replay, which has the
+real university names the HTML path cannot recover.
+
+Usage:
+    python bench_api.py [100,1000,5000] [--problems N] [--repeat N]
+
+Everything runs offline.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+import contest_api
+import gen_scoreboard
+import replay_formats
+import snapshot_server
+from crawler import Crawler
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def parse_html(body):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return replay_formats.convert("domjudge", body)
+
+
+def bench(teams, problems, repeat, workdir):
+    contest = gen_scoreboard.synthetic_contest(teams, problems)
+    page, _ = gen_scoreboard.generate("domjudge", contest)
+    page = page.encode("utf-8")
+    # snapshot_server serves every file in the directory, so the page goes alone
+    page_dir = os.path.join(workdir, f"{teams}", "page")
+    os.makedirs(page_dir)
+    with open(os.path.join(page_dir, "scoreboard.html"), "wb") as f:
+        f.write(page)
+    api_dir = os.path.join(workdir, f"{teams}")
+    gen_scoreboard.write_contest_api(contest, api_dir)
+    with open(os.path.join(api_dir, "api", "synthetic.expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+
+    html_server = snapshot_server.serve(page_dir, port=0)
+    api_server = snapshot_server.serve_api(api_dir, port=0)
+    page_url = f"http://127.0.0.1:{html_server.server_address[1]}/"
+    api_url = f"http://127.0.0.1:{api_server.server_address[1]}/api/v4"
+
+    try:
+        files = gen_scoreboard.contest_api_files(contest)
+        bodies = {name: json.dumps(files[path]).encode()
+                  for name, path in contest_api.endpoint_urls("api/v4", "synthetic").items()}
+
+        html_parse, _ = best_of(repeat, lambda: parse_html(page))
+        api_parse, _ = best_of(repeat, lambda: contest_api.parse_contest_api(
+            {name: json.loads(body) for name, body in bodies.items()}))
+
+        session = requests.Session()
+        html_total, _ = best_of(repeat, lambda: parse_html(session.get(page_url, timeout=30).content))
+
+        crawler = Crawler(cache_dir=None, workers=len(contest_api.ENDPOINTS), rate=0)
+        api_total, data = best_of(repeat, lambda: contest_api.parse_contest_api(
+            contest_api.fetch_contest_api(api_url, "synthetic", crawler)))
+    finally:
+        html_server.shutdown()
+        api_server.shutdown()
+
+    return {
+        "teams": teams,
+        "html_kb": len(page) // 1024,
+        "api_kb": sum(len(b) for b in bodies.values()) // 1024,
+        "html_parse_s": html_parse,
+        "api_parse_s": api_parse,
+        "html_total_s": html_total,
+        "api_total_s": api_total,
+        "roundtrip": data == expected,
+    }
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    problems = 12
+    if "--problems" in args:
+        i = args.index("--problems")
+        problems = int(args[i + 1])
+        del args[i:i + 2]
+
+    repeat = 3
+    if "--repeat" in args:
+        i = args.index("--repeat")
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) > 1:
+        print("Usage: python bench_api.py [100,1000,5000] [--problems N] [--repeat N]")
+        sys.exit(1)
+
+    sizes = [int(n) for n in (args[0] if args else "100,1000,5000").split(",")]
+
+    print(f"{'teams':>6} {'html KB':>8} {'api KB':>7} {'html parse':>11} {'api parse':>10} "
+          f"{'html total':>11} {'api total':>10} {'speedup':>8}  roundtrip")
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        for teams in sizes:
+            r = bench(teams, problems, repeat, workdir)
+            failed = failed or not r["roundtrip"]
+            print(f"{r['teams']:>6} {r['html_kb']:>8} {r['api_kb']:>7} "
+                  f"{r['html_parse_s'] * 1000:>9.1f}ms {r['api_parse_s'] * 1000:>8.1f}ms "
+                  f"{r['html_total_s'] * 1000:>9.1f}ms {r['api_total_s'] * 1000:>8.1f}ms "
+                  f"{r['html_total_s'] / r['api_total_s']:>7.1f}x  {'ok' if r['roundtrip'] else 'MISMATCH'}")
+
+    sys.exit(1 if failed else 0)
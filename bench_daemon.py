@@ -0,0 +1,99 @@
+"""
+Per-job latency of replay_daemon.py against a cold invocation.
+
+For synthetic pages of a few sizes (gen_scoreboard.py, one format), times:
+
+    cold      python replay_daemon.py convert --local ...: a fresh
+              interpreter that imports the parser and converts in-process,
+              what running a *_replay.py script costs
+    client    python replay_daemon.py convert ...: a fresh interpreter
+              that only sends the job to a warm daemon
+    socket    convert() called in this process: the daemon's own latency
+
+Each is the median of --repeat runs, writing the replay.
+The daemon is started on a temporary socket and stopped at the end.
+
+Usage:
+    python bench_daemon.py [--format FMT] [--teams 50,500,5000] [--repeat N]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import gen_scoreboard
+import replay_daemon
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DAEMON = os.path.join(HERE, "replay_daemon.py")
+
+
+def median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_cli(*args):
+    subprocess.run([sys.executable, DAEMON, "convert", *args], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for(socket_path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while replay_daemon.ping(socket_path) is None:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"daemon did not start on {socket_path}")
+        time.sleep(0.05)
+
+
+def pop_option(args, name, default):
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = args[i + 1]
+    del args[i:i + 2]
+    return value
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fmt = pop_option(args, "--format", "nerc")
+    sizes = [int(n) for n in pop_option(args, "--teams", "50,500,5000").split(",")]
+    repeat = int(pop_option(args, "--repeat", 5))
+
+    if args or fmt not in gen_scoreboard.GENERATORS:
+        print("Usage: python bench_daemon.py [--format FMT] [--teams 50,500,5000] [--repeat N]")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "daemon.sock")
+        daemon = subprocess.Popen([sys.executable, DAEMON, "serve", "--socket", socket_path],
+                                  stderr=subprocess.DEVNULL)
+        try:
+            wait_for(socket_path)
+            print(f"{'format':<10}{'teams':>7}{'cold':>10}{'client':>10}{'socket':>10}"
+                  f"{'saved/job':>12}")
+            for teams in sizes:
+                contest = gen_scoreboard.synthetic_contest(teams, 13)
+                gen_scoreboard.write_format(fmt, contest, tmp)
+                page = os.path.join(tmp, fmt, f"{teams}x13.html")
+                out = os.path.join(tmp, "out.json")
+
+                cold = median_time(lambda: run_cli(fmt, page, out, "--local"), repeat)
+                client = median_time(
+                    lambda: run_cli(fmt, page, out, "--socket", socket_path), repeat)
+                direct = median_time(
+                    lambda: replay_daemon.convert(fmt, page, out, path=socket_path), repeat)
+
+                print(f"{fmt:<10}{teams:>7}{cold * 1000:>8.0f}ms{client * 1000:>8.0f}ms"
+                      f"{direct * 1000:>8.0f}ms{(cold - client) * 1000:>10.0f}ms")
+        finally:
+            replay_daemon.request({"op": "stop"}, path=socket_path)
+            daemon.wait(timeout=10)
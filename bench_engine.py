@@ -0,0 +1,78 @@
+"""
+Compares ReplayEngine against re-sorting every team after each event (what
+App.jsx's computeTeams does) on a synthetic contest.
+
+Usage:
+    python bench_engine.py [teams] [problems]
+
+Re-sorting is only timed on the first few hundred events and extrapolated;
+doing all of them would take minutes at 10k teams.
+"""
+
+import random
+import sys
+import time
+
+from replay_engine import ReplayEngine
+from replay_model import PENALTY_PER_TRY
+from replay_timeline import build_timeline
+
+RESORT_SAMPLE = 300
+
+
+def synthetic_contest(teams, problems, seed=0, duration=5 * 3600):
+    rng = random.Random(seed)
+    letters = [chr(ord("A") + i) for i in range(problems)]
+    data = {"name": "Synthetic", "duration": duration, "freeze": duration - 3600,
+            "problems": letters, "teams": []}
+
+    for i in range(teams):
+        strength = rng.random()
+        submissions = {}
+        for p in letters:
+            if rng.random() < strength:
+                submissions[p] = {"time": rng.randrange(60, duration), "tries": 1 + int(rng.expovariate(1.5))}
+        data["teams"].append({"name": f"Team {i:05d}", "university": f"University {i % 500}",
+                              "submissions": submissions})
+    return data
+
+
+def resort_per_event(data, events):
+    names = [t["name"] for t in data["teams"]]
+    solved = [0] * len(names)
+    penalty = [0] * len(names)
+    for team, _, t, tries, _ in events:
+        solved[team] += 1
+        penalty[team] += t + (tries - 1) * PENALTY_PER_TRY
+        order = sorted(range(len(names)), key=lambda i: (-solved[i], penalty[i], names[i]))
+        rank = order.index(team) + 1
+    return rank
+
+
+def engine_per_event(data, events):
+    engine = ReplayEngine(data)
+    for event in events:
+        engine.apply(event)
+        engine.top(10)
+    return engine
+
+
+if __name__ == "__main__":
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    problems = int(sys.argv[2]) if len(sys.argv) > 2 else 13
+
+    data = synthetic_contest(teams, problems)
+    events = build_timeline(data)["events"]
+    print(f"{teams} teams, {problems} problems, {len(events)} events")
+
+    start = time.perf_counter()
+    resort_per_event(data, events[:RESORT_SAMPLE])
+    resort = (time.perf_counter() - start) / RESORT_SAMPLE
+
+    start = time.perf_counter()
+    engine_per_event(data, events)
+    engine = (time.perf_counter() - start) / len(events)
+
+    print(f"re-sort per event: {resort * 1e6:10.1f} us  (~{resort * len(events):.1f}s for the contest)")
+    print(f"ReplayEngine:      {engine * 1e6:10.1f} us  ({engine * len(events):.2f}s for the contest)")
+    print(f"speedup: {resort / engine:.0f}x")
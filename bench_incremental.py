@@ -0,0 +1,111 @@
+"""
+Incremental reparse (replay_incremental.py) against a full parse of the next
+snapshot, on synthetic scoreboards (gen_scoreboard.py).
+
+For each supported format a contest is rendered, then changed and rendered
+again:
+
+    tries   CHANGED teams get a new wrong try on an unattempted problem;
+            no standings move, so exactly CHANGED rows differ
+    solve   one team near the bottom solves a problem late and climbs,
+            changing the rank cell of every row it passes
+
+Reported per scenario: the full parse of the second page, the incremental
+reparse after the first, the rows it parsed, and what parsing that many
+rows costs at the full parse's per-row rate. Every incremental result is
+checked against the full parse.
+
+Usage:
+    python bench_incremental.py [--teams N] [--changed N] [--repeat N]
+"""
+
+import copy
+import sys
+import time
+
+import gen_scoreboard
+from replay_incremental import PARSERS, IncrementalParser
+
+PROBLEMS = 13
+
+
+def add_tries(contest, count):
+    changed = copy.deepcopy(contest)
+    step = max(1, len(changed["teams"]) // count)
+    for t in changed["teams"][::step][:count]:
+        j = next((j for j, c in enumerate(t["cells"]) if c is None), None)
+        if j is None:
+            j = next(j for j, c in enumerate(t["cells"]) if c["time"] is None)
+            t["cells"][j]["tries"] += 1
+        else:
+            t["cells"][j] = {"tries": 1, "time": None, "first": False}
+    return changed
+
+
+def late_solve(contest):
+    changed = copy.deepcopy(contest)
+    t = changed["teams"][len(changed["teams"]) * 9 // 10]
+    j = next(j for j, c in enumerate(t["cells"]) if c is None or c["time"] is None)
+    t["cells"][j] = {"tries": 1, "time": changed["duration"] - 60, "first": False}
+    gen_scoreboard.rank_teams(changed["teams"])
+    return changed
+
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench(fmt, before, after, repeat):
+    full_parser = IncrementalParser(fmt)
+    full = best_time(lambda: full_parser.full_parse(after, full_parser.split(after)), repeat)
+    expected = full_parser.contest.to_dict()
+
+    times = []
+    for _ in range(repeat):
+        parser = IncrementalParser(fmt)
+        parser.parse(before)
+        start = time.perf_counter()
+        contest = parser.parse(after)
+        times.append(time.perf_counter() - start)
+    ok = contest.to_dict() == expected and parser.stats["incremental"] == 1
+
+    rows = parser.stats["rows_parsed"] - len(contest)
+    per_row = full / len(contest)
+    return full, min(times), rows, rows * per_row, ok
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--teams": 400, "--changed": 5, "--repeat": 5}
+    for name in options:
+        if name in args:
+            i = args.index(name)
+            options[name] = int(args[i + 1])
+            del args[i:i + 2]
+
+    if args:
+        print("Usage: python bench_incremental.py [--teams N] [--changed N] [--repeat N]")
+        sys.exit(1)
+
+    contest = gen_scoreboard.synthetic_contest(options["--teams"], PROBLEMS)
+    scenarios = {"tries": add_tries(contest, options["--changed"]), "solve": late_solve(contest)}
+
+    print(f"{'format':<10}{'change':<8}{'full':>10}{'incremental':>13}{'rows':>6}"
+          f"{'rows at full rate':>19}")
+    all_ok = True
+    for fmt in PARSERS:
+        render = gen_scoreboard.GENERATORS[fmt][0]
+        before = render(contest).encode("utf-8")
+        for label, changed in scenarios.items():
+            full, incremental, rows, rows_cost, ok = bench(
+                fmt, before, render(changed).encode("utf-8"), options["--repeat"])
+            all_ok = all_ok and ok
+            print(f"{fmt:<10}{label:<8}{full * 1000:>8.1f}ms{incremental * 1000:>11.2f}ms{rows:>6}"
+                  f"{rows_cost * 1000:>17.2f}ms  {'matches' if ok else 'MISMATCH'}")
+    sys.exit(0 if all_ok else 1)
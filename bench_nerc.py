@@ -0,0 +1,124 @@
+"""
+The NEERC scanner (neerc_replay.scan_nerc, through parse_nerc_fast) against
+the lxml reference parser (parse_nerc_html).
+
+Inputs are PCMS standings pages:
+
+    real        src/assets/neerc2025.json and neerc2026.json rendered back
+                into PCMS markup (gen_scoreboard.nerc_cell), with the real
+                team names, times, tries and first solves
+    synthetic   gen_scoreboard.py contests of --teams sizes
+
+Each page is written to a temporary file. The reference reads and parses
+it; the scanner mmaps and scans it. Every result is compared with the
+reference's, and a copy of each page with one malformed cell checks that
+the scanner falls back to the reference.
+
+Usage:
+    python bench_nerc.py [--teams 1000,10000] [--repeat N]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import gen_scoreboard
+from neerc_replay import parse_nerc_fast, parse_nerc_html
+
+REAL = [os.path.join("src", "assets", f"neerc{year}.json") for year in (2025, 2026)]
+
+
+def render_replay(data):
+    """A PCMS standings page for a replay dict."""
+    rows = []
+    for rank, team in enumerate(data["teams"], 1):
+        cells, solved, penalty = [], 0, 0
+        for p in data["problems"]:
+            info = team["submissions"].get(p)
+            if info:
+                solved += 1
+                penalty += info["time"] // 60 + 20 * (info["tries"] - 1)
+                info = {"time": info["time"], "tries": info["tries"], "first": info.get("first", False)}
+            cells.append(gen_scoreboard.nerc_cell(info))
+        rows.append(f'<tr class="row{(rank // 2) % 2}{rank % 2}"><td class="rankl">{rank}</td>'
+                    f'<td class="party">{gen_scoreboard.esc(team["name"])}</td>' + "".join(cells)
+                    + f'<td>{solved}</td><td class="penalty">{penalty}</td><td class="rank"></td></tr>')
+    head = "".join(f"<th>{p}</th>" for p in data["problems"])
+    return gen_scoreboard.page(f'<table class="standings">\n<tr class="header"><th>Rank</th>'
+                               f'<th>Party</th>{head}<th>=</th><th>Time</th><th></th></tr>\n'
+                               + "\n".join(rows) + "\n</table>")
+
+
+def best_time(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def read_and_parse(path):
+    with open(path, "rb") as f:
+        return parse_nerc_html(f.read())
+
+
+def bench(label, page, tmp, repeat):
+    path = os.path.join(tmp, "standings.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+
+    reference_s, expected = best_time(lambda: read_and_parse(path), repeat)
+    scanner_s, result = best_time(lambda: parse_nerc_fast(path), repeat)
+
+    # One solved cell in an unexpected shape has to send the page to lxml
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page.replace("<s><br>", "<s><u></u><br>", 1))
+    log = io.StringIO()
+    with contextlib.redirect_stderr(log):
+        fallback_ok = parse_nerc_fast(path) == read_and_parse(path)
+    fallback_ok = fallback_ok and "using the lxml parser" in log.getvalue()
+
+    ok = result == expected and fallback_ok
+    print(f"{label:<14}{len(expected['teams']):>7}{len(page) // 1024:>8} KB"
+          f"{reference_s * 1000:>10.1f}ms{scanner_s * 1000:>10.1f}ms{reference_s / scanner_s:>7.1f}x"
+          f"  {'matches' if result == expected else 'MISMATCH'}"
+          f", fallback {'ok' if fallback_ok else 'FAILED'}")
+    return ok
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sizes = "1000,10000"
+    repeat = 5
+    if "--teams" in args:
+        i = args.index("--teams")
+        sizes = args[i + 1]
+        del args[i:i + 2]
+    if "--repeat" in args:
+        i = args.index("--repeat")
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+    if args:
+        print("Usage: python bench_nerc.py [--teams 1000,10000] [--repeat N]")
+        sys.exit(1)
+
+    pages = []
+    for path in REAL:
+        with open(path, encoding="utf-8") as f:
+            pages.append((os.path.basename(path)[:-5], render_replay(json.load(f))))
+    for teams in (int(n) for n in sizes.split(",")):
+        contest = gen_scoreboard.synthetic_contest(teams, 13)
+        pages.append(("synthetic", gen_scoreboard.render_nerc(contest)))
+
+    print(f"{'page':<14}{'teams':>7}{'size':>11}{'lxml':>12}{'scanner':>12}{'speedup':>8}")
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, page in pages:
+            all_ok = bench(label, page, tmp, repeat) and all_ok
+    sys.exit(0 if all_ok else 1)
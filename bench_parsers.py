@@ -0,0 +1,205 @@
+"""
+Benchmark suite for every parser, with regression tracking.
+
+Inputs are saved scoreboard pages laid out as <inputs>/<format>/<name>.html,
+where <format> is a name from replay_formats.FORMATS. Put pages of several
+sizes in each directory to see how a parser scales, or let --generate write
+synthetic ones (gen_scoreboard.py) for a list of team counts. For every
+input it records:
+
+    rows            teams parsed
+    read_s          reading the file
+    parse_s         the parse function (best of --repeat runs)
+    serialize_s     json.dumps of the result, as save_replay does
+    rows_per_s      rows / parse_s
+    peak_kb         peak Python heap during the parse (tracemalloc, separate
+                    run so it does not skew the timings; lxml's own C
+                    allocations are not included)
+    roundtrip       whether the result matches <name>.expected.json, when
+                    that file exists (generated inputs always have one)
+
+Usage:
+    python bench_parsers.py [inputs_dir] [--save] [--baseline FILE]
+                            [--threshold PCT] [--repeat N]
+                            [--generate 100,1000,5000 [--problems N]]
+
+With --save the results become the new baseline. Otherwise they are
+compared with the baseline and the exit status is 1 if any input got slower
+(rows/s) or bigger (peak memory) by more than the threshold (default 25%),
+or if any round-trip check fails. Everything runs offline.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import replay_formats
+
+DEFAULT_INPUTS = "bench_inputs"
+DEFAULT_BASELINE = "bench_baseline.json"
+
+
+def find_inputs(inputs_dir):
+    inputs = []
+    for fmt in sorted(os.listdir(inputs_dir)):
+        fmt_dir = os.path.join(inputs_dir, fmt)
+        if fmt not in replay_formats.FORMATS or not os.path.isdir(fmt_dir):
+            continue
+        names = [n for n in os.listdir(fmt_dir) if n.endswith(".html")]
+        names.sort(key=lambda n: os.path.getsize(os.path.join(fmt_dir, n)))
+        for name in names:
+            inputs.append((fmt, os.path.join(fmt_dir, name)))
+    return inputs
+
+
+def parse_quietly(fmt, body):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return replay_formats.convert(fmt, body)
+
+
+def bench_input(fmt, path, repeat=3):
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        body = f.read()
+    read_s = time.perf_counter() - start
+
+    # Import the parser up front so it is not part of the first timing
+    replay_formats.parser_module(fmt)
+
+    parse_s = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = parse_quietly(fmt, body)
+        elapsed = time.perf_counter() - start
+        parse_s = elapsed if parse_s is None else min(parse_s, elapsed)
+
+    start = time.perf_counter()
+    json.dumps(data, indent=2)
+    serialize_s = time.perf_counter() - start
+
+    tracemalloc.start()
+    parse_quietly(fmt, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    expected_path = path[:-len(".html")] + ".expected.json"
+    roundtrip = None
+    if os.path.exists(expected_path):
+        with open(expected_path, encoding="utf-8") as f:
+            roundtrip = data == json.load(f)
+
+    rows = len(data["teams"])
+    return {
+        "format": fmt,
+        "input": os.path.basename(path),
+        "bytes": len(body),
+        "rows": rows,
+        "read_s": read_s,
+        "parse_s": parse_s,
+        "serialize_s": serialize_s,
+        "rows_per_s": rows / parse_s if parse_s else 0.0,
+        "peak_kb": peak / 1024,
+        "roundtrip": roundtrip,
+    }
+
+
+def run_suite(inputs, repeat=3):
+    results = {}
+    for fmt, path in inputs:
+        r = bench_input(fmt, path, repeat)
+        results[f"{fmt}/{r['input']}"] = r
+        print(f"{fmt:<13}{r['input']:<28}{r['rows']:>7}{r['parse_s'] * 1000:>10.1f}ms"
+              f"{r['rows_per_s']:>11.0f}/s{r['serialize_s'] * 1000:>9.1f}ms{r['peak_kb']:>10.0f}KB"
+              f"{'' if r['roundtrip'] is None else '  ok' if r['roundtrip'] else '  MISMATCH'}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """List of (key, message) for every metric that regressed past threshold."""
+    regressions = []
+    for key, r in results.items():
+        if r["roundtrip"] is False:
+            regressions.append((key, "parse result differs from the expected JSON"))
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if base["rows_per_s"] and r["rows_per_s"] < base["rows_per_s"] * (1 - threshold):
+            regressions.append((key, f"rows/s {base['rows_per_s']:.0f} -> {r['rows_per_s']:.0f}"))
+        if base["peak_kb"] and r["peak_kb"] > base["peak_kb"] * (1 + threshold):
+            regressions.append((key, f"peak {base['peak_kb']:.0f}KB -> {r['peak_kb']:.0f}KB"))
+    return regressions
+
+
+def pop_option(args, name, default):
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = args[i + 1]
+    del args[i:i + 2]
+    return value
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    save = "--save" in args
+    if save:
+        args.remove("--save")
+    baseline_path = pop_option(args, "--baseline", DEFAULT_BASELINE)
+    threshold = float(pop_option(args, "--threshold", 25)) / 100
+    repeat = int(pop_option(args, "--repeat", 3))
+    generate = pop_option(args, "--generate", None)
+    problems = int(pop_option(args, "--problems", 13))
+
+    if len(args) > 1:
+        print("Usage: python bench_parsers.py [inputs_dir] [--save] [--baseline FILE] "
+              "[--threshold PCT] [--repeat N] [--generate 100,1000,5000 [--problems N]]")
+        sys.exit(1)
+
+    inputs_dir = args[0] if args else DEFAULT_INPUTS
+
+    if generate:
+        import gen_scoreboard
+
+        for teams in (int(n) for n in generate.split(",")):
+            contest = gen_scoreboard.synthetic_contest(teams, problems)
+            for fmt in gen_scoreboard.GENERATORS:
+                gen_scoreboard.write_format(fmt, contest, inputs_dir)
+
+    inputs = find_inputs(inputs_dir)
+    if not inputs:
+        print(f"No inputs found under {inputs_dir}/<format>/*.html")
+        sys.exit(1)
+
+    print(f"{'format':<13}{'input':<28}{'rows':>7}{'parse':>12}{'throughput':>13}"
+          f"{'json':>11}{'peak':>12}")
+    results = run_suite(inputs, repeat)
+
+    if save:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {baseline_path}")
+        sys.exit(0)
+
+    mismatches = [k for k, r in results.items() if r["roundtrip"] is False]
+
+    if not os.path.exists(baseline_path):
+        for key in mismatches:
+            print(f"ROUND-TRIP MISMATCH {key}")
+        if mismatches:
+            sys.exit(1)
+        print(f"No baseline at {baseline_path}; run with --save to create one")
+        sys.exit(0)
+
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, threshold)
+    for key, message in regressions:
+        print(f"REGRESSION {key}: {message}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {threshold:.0%} against {baseline_path}")
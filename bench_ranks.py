@@ -0,0 +1,95 @@
+"""
+Compares replay_ranks.rank_matrix against re-sorting every team at each
+minute (what a computeTeams-style loop does) on neerc2026 and a synthetic
+contest.
+
+Usage:
+    python bench_ranks.py [replay.json] [--teams N] [--problems N]
+
+Re-sorting is only timed on a sample of minutes and extrapolated, and the
+sampled minutes are checked against the rank matrix.
+"""
+
+import json
+import os
+import sys
+import time
+
+import replay_ranks
+from bench_engine import synthetic_contest
+from replay_model import PENALTY_PER_TRY
+
+DEFAULT_REPLAY = os.path.join("src", "assets", "neerc2026.json")
+RESORT_SAMPLE = 10
+REPEAT = 3
+
+
+def resort_ranks(data, t):
+    """Ranks at time t by scoring and sorting every team, ties sharing a rank."""
+    scores = []
+    for team in data["teams"]:
+        solved = penalty = 0
+        for info in team["submissions"].values():
+            if info and info["time"] <= t:
+                solved += 1
+                penalty += info["time"] + (info["tries"] - 1) * PENALTY_PER_TRY
+        scores.append((-solved, penalty))
+
+    order = sorted(range(len(scores)), key=scores.__getitem__)
+    ranks = [0] * len(scores)
+    for pos, i in enumerate(order):
+        same = pos and scores[i] == scores[order[pos - 1]]
+        ranks[i] = ranks[order[pos - 1]] if same else pos + 1
+    return ranks
+
+
+def bench(label, data):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        points, ranks = replay_ranks.rank_matrix(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    sample = points[::max(1, len(points) // RESORT_SAMPLE)].tolist()
+    start = time.perf_counter()
+    expected = [resort_ranks(data, t) for t in sample]
+    resort = (time.perf_counter() - start) / len(sample) * len(points)
+
+    rows = {t: k for k, t in enumerate(points.tolist())}
+    ok = all(ranks[rows[t]].tolist() == exp for t, exp in zip(sample, expected))
+
+    print(f"{label}: {len(data['teams'])} teams, {len(points)} time points, "
+          f"{ranks.nbytes // 1024} KB rank matrix")
+    print(f"  re-sort per minute: {resort:8.3f}s (extrapolated from {len(sample)} minutes)")
+    print(f"  rank_matrix:        {best:8.3f}s  ({resort / best:.0f}x)  "
+          f"{'matches' if ok else 'MISMATCH'}")
+    return ok
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    teams = 10000
+    if "--teams" in args:
+        i = args.index("--teams")
+        teams = int(args[i + 1])
+        del args[i:i + 2]
+
+    problems = 13
+    if "--problems" in args:
+        i = args.index("--problems")
+        problems = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) > 1:
+        print("Usage: python bench_ranks.py [replay.json] [--teams N] [--problems N]")
+        sys.exit(1)
+
+    path = args[0] if args else DEFAULT_REPLAY
+    with open(path, encoding="utf-8") as f:
+        replay = json.load(f)
+
+    ok = bench(os.path.basename(path), replay)
+    ok = bench("synthetic", synthetic_contest(teams, problems)) and ok
+    sys.exit(0 if ok else 1)
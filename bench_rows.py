@@ -0,0 +1,101 @@
+"""
+Compares row extraction on a saved scoreboard page: the old path (full
+BeautifulSoup html.parser tree + find_all("tr")) against the streaming lxml
+path in scoreboard_rows.
+
+Each path runs in its own child process so peak RSS is not shared.
+
+Usage:
+    python bench_rows.py <page.html> [repeat]
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_bs4(path):
+    from bs4 import BeautifulSoup
+
+    base = peak_rss_mb()
+    start = time.perf_counter()
+
+    with open(path, encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    rows = 0
+    cells = 0
+    for row in soup.find_all("tr"):
+        rows += 1
+        cells += len(row.find_all("td"))
+
+    return rows, cells, time.perf_counter() - start, base
+
+
+def run_lxml(path):
+    from scoreboard_rows import iter_rows, find_all
+
+    base = peak_rss_mb()
+    start = time.perf_counter()
+
+    rows = 0
+    cells = 0
+    for row in iter_rows(path, "tr"):
+        rows += 1
+        cells += len(find_all(row, "td"))
+
+    return rows, cells, time.perf_counter() - start, base
+
+
+def child(engine, path):
+    rows, cells, seconds, base = (run_bs4 if engine == "bs4" else run_lxml)(path)
+    print(json.dumps({
+        "engine": engine,
+        "rows": rows,
+        "cells": cells,
+        "seconds": seconds,
+        "base_rss_mb": base,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def bench(path, repeat=3):
+    results = {}
+    for engine in ("bs4", "lxml"):
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", engine, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            runs.append(json.loads(out))
+        results[engine] = min(runs, key=lambda r: r["seconds"])
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python bench_rows.py <page.html> [repeat]")
+        sys.exit(1)
+
+    repeat = int(sys.argv[2]) if len(sys.argv) == 3 else 3
+    results = bench(sys.argv[1], repeat)
+
+    print(f"{'engine':<8}{'rows':>8}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}{'parse MB':>10}")
+    for engine, r in results.items():
+        print(f"{engine:<8}{r['rows']:>8}{r['seconds']:>10.3f}"
+              f"{r['rows'] / r['seconds']:>12.0f}{r['peak_rss_mb']:>10.1f}"
+              f"{r['peak_rss_mb'] - r['base_rss_mb']:>10.1f}")
+
+    speedup = results["bs4"]["seconds"] / results["lxml"]["seconds"]
+    print(f"lxml streaming is {speedup:.1f}x faster")
@@ -0,0 +1,131 @@
+"""
+Builds the contest bundle the frontend downloads.
+
+For every replay JSON in src/assets (side files are left out) it writes a
+minified copy named by content hash, plus .gz and .br variants, to
+public/contests/, and a manifest listing every contest:
+
+    public/contests/nac2024.3f9a1c0b7e2d.json
+    public/contests/nac2024.3f9a1c0b7e2d.json.gz
+    public/contests/nac2024.3f9a1c0b7e2d.json.br
+    public/contests/manifest.json
+
+    {"contests": [{"id": "nac2024", "name": "NAC 2024", "teams": 52,
+                   "problems": 13, "duration": 18000,
+                   "url": "contests/nac2024.3f9a1c0b7e2d.json",
+                   "gz": "contests/nac2024.3f9a1c0b7e2d.json.gz",
+                   "br": "contests/nac2024.3f9a1c0b7e2d.json.br",
+                   "bytes": 17737, "gz_bytes": 3406, "br_bytes": 2771}, ...]}
+
+URLs are relative to the site base. Hashed files never change, so they can
+be cached forever; only manifest.json has to be revalidated. Files left
+over from earlier builds are removed.
+
+The .br variants need the brotli package; without it they are skipped (and
+left out of the manifest). npm runs this as the prebuild/predev step.
+
+Usage:
+    python build_assets.py [assets_dir] [out_dir]
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from replay_output import atomic_open, write_json
+
+DEFAULT_ASSETS = os.path.join("src", "assets")
+DEFAULT_OUT = os.path.join("public", "contests")
+URL_PREFIX = "contests/"
+HASH_LENGTH = 12
+
+
+def replay_paths(assets_dir):
+    paths = sorted(glob.glob(os.path.join(assets_dir, "*.json")))
+    # nac2024.json, but not nac2024.timeline.json
+    return [p for p in paths if "." not in os.path.basename(p)[:-len(".json")]]
+
+
+def write_bytes(path, data):
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def build_contest(path, out_dir):
+    """Write the hashed variants of one replay and return its manifest entry."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    contest_id = os.path.basename(path)[:-len(".json")]
+    body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+    name = f"{contest_id}.{digest}.json"
+
+    # mtime=0 keeps the .gz bytes reproducible
+    variants = {"url": body, "gz": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+
+    entry = {
+        "id": contest_id,
+        "name": data.get("name", contest_id),
+        "teams": len(data["teams"]),
+        "problems": len(data["problems"]),
+        "duration": data["duration"],
+    }
+    for kind, content in variants.items():
+        filename = name if kind == "url" else f"{name}.{kind}"
+        write_bytes(os.path.join(out_dir, filename), content)
+        entry[kind] = URL_PREFIX + filename
+    for kind, content in variants.items():
+        entry["bytes" if kind == "url" else f"{kind}_bytes"] = len(content)
+
+    return entry
+
+
+def build(assets_dir=DEFAULT_ASSETS, out_dir=DEFAULT_OUT):
+    os.makedirs(out_dir, exist_ok=True)
+    entries = [build_contest(p, out_dir) for p in replay_paths(assets_dir)]
+
+    keep = {"manifest.json"}
+    for entry in entries:
+        for kind in ("url", "gz", "br"):
+            if kind in entry:
+                keep.add(entry[kind][len(URL_PREFIX):])
+    for filename in os.listdir(out_dir):
+        if filename not in keep:
+            os.remove(os.path.join(out_dir, filename))
+
+    write_json({"contests": entries}, os.path.join(out_dir, "manifest.json"), compact=True,
+               ensure_ascii=False)
+    return entries
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("Usage: python build_assets.py [assets_dir] [out_dir]")
+        sys.exit(1)
+
+    assets_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ASSETS
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUT
+
+    if brotli is None:
+        print("brotli is not installed; skipping .br variants", file=sys.stderr)
+
+    entries = build(assets_dir, out_dir)
+
+    source = sum(os.path.getsize(p) for p in replay_paths(assets_dir))
+    minified = sum(e["bytes"] for e in entries)
+    gz = sum(e["gz_bytes"] for e in entries)
+    line = f"Built {len(entries)} contests: {source} bytes -> {minified} minified, {gz} gzip"
+    if brotli is not None:
+        line += f", {sum(e['br_bytes'] for e in entries)} brotli"
+    print(line)
@@ -0,0 +1,419 @@
+"""
+Converts a CCS Contest API event feed (NDJSON) to the replay JSON format.
+
+The HTML scoreboards only give accepted time and try count; the event feed
+has every submission and judgement, so this also writes the full
+per-submission timeline next to the replay:
+
+    out.submissions.json
+    {
+      "fields": ["team", "problem", "time", "verdict"],
+      "submissions": [[12, 0, 65, "WA"], [12, 0, 140, "AC"], [3, 1, 151, null], ...]
+    }
+
+"team" and "problem" index into the replay's "teams" and "problems" lists,
+"time" is in seconds, and "verdict" is the judgement type id (null while
+still pending). Sorted by time.
+
+The feed is read one line at a time and only the per-object state is kept
+(teams, problems, and one small record per submission), never the events,
+so memory does not grow with the size of the feed. Both the 2020/2022
+({"id", "type", "op", "data"}) and 2023 ({"type", "id", "data", "token"})
+event formats are understood.
+
+A truncated last line (a feed still being written, or a dropped
+connection) is left unprocessed. The state after the last processed event
+is checkpointed to out.feed.json; with --resume a later run continues from
+there: a local file is read from the saved byte offset, and a URL is
+requested with since_token (or since_id) set to the last event id.
+
+Usage:
+    python ccs_feed.py <event-feed.ndjson | URL> <output.json> [--resume] [--minify]
+                       [--profile [FILE.pstats]]
+
+A local stand-in for the URL form: python snapshot_server.py --feed <event-feed.ndjson>
+"""
+
+import io
+import json
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from replay_model import Contest
+from replay_output import side_path, stream_replay, write_json
+from replay_profile import profile_from_args, stage
+
+# Write the checkpoint every this many events, so a crash loses little
+CHECKPOINT_EVERY = 200_000
+
+# (solved, penalty) for the usual ids, if the feed has no judgement-types
+DEFAULT_JUDGEMENT_TYPES = {
+    "AC": (True, False),
+    "CE": (False, False),
+}
+
+
+def parse_reltime(value):
+    """CCS RELTIME "(-)h:mm:ss(.uuu)" to integer milliseconds."""
+    sign = -1 if value.startswith("-") else 1
+    h, m, s = value.lstrip("-").split(":")
+    return sign * round((int(h) * 3600 + int(m) * 60 + float(s)) * 1000)
+
+
+def contest_header(data, name=None, duration=5 * 3600):
+    """(name, duration, freeze) in seconds from a CCS contest object."""
+    name = data.get("formal_name") or data.get("name") or name
+    if data.get("duration"):
+        duration = parse_reltime(data["duration"]) // 1000
+    frozen = data.get("scoreboard_freeze_duration")
+    return name, duration, duration - parse_reltime(frozen) // 1000 if frozen else duration
+
+
+class FeedState:
+    """Everything kept from the events processed so far."""
+
+    def __init__(self):
+        self.name = None
+        self.duration = 5 * 3600
+        self.freeze = 4 * 3600
+        self.problems = {}         # id -> [label, ordinal]
+        self.teams = {}            # id -> [name, organization id, hidden]
+        self.organizations = {}    # id -> name
+        self.judgement_types = {}  # id -> [solved, penalty]
+        self.submissions = {}      # id -> (team id, problem id, ms, verdict or None)
+        self.token = None          # id of the last processed event
+        self.token_param = "since_id"
+        self.offset = 0            # bytes of the local feed consumed
+        self.events = 0
+
+    # ------------------------------------
+    # Applying events
+    # ------------------------------------
+
+    def apply(self, event):
+        kind = event.get("type")
+        if "op" in event:
+            # 2020/2022: "id" is the event id
+            self.token = event.get("id", self.token)
+            data = None if event["op"] == "delete" else event.get("data")
+            object_id = (event.get("data") or {}).get("id")
+        else:
+            # 2023: "id" is the object id, data null means deleted
+            if "token" in event:
+                self.token = event["token"]
+                self.token_param = "since_token"
+            data = event.get("data")
+            object_id = event.get("id")
+
+        self.events += 1
+
+        # A 2023 event without an id carries the whole collection
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            oid = item.get("id") if item is not None else object_id
+            handler = HANDLERS.get(kind)
+            if handler is not None:
+                handler(self, oid, item)
+
+    def _contest(self, oid, data):
+        if data is not None:
+            self.name, self.duration, self.freeze = contest_header(data, self.name, self.duration)
+
+    def _problem(self, oid, data):
+        if data is None:
+            self.problems.pop(oid, None)
+        else:
+            self.problems[oid] = [data.get("label") or oid, data.get("ordinal", len(self.problems))]
+
+    def _organization(self, oid, data):
+        if data is None:
+            self.organizations.pop(oid, None)
+        else:
+            self.organizations[oid] = data.get("formal_name") or data.get("name") or oid
+
+    def _team(self, oid, data):
+        if data is None:
+            self.teams.pop(oid, None)
+        else:
+            name = data.get("display_name") or data.get("name") or oid
+            self.teams[oid] = [name, data.get("organization_id"), bool(data.get("hidden"))]
+
+    def _judgement_type(self, oid, data):
+        if data is None:
+            self.judgement_types.pop(oid, None)
+        else:
+            self.judgement_types[oid] = [bool(data.get("solved")), bool(data.get("penalty"))]
+
+    def _submission(self, oid, data):
+        if data is None:
+            self.submissions.pop(oid, None)
+            return
+        previous = self.submissions.get(oid)
+        self.submissions[oid] = (
+            sys.intern(data["team_id"]),
+            sys.intern(data["problem_id"]),
+            parse_reltime(data["contest_time"]),
+            previous[3] if previous else None,
+        )
+
+    def _judgement(self, oid, data):
+        # Deleted judgements carry no submission id; a rejudge sends a new one
+        if data is None or data.get("valid") is False:
+            return
+        sid = data.get("submission_id")
+        verdict = data.get("judgement_type_id")
+        if sid in self.submissions and verdict:
+            self.submissions[sid] = self.submissions[sid][:3] + (sys.intern(verdict),)
+
+    # ------------------------------------
+    # Results
+    # ------------------------------------
+
+    def verdict_kind(self, verdict):
+        if verdict in self.judgement_types:
+            return self.judgement_types[verdict]
+        return DEFAULT_JUDGEMENT_TYPES.get(verdict, (False, True))
+
+    def build(self):
+        """
+        (contest, timeline): a filled-in Contest, teams in scoreboard order,
+        and the per-submission timeline rows for it.
+        """
+        problem_ids = sorted(self.problems, key=lambda p: (self.problems[p][1], self.problems[p][0]))
+        column = {p: j for j, p in enumerate(problem_ids)}
+        team_ids = [t for t, (_, _, hidden) in self.teams.items() if not hidden]
+
+        # Submissions of known teams and problems, in time order (stable,
+        # so equal times keep the order the feed sent them in)
+        subs = sorted(
+            ((ms, t, p, verdict)
+             for t, p, ms, verdict in self.submissions.values()
+             if t in self.teams and p in column and ms >= 0),
+            key=lambda s: s[0],
+        )
+
+        results = {t: {} for t in team_ids}   # team -> problem -> [ms, tries]
+        wrong = {}
+        for ms, t, p, verdict in subs:
+            if verdict is None or t not in results or p in results[t]:
+                continue
+            solved, penalty = self.verdict_kind(verdict)
+            if solved:
+                results[t][p] = [ms, wrong.get((t, p), 0) + 1]
+            elif penalty:
+                wrong[t, p] = wrong.get((t, p), 0) + 1
+
+        first = {}
+        for t, solved in results.items():
+            for p, (ms, _) in solved.items():
+                if p not in first or ms < first[p][0]:
+                    first[p] = (ms, t)
+
+        # Scoreboard order counts penalty in whole minutes, like the CCS
+        def sort_key(t):
+            solved = results[t].values()
+            penalty = sum(ms // 60000 + (tries - 1) * 20 for ms, tries in solved)
+            return -len(solved), penalty, self.teams[t][0]
+
+        team_ids.sort(key=sort_key)
+
+        contest = Contest(self.name, self.duration, self.freeze,
+                          [self.problems[p][0] for p in problem_ids])
+        row = {}
+        for t in team_ids:
+            name, org, _ = self.teams[t]
+            team = contest.add_team(name, self.organizations.get(org, name))
+            row[t] = team.index
+            for p, (ms, tries) in results[t].items():
+                team.solve(column[p], ms // 1000, tries, first[p][1] == t)
+
+        timeline = [[row[t], column[p], ms // 1000, verdict]
+                    for ms, t, p, verdict in subs if t in row]
+        return contest, timeline
+
+    # ------------------------------------
+    # Checkpoints
+    # ------------------------------------
+
+    def to_json(self):
+        return {
+            "token": self.token,
+            "token_param": self.token_param,
+            "offset": self.offset,
+            "events": self.events,
+            "contest": [self.name, self.duration, self.freeze],
+            "problems": self.problems,
+            "teams": self.teams,
+            "organizations": self.organizations,
+            "judgement_types": self.judgement_types,
+            "submissions": self.submissions,
+        }
+
+    @classmethod
+    def from_json(cls, saved):
+        state = cls()
+        state.token = saved["token"]
+        state.token_param = saved["token_param"]
+        state.offset = saved["offset"]
+        state.events = saved["events"]
+        state.name, state.duration, state.freeze = saved["contest"]
+        state.problems = saved["problems"]
+        state.teams = saved["teams"]
+        state.organizations = saved["organizations"]
+        state.judgement_types = saved["judgement_types"]
+        state.submissions = {
+            k: (sys.intern(t), sys.intern(p), ms, v and sys.intern(v))
+            for k, (t, p, ms, v) in saved["submissions"].items()
+        }
+        return state
+
+
+HANDLERS = {
+    "contest": FeedState._contest,
+    "contests": FeedState._contest,
+    "problems": FeedState._problem,
+    "organizations": FeedState._organization,
+    "teams": FeedState._team,
+    "judgement-types": FeedState._judgement_type,
+    "submissions": FeedState._submission,
+    "judgements": FeedState._judgement,
+}
+
+
+# ------------------------------------
+# Reading the feed
+# ------------------------------------
+
+def is_url(source):
+    return isinstance(source, str) and source.startswith(("http://", "https://"))
+
+
+def feed_lines(source, state, session=None):
+    """The feed's lines (with their newline) after the last processed event."""
+    if isinstance(source, bytes) or not is_url(source):
+        with (io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")) as f:
+            f.seek(state.offset)
+            yield from f
+        return
+
+    import requests
+
+    session = session or requests.Session()
+    params = {state.token_param: state.token} if state.token is not None else None
+    with session.get(source, params=params, stream=True, timeout=30) as resp:
+        resp.raise_for_status()
+        rest = b""
+        for chunk in resp.iter_content(1 << 16):
+            lines = (rest + chunk).split(b"\n")
+            rest = lines.pop()
+            for line in lines:
+                yield line + b"\n"
+        if rest:
+            yield rest
+
+
+def read_events(lines, state, stats):
+    """
+    Yield the events in `lines` one at a time, keeping state.offset just
+    past the last line handed out. A trailing line that does not parse is
+    left for the next run.
+    """
+    for line in lines:
+        complete = line.endswith(b"\n")
+        if not line.strip():
+            state.offset += len(line)
+            continue
+        try:
+            event = orjson.loads(line) if orjson is not None else json.loads(line)
+        except ValueError:
+            if not complete:
+                stats["truncated"] += 1
+                return
+            stats["malformed"] += 1
+            state.offset += len(line)
+            continue
+        state.offset += len(line)
+        yield event
+
+
+def ingest(source, state=None, session=None, checkpoint=None):
+    """
+    Apply every complete event in `source` (a path, URL or the feed's
+    bytes) to `state` (a fresh FeedState by default). checkpoint(state),
+    if given, is called every CHECKPOINT_EVERY events. Returns (state, stats).
+    """
+    state = state or FeedState()
+    stats = {"events": 0, "malformed": 0, "truncated": 0}
+
+    for event in read_events(feed_lines(source, state, session), state, stats):
+        state.apply(event)
+        stats["events"] += 1
+        if checkpoint is not None and stats["events"] % CHECKPOINT_EVERY == 0:
+            checkpoint(state)
+
+    return state, stats
+
+
+def parse_event_feed(source):
+    """The replay dict for a whole feed (a path, URL or the feed's bytes)."""
+    state, _ = ingest(source)
+    contest, _ = state.build()
+    return contest.to_dict()
+
+
+def convert_feed(source, out_path, resume=False, minify=False, session=None, profile=None):
+    """
+    Ingest `source` (continuing from out.feed.json with resume=True) and
+    write the replay and the submission timeline.
+    Returns (contest, stats).
+    """
+    state_path = side_path(out_path, "feed")
+    state = None
+    if resume and os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = FeedState.from_json(json.load(f))
+
+    def checkpoint(s):
+        write_json(s.to_json(), state_path, compact=True)
+
+    with stage(profile, "parse"):
+        state, stats = ingest(source, state, session, checkpoint)
+    with stage(profile, "checkpoint"):
+        checkpoint(state)
+
+    with stage(profile, "collect"):
+        contest, timeline = state.build()
+    stream_replay(contest, contest.teams(), out_path, minify=minify, profile=profile)
+    with stage(profile, "submissions"):
+        write_json({"fields": ["team", "problem", "time", "verdict"], "submissions": timeline},
+                   side_path(out_path, "submissions"), compact=True)
+    if profile is not None:
+        profile.count("events", stats["events"])
+    return contest, stats
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    flags = {a for a in args if a.startswith("--")}
+    args = [a for a in args if not a.startswith("--")]
+
+    if len(args) != 2 or not flags <= {"--resume", "--minify"}:
+        print("Usage: python ccs_feed.py <event-feed.ndjson | URL> <output.json> [--resume] [--minify] "
+              "[--profile [FILE.pstats]]")
+        sys.exit(1)
+
+    contest, stats = convert_feed(args[0], args[1], "--resume" in flags, "--minify" in flags,
+                                  profile=profile)
+
+    print(f"Applied {stats['events']} events ({stats['malformed']} malformed lines skipped"
+          f"{', stopped at a truncated line' if stats['truncated'] else ''})")
+    print(f"Saved {len(contest)} teams, {len(contest.problems)} problems to {args[1]}")
+
+    if profile is not None:
+        profile.finish()
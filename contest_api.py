@@ -0,0 +1,121 @@
+"""
+Converts a CCS Contest API scoreboard (DOMjudge, Kattis, ...) to the replay
+JSON format.
+
+Instead of guessing at HTML columns, this reads the API's JSON endpoints:
+
+    <api>/contests/<id>                 name, duration, scoreboard freeze
+    <api>/contests/<id>/scoreboard      rows in rank order, per-problem results
+    <api>/contests/<id>/teams           team names and organization ids
+    <api>/contests/<id>/organizations   university names
+    <api>/contests/<id>/problems        labels and order
+
+fetches them concurrently on one pooled session (crawler.Crawler) and joins
+them by id, so teams get their real university instead of their own name.
+Problem times may be minutes (2020/2022 API) or RELTIME strings (2023).
+
+Usage:
+    python contest_api.py <api base URL> <contest id> <output.json> [--minify]
+                          [--profile [FILE.pstats]]
+
+e.g. python contest_api.py https://judge.example.org/api/v4 nac2025 out.json.
+For an offline run, serve a directory of endpoint files with
+python snapshot_server.py --api <dir> (gen_scoreboard.py writes one).
+"""
+
+import json
+import sys
+
+from ccs_feed import contest_header, parse_reltime
+from replay_model import Contest
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+
+ENDPOINTS = ("contest", "scoreboard", "teams", "organizations", "problems")
+
+
+def endpoint_urls(api, contest_id):
+    base = f"{api.rstrip('/')}/contests/{contest_id}"
+    return {name: base if name == "contest" else f"{base}/{name}" for name in ENDPOINTS}
+
+
+def fetch_contest_api(api, contest_id, crawler=None):
+    """{endpoint: decoded JSON} for every endpoint, fetched concurrently."""
+    from crawler import Crawler
+
+    crawler = crawler or Crawler(cache_dir=None, workers=len(ENDPOINTS), rate=0)
+    urls = endpoint_urls(api, contest_id)
+    bodies = crawler.fetch_all(urls.values())
+
+    docs = {}
+    for name, url in urls.items():
+        if isinstance(bodies[url], BaseException):
+            raise bodies[url]
+        docs[name] = json.loads(bodies[url])
+    return docs
+
+
+def problem_time(value):
+    """Accepted time in seconds: minutes in the 2020/2022 API, RELTIME in 2023."""
+    if isinstance(value, str):
+        return parse_reltime(value) // 1000
+    return int(value) * 60
+
+
+def parse_contest_api(docs):
+    return collect_replay(*stream_contest_api(docs))
+
+
+def stream_contest_api(docs):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per scoreboard row.
+    """
+    name, duration, freeze = contest_header(docs["contest"])
+    problems = sorted(docs["problems"], key=lambda p: (p.get("ordinal", 0), p["label"]))
+    contest = Contest(name, duration, freeze, [p["label"] for p in problems])
+    return contest, iter_api_teams(docs, contest, [p["id"] for p in problems])
+
+
+def iter_api_teams(docs, contest, problem_ids):
+    column = {pid: j for j, pid in enumerate(problem_ids)}
+    teams = {t["id"]: t for t in docs["teams"]}
+    organizations = {o["id"]: o.get("formal_name") or o.get("name") for o in docs["organizations"]}
+
+    for row in docs["scoreboard"]["rows"]:
+        info = teams.get(row["team_id"], {})
+        team_name = info.get("display_name") or info.get("name") or row["team_id"]
+        university = organizations.get(info.get("organization_id")) or team_name
+
+        team = contest.add_team(team_name, university)
+        for result in row.get("problems", ()):
+            if not result.get("solved") or result["problem_id"] not in column:
+                continue
+            team.solve(column[result["problem_id"]], problem_time(result["time"]),
+                       result["num_judged"], bool(result.get("first_to_solve")))
+
+        yield team
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+
+    if len(args) != 3:
+        print("Usage: python contest_api.py <api base URL> <contest id> <output.json> [--minify] "
+              "[--profile [FILE.pstats]]")
+        sys.exit(1)
+
+    with stage(profile, "fetch"):
+        docs = fetch_contest_api(args[0], args[1])
+    contest, teams = stream_contest_api(docs)
+
+    count = stream_replay(contest, teams, args[2], minify=minify, profile=profile)
+
+    print(f"Saved {count} teams, {len(contest.problems)} problems to {args[2]}")
+
+    if profile is not None:
+        profile.finish()
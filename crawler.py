@@ -0,0 +1,284 @@
+"""
+Concurrent, cached fetching of many scoreboard pages.
+
+Crawler fetches URLs on a bounded thread pool through one connection-pooled
+requests.Session. Each host gets its own minimum spacing between requests,
+failed requests (connection errors, 429 and 5xx) are retried with
+exponential backoff (or the server's Retry-After, in seconds or as an
+HTTP-date, when that is longer), and responses are kept in an on-disk cache:
+
+    <cache_dir>/bodies/<sha256 of body>     response bodies, content-addressed
+    <cache_dir>/urls/<sha256 of url>.json   url -> body hash + validators
+
+A cached URL is revalidated with If-None-Match / If-Modified-Since; a 304
+reuses the stored body without downloading it again. Responses with a
+Cache-Control max-age are served from the cache while fresh.
+
+Usage:
+    python crawler.py <crawl.json> [-j WORKERS] [--rate PER_SECOND]
+
+crawl.json is a list of {"format", "url", "output", ...} entries, like
+batch_replay.py's manifest but with a URL instead of an input file. The
+fetched bodies go straight to the matching parse function. To try it
+offline, point the URLs at snapshot_server.py.
+"""
+
+import email.utils
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import replay_formats
+from replay_output import save_replay
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ResponseCache:
+    def __init__(self, cache_dir):
+        self.bodies = os.path.join(cache_dir, "bodies")
+        self.urls = os.path.join(cache_dir, "urls")
+        os.makedirs(self.bodies, exist_ok=True)
+        os.makedirs(self.urls, exist_ok=True)
+
+    def _entry_path(self, url):
+        return os.path.join(self.urls, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        """(entry, body) for a cached URL, or (None, None)."""
+        try:
+            with open(self._entry_path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(os.path.join(self.bodies, entry["sha256"]), "rb") as f:
+                return entry, f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def put(self, url, body, headers):
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = os.path.join(self.bodies, digest)
+        if not os.path.exists(body_path):
+            _write_atomic(body_path, body)
+
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "expires": _expires(headers),
+        }
+        _write_atomic(self._entry_path(url), json.dumps(entry).encode())
+        return entry
+
+    def refresh(self, url, entry, headers):
+        """Update validators/freshness after a 304."""
+        entry = dict(entry)
+        entry["etag"] = headers.get("ETag", entry["etag"])
+        entry["last_modified"] = headers.get("Last-Modified", entry["last_modified"])
+        entry["expires"] = _expires(headers)
+        _write_atomic(self._entry_path(url), json.dumps(entry).encode())
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _expires(headers):
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return None
+    m = re.search(r"max-age=(\d+)", cache_control)
+    return time.time() + int(m.group(1)) if m else None
+
+
+def retry_after(value):
+    """Seconds to wait from a Retry-After header (seconds or an HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1 / rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, 0.0))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Crawler:
+    def __init__(self, cache_dir=".http_cache", workers=8, rate=2.0, retries=3, backoff=0.5,
+                 timeout=30):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.limiter = HostRateLimiter(rate)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.stats = {"fetched": 0, "revalidated": 0, "fresh": 0, "retries": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _request(self, url, headers):
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(url)
+            try:
+                resp = self.session.get(url, headers=headers, timeout=self.timeout)
+                if resp.status_code not in RETRY_STATUSES:
+                    return resp
+                delay = retry_after(resp.headers.get("Retry-After")) or 0.0
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                delay = 0.0
+
+            if attempt == self.retries:
+                return resp
+            self._count("retries")
+            time.sleep(max(delay, self.backoff * 2 ** attempt))
+
+    def fetch(self, url):
+        """Body bytes of `url`, from the cache when it is still valid."""
+        entry, body = self.cache.get(url) if self.cache else (None, None)
+
+        if entry and entry.get("expires") and entry["expires"] > time.time():
+            self._count("fresh")
+            return body
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = self._request(url, headers)
+
+        if resp.status_code == 304 and entry:
+            self.cache.refresh(url, entry, resp.headers)
+            self._count("revalidated")
+            return body
+
+        resp.raise_for_status()
+        if self.cache:
+            self.cache.put(url, resp.content, resp.headers)
+        self._count("fetched")
+        return resp.content
+
+    def fetch_all(self, urls, handle=None):
+        """
+        Fetch every URL concurrently. Returns {url: result}, where result is
+        handle(url, body) (or the body if no handler is given), or the
+        exception raised while fetching or handling that URL.
+        """
+        def work(url):
+            try:
+                body = self.fetch(url)
+                return handle(url, body) if handle else body
+            except (Exception, SystemExit) as e:
+                # Parsers sys.exit() on pages they do not recognise
+                self._count("failed")
+                return e
+
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(urls, pool.map(work, urls)))
+
+
+def crawl(jobs, crawler):
+    """Fetch and convert every {"format", "url", "output"} job."""
+    by_url = {}
+    for job in jobs:
+        by_url.setdefault(job["url"], []).append(job)
+
+    def handle(url, body):
+        results = []
+        for job in by_url[url]:
+            data = replay_formats.convert(job["format"], body, job)
+            save_replay(data, job["output"], ensure_ascii=False)
+            results.append(len(data["teams"]))
+        return results
+
+    return crawler.fetch_all(by_url, handle)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    workers = 8
+    if "-j" in args:
+        i = args.index("-j")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+
+    rate = 2.0
+    if "--rate" in args:
+        i = args.index("--rate")
+        rate = float(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) != 1:
+        print("Usage: python crawler.py <crawl.json> [-j WORKERS] [--rate PER_SECOND]")
+        sys.exit(1)
+
+    with open(args[0], encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    crawler = Crawler(workers=workers, rate=rate)
+    start = time.perf_counter()
+    results = crawl(jobs, crawler)
+
+    failed = False
+    for url, result in results.items():
+        if isinstance(result, BaseException):
+            failed = True
+            print(f"[FAIL] {url}: {type(result).__name__}: {result}")
+        else:
+            print(f"[  ok] {url}: {', '.join(f'{n} teams' for n in result)}")
+
+    print(f"{crawler.stats} in {time.perf_counter() - start:.2f}s")
+    sys.exit(1 if failed else 0)
@@ -1,126 +1,129 @@
-import json
-import requests
-from bs4 import BeautifulSoup
+from scoreboard_rows import iter_rows, text, classes, find, find_all
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args
+from replay_model import Contest, ParseError
 import sys
 import re
 
 def min_to_sec(m):
     return int(float(m) * 60)
 
-def parse_domjudge(url):
-    print(f"Fetching {url} ...")
-    with open("inner.html") as f:
-        html = f.read()
+def parse_domjudge(url, path="inner.html"):
+    return collect_replay(*stream_domjudge(url, path))
 
-    soup = BeautifulSoup(html, "html.parser")
+def stream_domjudge(url, path="inner.html"):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set with the first row.
+    """
+    contest = Contest(duration=5 * 3600, freeze=4 * 3600)
+    return contest, iter_domjudge_teams(path, contest)
 
-    rows = soup.find_all("tr", attrs={"data-team-id": True})
-    if not rows:
-        print("ERROR: No DOMjudge rows found.")
-        sys.exit(1)
+def iter_domjudge_teams(path, contest):
+    rows = iter_rows(path, "tr", lambda row: row.get("data-team-id") is not None)
 
-    teams = []
     problems_count = None
+    row_count = 0
 
     for row in rows:
-        print(f"Processing row with team-id={row.get('data-team-id')} ...")
+        row_count += 1
 
         # Rank
-        rank_td = row.find("td", class_="scorepl")
-        if not rank_td:
+        rank_td = find(row, "td", "scorepl")
+        if rank_td is None:
             continue
-        rank_text = rank_td.get_text(strip=True)
+        rank_text = text(rank_td)
         if not rank_text.isdigit():
             continue
         rank = int(rank_text)
 
         # Team name
-        team_td = row.find("td", class_="scoretn")
-        if not team_td:
+        team_td = find(row, "td", "scoretn")
+        if team_td is None:
             continue
-        team_name = team_td.get_text(" ", strip=True)
+        team_name = text(team_td, " ")
         if "Pre-qualified" in team_name:
             team_name = team_name[team_name.index("Pre-qualified") + len("Pre-qualified"):].strip()
 
         university = team_name
 
         # Problem cells (NEW: explicit selector)
-        problem_cells = row.find_all("td", class_="score_cell")
+        problem_cells = find_all(row, "td", "score_cell")
 
         if problems_count is None:
             problems_count = len(problem_cells)
+            contest.set_problems([chr(ord("A") + i) for i in range(problems_count)])
 
-        submissions = {}
+        team = contest.add_team(team_name, university)
 
         for idx, pc in enumerate(problem_cells):
             prob_letter = chr(ord("A") + idx)
 
-            div = pc.find("div")
-            if not div:
+            div = find(pc, "div")
+            if div is None:
                 continue
 
-            classes = div.get("class", [])
+            div_classes = classes(div)
 
             # Skip incorrect-only cells
-            if "score_incorrect" in classes:
+            if "score_incorrect" in div_classes:
                 continue
 
             # Accept correct / first solve
-            if "score_correct" not in classes and "score_first" not in classes:
+            if "score_correct" not in div_classes and "score_first" not in div_classes:
                 continue
 
             # Time (minutes)
-            time_text = div.contents[0].strip()
+            time_text = (div.text or "").strip()
             if not time_text.isdigit():
                 continue
 
             time_sec = min_to_sec(time_text)
 
             # Tries
-            span = div.find("span")
-            if not span:
+            span = find(div, "span")
+            if span is None:
                 continue
 
-            m = re.search(r"(\d+)\s+tr", span.get_text(strip=True))
+            m = re.search(r"(\d+)\s+tr", text(span))
             if not m:
                 continue
 
             tries = int(m.group(1))
-            is_first = "score_first" in classes
-
-            submissions[prob_letter] = {
-                "time": time_sec,
-                "tries": tries,
-                "first": is_first
-            }
+            is_first = "score_first" in div_classes
 
-        teams.append({
-            "name": team_name,
-            "university": university,
-            "submissions": submissions
-        })
+            team.solve(prob_letter, time_sec, tries, is_first)
 
-    problems = [chr(ord("A") + i) for i in range(problems_count)]
+        yield team
 
-    return {
-        "duration": 5 * 3600,
-        "freeze": 4 * 3600,
-        "problems": problems,
-        "teams": teams
-    }
+    if not row_count:
+        raise ParseError("No DOMjudge rows found.")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python domjudge_to_replay_json.py <domjudge-scoreboard-url> <output.json>")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+
+    if len(args) != 2:
+        print("Usage: python domjudge_to_replay_json.py <domjudge-scoreboard-url> <output.json> [--minify] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    url = sys.argv[1]
-    outfile = sys.argv[2]
+    url = args[0]
+    outfile = args[1]
 
-    data = parse_domjudge(url)
+    print(f"Fetching {url} ...")
+    contest, teams = stream_domjudge(url)
 
-    with open(outfile, "w") as f:
-        json.dump(data, f, indent=2)
+    try:
+        stream_replay(contest, teams, outfile, minify=minify, profile=profile)
+    except ParseError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
 
     print(f"Saved replay JSON to {outfile}")
+
+    if profile is not None:
+        profile.finish()
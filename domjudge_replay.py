@@ -1,31 +1,36 @@
-import json
-import requests
-from bs4 import BeautifulSoup
+from scoreboard_rows import iter_rows, text, full_text, classes, find, find_all
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+from replay_model import Contest, ParseError
 import sys
 import re
 
 def min_to_sec(m):
 	return int(float(m) * 60)
 
-def parse_domjudge(url):
-	print(f"Fetching {url} ...")
-	f = open("inner.html")
-	html = f.read()
-	soup = BeautifulSoup(html, "html.parser")
-
-	# DOMjudge scoreboard rows
-	rows = soup.find_all("tr")
-	if not rows:
-		print("ERROR: No DOMjudge rows found.")
-		sys.exit(1)
+def is_team_row(row):
+	row_id = row.get("id") or ""
+	return row_id.startswith("team:") and "mobile" not in row_id
+
+def parse_domjudge(url, path="inner.html"):
+	return collect_replay(*stream_domjudge(url, path))
+
+def stream_domjudge(url, path="inner.html"):
+	"""
+	(contest, teams): the Contest being filled in and a generator of its
+	Team views, one per row. The problems are set with the first row.
+	"""
+	contest = Contest(duration=5 * 3600, freeze=4 * 3600)  # NAC and most DOMjudge ICPCs are 5h
+	return contest, iter_domjudge_teams(path, contest)
+
+def iter_domjudge_teams(path, contest):
+	# DOMjudge scoreboard rows, streamed one at a time
+	rows = iter_rows(path, "tr", is_team_row)
 
-	teams = []
 	problems_count = None
 
 	for row in rows:
-		if not row.get("id") or not row["id"].startswith("team:") or "mobile" in row["id"]:
-			continue
-		cells = row.find_all("td")
+		cells = find_all(row, "td")
 
 		if not cells:
 			continue
@@ -39,13 +44,13 @@ def parse_domjudge(url):
 		# 5 = penalty
 		#
 		# Problem cells start at index 6
-		rank = int(cells[0].text.strip())
-		solved = int(cells[4].text.strip())
-		penalty = int(cells[5].text.strip())
+		rank = int(full_text(cells[0]).strip())
+		solved = int(full_text(cells[4]).strip())
+		penalty = int(full_text(cells[5]).strip())
 
 		# Team name inside <td class="scoretn ...">
 		team_td = cells[3]
-		team_name = team_td.get_text(" ", strip=True)
+		team_name = text(team_td, " ")
 		if "Division" in team_name:
 			team_name = team_name[team_name.index("Division") + len("Division"):]
 
@@ -57,28 +62,30 @@ def parse_domjudge(url):
 
 		if problems_count is None:
 			problems_count = len(problem_cells)
+			contest.set_problems([chr(ord("A") + i) for i in range(problems_count)])
 
-		submissions = {}
+		team = contest.add_team(team_name, university)
+		team.report(rank, solved, penalty)
 
 		for idx, pc in enumerate(problem_cells):
 			prob_letter = chr(ord("A") + idx)
 
-			div = pc.find("div")
-			if not div:
+			div = find(pc, "div")
+			if div is None:
 				continue
 
-			classes = div.get("class", [])
+			div_classes = classes(div)
 
 			# Skip incorrect cells
-			if "score_incorrect" in classes:
+			if "score_incorrect" in div_classes:
 				continue
 
 			# Only accept `score_correct`
-			if "score_correct" not in classes and "score_first" not in classes:
+			if "score_correct" not in div_classes and "score_first" not in div_classes:
 				continue
 
 			# Has time + tries inside
-			time_text = div.contents[0].strip()
+			time_text = (div.text or "").strip()
 
 			# Empty or non-number → skip
 			if not time_text.isdigit():
@@ -88,51 +95,62 @@ def parse_domjudge(url):
 			time_sec = min_to_sec(time_min)
 
 			# Find tries in <span>… "2 tries"
-			span = div.find("span")
+			span = find(div, "span")
 			tries = None
-			if span:
-				m = re.search(r"(\d+)\s+tr", span.text.strip())
+			if span is not None:
+				m = re.search(r"(\d+)\s+tr", full_text(span).strip())
 				if m:
 					tries = int(m.group(1))
 
 			if tries is None:
 				continue
 
-			is_first = "score_first" in classes
+			is_first = "score_first" in div_classes
 
-			submissions[prob_letter] = {
-				"time": time_sec,
-				"tries": tries,
-				"first": is_first
-			}
+			team.solve(prob_letter, time_sec, tries, is_first)
 
-		teams.append({
-			"name": team_name,
-			"university": university,
-			"submissions": submissions
-		})
+		yield team
 
-	problems = [chr(ord("A") + i) for i in range(problems_count)]
-
-	return {
-		"duration": 5 * 3600,  # NAC and most DOMjudge ICPCs are 5h
-		"freeze": 4 * 3600,  # NAC and most DOMjudge ICPCs are 5h
-		"problems": problems,
-		"teams": teams
-	}
+	if problems_count is None:
+		raise ParseError("No DOMjudge rows found.")
 
 
 if __name__ == "__main__":
-	if len(sys.argv) != 3:
-		print("Usage: python domjudge_to_replay_json.py <domjudge-scoreboard-url> <output.json>")
+	args = sys.argv[1:]
+	profile = profile_from_args(args)
+	minify = "--minify" in args
+	if minify:
+		args.remove("--minify")
+	verify = "--verify" in args
+	if verify:
+		args.remove("--verify")
+
+	if len(args) != 2:
+		print("Usage: python domjudge_to_replay_json.py <domjudge-scoreboard-url> <output.json> [--minify] [--verify] [--profile [FILE.pstats]]")
 		sys.exit(1)
 
-	url = sys.argv[1]
-	outfile = sys.argv[2]
+	url = args[0]
+	outfile = args[1]
 
-	data = parse_domjudge(url)
+	print(f"Fetching {url} ...")
+	contest, teams = stream_domjudge(url)
 
-	with open(outfile, "w") as f:
-		json.dump(data, f, indent=2)
+	try:
+		stream_replay(contest, teams, outfile, minify=minify, profile=profile)
+	except ParseError as e:
+		print(f"ERROR: {e}")
+		sys.exit(1)
 
 	print(f"Saved replay JSON to {outfile}")
+
+	mismatches = []
+	if verify:
+		import replay_verify
+		with stage(profile, "verify"):
+			mismatches = replay_verify.verify(contest)
+		replay_verify.report(mismatches)
+
+	if profile is not None:
+		profile.finish()
+	if mismatches:
+		sys.exit(1)
@@ -0,0 +1,645 @@
+"""
+Synthetic scoreboard pages for load-testing the converters.
+
+Generates one random contest (any number of teams, up to 26 problems, with
+plenty of first-to-solve cells and wrong tries) and renders it in the markup
+of every format the project parses:
+
+    domjudge      DOMjudge tr#team:N rows, score_correct / score_first divs
+    domjudge_euc  DOMjudge with tr[data-team-id] and td.score_cell
+    pc2           PC2 yes / no cells with "tries/minutes"
+    kattis        Kattis table.standings-table
+    nerc          NEERC / PCMS tr.row01 rows with <i>+N<s>M:SS</s></i>
+    boca          BOCA table#myscoretable, sitegroup1 rows plus duplicates
+    polish        grid1 / grid3 / result-cell layout (EUC 2026)
+    apac          APAC livesite team-row layout
+    naipc16       NAIPC 2016 table#standings
+
+Next to each page it writes the replay JSON the parser is expected to
+produce, so a large run is also a round-trip check.
+
+Usage:
+    python gen_scoreboard.py <format|all> <teams> <problems> <outdir> [--seed N] [--check] [--api]
+
+Pages go to <outdir>/<format>/<teams>x<problems>.html (+ .expected.json),
+the layout bench_parsers.py reads. --check parses each page and compares it
+with the expected JSON. --api also writes the contest as a mock CCS Contest
+API under <outdir>/api, for snapshot_server.py --api and contest_api.py.
+"""
+
+import html
+import json
+import os
+import random
+import sys
+
+DURATION = 5 * 3600
+FREEZE = 4 * 3600
+
+ADJECTIVES = ["Fallen", "Silent", "Rapid", "Binary", "Lazy", "Greedy", "Dynamic", "Recursive",
+              "Sparse", "Frozen", "Polynomial", "Stochastic", "Żółty", "Électrique", "Старый"]
+NOUNS = ["Star", "Segment Tree", "Penguins", "Wombats", "Bitset", "Heap", "Dragons",
+         "Tourists", "Ducks", "Knights", "Lambda", "Monoid"]
+CITIES = ["Warsaw", "Moscow", "Austin", "Kraków", "São Paulo", "Tokyo", "Seoul", "Zürich",
+          "Toronto", "Lisbon", "Sydney", "Haifa", "Tartu", "Porto"]
+
+
+# ----------------------------------------
+# Random contest
+# ----------------------------------------
+
+def synthetic_contest(teams, problems, seed=0, duration=DURATION):
+    """
+    A contest as a list of teams in rank order. Each team has a cell per
+    problem: None (no attempt) or {"tries", "time" (seconds, None if never
+    accepted), "first"}.
+    """
+    if not 1 <= problems <= 26:
+        raise ValueError("problems must be between 1 and 26")
+
+    rng = random.Random(seed)
+    letters = [chr(ord("A") + i) for i in range(problems)]
+    difficulty = [rng.uniform(0.05, 0.95) for _ in letters]
+
+    result = []
+    for i in range(teams):
+        strength = rng.betavariate(2, 3)
+        city = rng.choice(CITIES)
+        university = f"University of {city} {i // 3 + 1}"
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i + 1}"
+
+        cells = []
+        for d in difficulty:
+            if rng.random() < strength * (1.2 - d):
+                # Wrong tries have a long tail
+                wrong = min(int(rng.expovariate(0.8 + strength)), 40)
+                time = rng.randrange(60, duration - 60)
+                cells.append({"tries": wrong + 1, "time": time, "first": False})
+            elif rng.random() < 0.25:
+                cells.append({"tries": 1 + int(rng.expovariate(0.5)), "time": None, "first": False})
+            else:
+                cells.append(None)
+
+        result.append({"name": name, "university": university, "cells": cells})
+
+    # First to solve: earliest accepted time per problem
+    for p in range(problems):
+        solvers = [t for t in result if t["cells"][p] and t["cells"][p]["time"] is not None]
+        if solvers:
+            min(solvers, key=lambda t: t["cells"][p]["time"])["cells"][p]["first"] = True
+
+    rank_teams(result)
+    return {"problems": letters, "duration": duration, "teams": result}
+
+
+def rank_teams(teams):
+    """Fill in solved, penalty (minutes) and rank, and sort `teams` into rank order."""
+    for t in teams:
+        solved = [c for c in t["cells"] if c and c["time"] is not None]
+        t["solved"] = len(solved)
+        t["penalty"] = sum(c["time"] // 60 + 20 * (c["tries"] - 1) for c in solved)
+
+    teams.sort(key=lambda t: (-t["solved"], t["penalty"], t["name"]))
+    for rank, t in enumerate(teams, 1):
+        t["rank"] = rank
+
+
+def solved_cells(team, letters):
+    for letter, c in zip(letters, team["cells"]):
+        if c and c["time"] is not None:
+            yield letter, c
+
+
+def submission(time, tries, first=False):
+    """A submission in the replay schema: "first" only when it is true."""
+    return {"time": time, "tries": tries, "first": True} if first else {"time": time, "tries": tries}
+
+
+def esc(s):
+    return html.escape(s, quote=True)
+
+
+def page(body):
+    return ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Standings</title></head>"
+            f"<body>\n{body}\n</body></html>\n")
+
+
+def tries_text(n):
+    return f"{n} {'try' if n == 1 else 'tries'}"
+
+
+# ----------------------------------------
+# DOMjudge
+# ----------------------------------------
+
+def domjudge_cell(c):
+    if c is None:
+        return '<td class="score_cell"><a><div class="score_neutral">&nbsp;</div></a></td>'
+    if c["time"] is None:
+        return (f'<td class="score_cell"><a><div class="score_incorrect">&nbsp;'
+                f'<span>{tries_text(c["tries"])}</span></div></a></td>')
+    cls = "score_correct score_first" if c["first"] else "score_correct"
+    return (f'<td class="score_cell"><a><div class="{cls}">{c["time"] // 60}'
+            f'<span>{tries_text(c["tries"])}</span></div></a></td>')
+
+
+def render_domjudge(contest):
+    rows = []
+    for i, t in enumerate(contest["teams"]):
+        rows.append(
+            f'<tr class="sortorderswitch" id="team:{i + 1}">'
+            f'<td class="scorepl">{t["rank"]}</td><td class="heart"></td>'
+            f'<td class="scoreaf"><img src="/logos/{i + 1}.png" alt=""></td>'
+            f'<td class="scoretn cl_FFFFFF"><a href="/team/{i + 1}">{esc(t["name"])}</a></td>'
+            f'<td class="scorenc">{t["solved"]}</td><td class="scorett">{t["penalty"]}</td>'
+            + "".join(domjudge_cell(c) for c in t["cells"]) + "</tr>")
+    head = "".join(f'<th class="score_cell">{p}</th>' for p in contest["problems"])
+    return page(f'<table class="scoreboard"><thead><tr><th>rank</th><th></th><th></th><th>team</th>'
+                f'<th>score</th><th></th>{head}</tr></thead><tbody>\n' + "\n".join(rows)
+                + "\n</tbody></table>")
+
+
+def render_domjudge_euc(contest):
+    rows = []
+    for i, t in enumerate(contest["teams"]):
+        rows.append(
+            f'<tr data-team-id="{i + 1}">'
+            f'<td class="scorepl">{t["rank"]}</td>'
+            f'<td class="scoreaf"><img src="/logos/{i + 1}.png" alt=""></td>'
+            f'<td class="scoretn"><a href="/team/{i + 1}">{esc(t["name"])}</a></td>'
+            f'<td class="scorenc">{t["solved"]}</td><td class="scorett">{t["penalty"]}</td>'
+            + "".join(domjudge_cell(c) for c in t["cells"]) + "</tr>")
+    return page('<table class="scoreboard"><tbody>\n' + "\n".join(rows) + "\n</tbody></table>")
+
+
+def expected_domjudge(contest):
+    return {
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["name"],
+            "university": t["name"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"], c["first"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# PC2
+# ----------------------------------------
+
+def render_pc2(contest):
+    head = "".join(f"<th>{p}</th>" for p in contest["problems"])
+    rows = [f"<tr><th>Rank</th><th>Name</th><th>Solved</th><th>Time</th>{head}<th>Total att/solv</th></tr>"]
+    for i, t in enumerate(contest["teams"]):
+        cells = []
+        attempts = 0
+        for c in t["cells"]:
+            if c is None:
+                cells.append('<td class="center">&nbsp;</td>')
+            elif c["time"] is None:
+                cells.append(f'<td class="no">{c["tries"]}/--</td>')
+            else:
+                cells.append(f'<td class="yes">{c["tries"]}/{c["time"] // 60}</td>')
+            attempts += c["tries"] if c else 0
+        rows.append(f'<tr><td>{t["rank"]}</td><td>{i + 1} {esc(t["university"])}</td>'
+                    f'<td>{t["solved"]}</td><td>{t["penalty"]}</td>{"".join(cells)}'
+                    f'<td>{attempts}/{t["solved"]}</td></tr>')
+    return page('<table border="1">\n' + "\n".join(rows) + "\n</table>")
+
+
+def expected_pc2(contest):
+    return {
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["university"],
+            "university": t["university"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# Kattis
+# ----------------------------------------
+
+def kattis_cell(c):
+    if c is None:
+        return "<td></td>"
+    if c["time"] is None:
+        cls, time = "attempted", "--"
+    else:
+        cls, time = ("solved first" if c["first"] else "solved"), f'{c["time"] // 60} min'
+    return (f'<td><span class="{cls}"><span class="standings-table-result-cell-primary">{c["tries"]}</span>'
+            f'<span class="standings-table-result-cell-time">{time}</span></span></td>')
+
+
+def render_kattis(contest):
+    head = "".join(f"<th>{p}</th>" for p in contest["problems"])
+    rows = []
+    for t in contest["teams"]:
+        rows.append(f'<tr><td>{t["rank"]}</td><td><a href="#">{esc(t["name"])}</a></td>'
+                    f'<td><img src="flag.png" alt=""></td><td>{t["solved"]}</td><td>{t["penalty"]}</td>'
+                    + "".join(kattis_cell(c) for c in t["cells"]) + "</tr>")
+    return page(f'<table class="standings-table"><thead><tr><th>Rank</th><th>Team</th><th></th>'
+                f'<th>Slv.</th><th>Time</th>{head}</tr></thead><tbody>\n' + "\n".join(rows)
+                + "\n</tbody></table>")
+
+
+def expected_kattis(contest):
+    return {
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["name"],
+            "university": t["name"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"], c["first"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# NEERC / PCMS
+# ----------------------------------------
+
+def nerc_cell(c):
+    if c is None:
+        return "<td>.</td>"
+    if c["time"] is None:
+        return f'<td><b>-{c["tries"]}</b></td>'
+    wrong = c["tries"] - 1
+    cls = ' class="first-to-solve"' if c["first"] else ""
+    return (f'<td><i{cls}>+{wrong if wrong else ""}<s><br>'
+            f'{c["time"] // 60}:{c["time"] % 60:02d}</s></i></td>')
+
+
+def nerc_party(t):
+    return f'{t["university"]}: {t["name"]} (Ivanov, Petrov, Sidorov)'
+
+
+def render_nerc(contest):
+    head = "".join(f"<th>{p}</th>" for p in contest["problems"])
+    rows = [f'<tr class="header"><th>Rank</th><th>Party</th>{head}<th>=</th><th>Time</th><th></th></tr>']
+    for i, t in enumerate(contest["teams"]):
+        rows.append(f'<tr class="row{(i // 2) % 2}{i % 2}"><td class="rankl">{t["rank"]}</td>'
+                    f'<td class="party">{esc(nerc_party(t))}</td>'
+                    + "".join(nerc_cell(c) for c in t["cells"])
+                    + f'<td>{t["solved"]}</td><td class="penalty">{t["penalty"]}</td> '
+                    f'<td class="rank"></td></tr>')
+    return page('<table class="standings">\n' + "\n".join(rows) + "\n</table>")
+
+
+def expected_nerc(contest):
+    teams = []
+    for t in contest["teams"]:
+        submissions = {}
+        for p, c in solved_cells(t, contest["problems"]):
+            submissions[p] = submission(c["time"], c["tries"], c["first"])
+        teams.append({"name": nerc_party(t), "university": t["university"], "logo": "",
+                      "submissions": submissions})
+    return {"name": "NERC 2024", "duration": DURATION, "freeze": FREEZE,
+            "problems": contest["problems"], "teams": teams}
+
+
+# ----------------------------------------
+# BOCA
+# ----------------------------------------
+
+def boca_name(t):
+    return f'[{t["university"]}] {t["name"]}'
+
+
+def render_boca(contest):
+    head = "".join(f"<td>{p}&nbsp;</td>" for p in contest["problems"])
+    rows = []
+    for i, t in enumerate(contest["teams"]):
+        cells = []
+        for c in t["cells"]:
+            if c is None:
+                cells.append("<td>&nbsp;</td>")
+            elif c["time"] is None:
+                cells.append(f'<td>&nbsp;<font size="-2">{c["tries"]}/-</font></td>')
+            else:
+                cells.append(f'<td><img alt="" width="18" src="balloon.png">'
+                             f'<font size="-2">{c["tries"]}/{c["time"] // 60}</font></td>')
+        row = (f'<td>{t["rank"]}</td><td><a href="#">team{i + 1:04d}</a>/1</td>'
+               f'<td>{esc(boca_name(t))}<br><b>{esc(t["university"])}</b></td>'
+               f'{"".join(cells)}<td>{t["solved"]} ({t["penalty"]})</td>')
+        rows.append(f'<tr class="sitegroup1">{row}</tr>')
+        # Teams also show up in their regional rankings
+        if i % 3 == 0:
+            rows.append(f'<tr class="sitegroup2">{row}</tr>')
+    return page(f'<table id="myscoretable"><thead><tr><td>#</td><td>User/Site</td><td>Name</td>'
+                f'{head}<td>Total</td></tr></thead><tbody>\n' + "\n".join(rows)
+                + "\n</tbody></table>")
+
+
+def expected_boca(contest):
+    return {
+        "name": "ICPC Latin America Championship 2026",
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": boca_name(t),
+            "university": t["university"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# Polish (EUC 2026)
+# ----------------------------------------
+
+def polish_cell(c):
+    if c is None:
+        return '<div class="result-cell"></div>'
+    bombs = f'<span class="result-cell__bombs">+{c["tries"] - 1}</span>' if c["tries"] > 1 else ""
+    if c["time"] is None:
+        return f'<div class="result-cell result-cell--WA">{bombs}</div>'
+    minutes = c["time"] // 60
+    cls = "result-cell result-cell--OK first-solve-badge" if c["first"] else "result-cell result-cell--OK"
+    return (f'<div class="{cls}">{bombs}'
+            f'<span class="result-cell__time">{minutes // 60}:{minutes % 60:02d}</span></div>')
+
+
+def render_polish(contest):
+    head = "".join(f'<div class="result-cell result-cell--header">{p.lower()}<span class="tip"></span></div>'
+                   for p in contest["problems"])
+    blocks = [f'<div class="grid1"><div class="grid3"><div class="contestant__name">Team</div>'
+              f'<div class="results">{head}</div></div></div>']
+    for t in contest["teams"]:
+        blocks.append(f'<div class="grid1"><div class="place">{t["rank"]}</div><div class="grid3">'
+                      f'<div class="contestant__name">{esc(t["name"])}'
+                      f'<div class="contestant__org">{esc(t["university"])}</div></div>'
+                      f'<div class="results">{"".join(polish_cell(c) for c in t["cells"])}</div>'
+                      f'</div></div>')
+    return page('<div class="standings">\n' + "\n".join(blocks) + "\n</div>")
+
+
+def expected_polish(contest):
+    return {
+        "name": "EUC 2026",
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["name"],
+            "university": t["name"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"], c["first"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# APAC livesite
+# ----------------------------------------
+
+def apac_cell(c):
+    if c is None:
+        return ('<div class="team-col team-problem"><div class="team-colored-col-bg"></div>'
+                '<div class="team-colored-col-fg"><span>-</span></div></div>')
+    small = f'<small>(+{c["tries"] - 1})</small>' if c["tries"] > 1 else ""
+    if c["time"] is None:
+        return (f'<div class="team-col team-problem"><div class="team-colored-col-bg bg-rejected"></div>'
+                f'<div class="team-colored-col-fg"><span>-\n{small}</span></div></div>')
+    minutes = c["time"] // 60
+    bg = "bg-solved-first" if c["first"] else "bg-solved"
+    return (f'<div class="team-col team-problem"><div class="team-colored-col-bg {bg}"></div>'
+            f'<div class="team-colored-col-fg"><span>{minutes // 60}:{minutes % 60:02d}\n{small}</span>'
+            f'</div></div>')
+
+
+def render_apac(contest):
+    legend = "".join(f'<div class="team-col team-problem"><span>{p}</span></div>'
+                     for p in contest["problems"])
+    rows = [f'<div class="team-row legend"><div class="team-col team-rank">#</div>'
+            f'<div class="team-col team-name">Team</div><div class="team-problems">{legend}</div></div>',
+            '<div class="standings-teams">']
+    for i, t in enumerate(contest["teams"]):
+        rows.append(f'<div data-key="{i + 1}"><div class="team-row">'
+                    f'<div class="team-col team-rank">{t["rank"]}</div>'
+                    f'<div class="team-col team-name"><a href="#"><span class="team-generic-col-content">'
+                    f'<span title="{esc(t["name"])}">{esc(t["name"])}</span>'
+                    f'<span class="university-name" title="{esc(t["university"])}">{esc(t["university"])}</span>'
+                    f'</span></a></div>'
+                    f'<div class="team-problems">{"".join(apac_cell(c) for c in t["cells"])}</div>'
+                    f'</div></div>')
+    rows.append("</div>")
+    return page("\n".join(rows))
+
+
+def expected_apac(contest):
+    return {
+        "name": "APAC 2026",
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["name"],
+            "university": t["university"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"], c["first"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# NAIPC 2016
+# ----------------------------------------
+
+def naipc_cell(c):
+    if c is None:
+        return "<td>.</td>"
+    if c["time"] is None:
+        return f'<td>-{c["tries"]}</td>'
+    wrong = c["tries"] - 1
+    return f'<td>+{wrong if wrong else ""} {c["time"] // 60}</td>'
+
+
+def render_naipc16(contest):
+    head = "".join(f"<th>{p}</th>" for p in contest["problems"])
+    rows = []
+    for t in contest["teams"]:
+        rows.append(f'<tr><td>{t["rank"]}</td><td>{esc(t["name"])}<br><i>{esc(t["university"])}</i></td>'
+                    f'<td>{t["solved"]}</td><td>{t["penalty"]}</td>'
+                    + "".join(naipc_cell(c) for c in t["cells"]) + "</tr>")
+    return page(f'<table id="standings"><thead><tr>{head}</tr>'
+                f'<tr><th>Rank</th><th>Team</th><th>Solved</th><th>Time</th></tr></thead><tbody>\n'
+                + "\n".join(rows) + "\n</tbody></table>")
+
+
+def expected_naipc16(contest):
+    return {
+        "name": "NAIPC 2016",
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["name"],
+            "university": t["university"],
+            "submissions": {p: {"time": c["time"] // 60 * 60, "tries": c["tries"]}
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+# ----------------------------------------
+# CCS Contest API
+# ----------------------------------------
+
+def contest_api_files(contest, contest_id="synthetic"):
+    """{path under the API root: JSON document} for contest_api.py's endpoints."""
+    base = f"api/v4/contests/{contest_id}"
+    org_ids = {}
+    for t in contest["teams"]:
+        org_ids.setdefault(t["university"], f"org{len(org_ids) + 1}")
+
+    rows = []
+    for t in contest["teams"]:
+        results = []
+        for p, c in zip(contest["problems"], t["cells"]):
+            if c is None:
+                continue
+            result = {"problem_id": p.lower(), "num_judged": c["tries"], "num_pending": 0,
+                      "solved": c["time"] is not None}
+            if c["time"] is not None:
+                result["time"] = c["time"] // 60
+                result["first_to_solve"] = c["first"]
+            results.append(result)
+        rows.append({"rank": t["rank"], "team_id": f"team{t['rank']}",
+                     "score": {"num_solved": t["solved"], "total_time": t["penalty"]},
+                     "problems": results})
+
+    return {
+        base: {"id": contest_id, "name": contest_id, "formal_name": "Synthetic Contest",
+               "duration": "5:00:00.000", "scoreboard_freeze_duration": "1:00:00.000"},
+        f"{base}/problems": [{"id": p.lower(), "label": p, "ordinal": i}
+                             for i, p in enumerate(contest["problems"])],
+        f"{base}/organizations": [{"id": oid, "name": name, "formal_name": name}
+                                  for name, oid in org_ids.items()],
+        f"{base}/teams": [{"id": f"team{t['rank']}", "name": t["name"],
+                           "organization_id": org_ids[t["university"]]} for t in contest["teams"]],
+        f"{base}/scoreboard": {"state": {"ended": "2026-01-01T05:00:00.000+00:00"}, "rows": rows},
+    }
+
+
+def expected_contest_api(contest):
+    return {
+        "name": "Synthetic Contest",
+        "duration": DURATION,
+        "freeze": FREEZE,
+        "problems": contest["problems"],
+        "teams": [{
+            "name": t["name"],
+            "university": t["university"],
+            "submissions": {p: submission(c["time"] // 60 * 60, c["tries"], c["first"])
+                            for p, c in solved_cells(t, contest["problems"])},
+        } for t in contest["teams"]],
+    }
+
+
+def write_contest_api(contest, outdir, contest_id="synthetic"):
+    """Write the endpoint files under <outdir>/api (for snapshot_server.py --api)."""
+    for path, doc in contest_api_files(contest, contest_id).items():
+        full = os.path.join(outdir, *path.split("/")) + ".json"
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False)
+    with open(os.path.join(outdir, "api", f"{contest_id}.expected.json"), "w", encoding="utf-8") as f:
+        json.dump(expected_contest_api(contest), f, ensure_ascii=False)
+    return os.path.join(outdir, "api")
+
+
+GENERATORS = {
+    "domjudge": (render_domjudge, expected_domjudge),
+    "domjudge_euc": (render_domjudge_euc, expected_domjudge),
+    "pc2": (render_pc2, expected_pc2),
+    "kattis": (render_kattis, expected_kattis),
+    "nerc": (render_nerc, expected_nerc),
+    "boca": (render_boca, expected_boca),
+    "polish": (render_polish, expected_polish),
+    "apac": (render_apac, expected_apac),
+    "naipc16": (render_naipc16, expected_naipc16),
+}
+
+
+def generate(fmt, contest):
+    """(html, expected replay dict) for one format."""
+    render, expected = GENERATORS[fmt]
+    return render(contest), expected(contest)
+
+
+def write_format(fmt, contest, outdir):
+    page_html, expected = generate(fmt, contest)
+    fmt_dir = os.path.join(outdir, fmt)
+    os.makedirs(fmt_dir, exist_ok=True)
+
+    base = os.path.join(fmt_dir, f"{len(contest['teams'])}x{len(contest['problems'])}")
+    with open(base + ".html", "w", encoding="utf-8") as f:
+        f.write(page_html)
+    with open(base + ".expected.json", "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False)
+    return base + ".html", expected
+
+
+def check(fmt, path, expected):
+    """True if parsing the page gives exactly the expected replay dict."""
+    import contextlib
+    import io
+
+    import replay_formats
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        data = replay_formats.convert(fmt, path)
+    return data == expected
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    do_check = "--check" in args
+    if do_check:
+        args.remove("--check")
+    do_api = "--api" in args
+    if do_api:
+        args.remove("--api")
+
+    seed = 0
+    if "--seed" in args:
+        i = args.index("--seed")
+        seed = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) != 4 or (args[0] != "all" and args[0] not in GENERATORS):
+        print("Usage: python gen_scoreboard.py <format|all> <teams> <problems> <outdir> "
+              "[--seed N] [--check] [--api]")
+        print(f"Formats: {', '.join(GENERATORS)}")
+        sys.exit(1)
+
+    formats = list(GENERATORS) if args[0] == "all" else [args[0]]
+    contest = synthetic_contest(int(args[1]), int(args[2]), seed)
+
+    failed = False
+    for fmt in formats:
+        path, expected = write_format(fmt, contest, args[3])
+        status = ""
+        if do_check:
+            ok = check(fmt, path, expected)
+            failed = failed or not ok
+            status = " round-trip ok" if ok else " ROUND-TRIP MISMATCH"
+        print(f"Wrote {path} ({os.path.getsize(path) // 1024} KB){status}")
+
+    if do_api:
+        print(f"Wrote a mock Contest API to {write_contest_api(contest, args[3])}")
+
+    sys.exit(1 if failed else 0)
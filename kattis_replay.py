@@ -1,6 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+from scoreboard_rows import iter_rows, text, full_text, classes, find, find_all, ancestor
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+from replay_model import Contest, ParseError
+from live_follow import follow, parse_follow_args
+from replay_incremental import IncrementalParser
 import re
 import sys
 
@@ -10,105 +13,152 @@ def min_to_sec(min_str):
     m = int(min_str.replace("min","").strip())
     return m * 60
 
-def parse_kattis_standings(url):
+def is_standings_row(row):
+    table = ancestor(row, "table")
+    if table is None or "standings-table" not in classes(table):
+        return False
+    return ancestor(row, "tbody") is not None
+
+def stream_kattis_standings(url):
+    import requests
+
     print(f"Fetching {url} ...")
     html = requests.get(url).text
-    soup = BeautifulSoup(html, "html.parser")
+    return stream_kattis_html(html)
 
-    table = soup.find("table", class_="standings-table")
-    if not table:
-        print("ERROR: Could not find standings table.")
-        sys.exit(1)
+def parse_kattis_standings(url):
+    return collect_replay(*stream_kattis_standings(url))
+
+def parse_kattis_html(html):
+    return collect_replay(*stream_kattis_html(html))
+
+def stream_kattis_html(html):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set with the first row.
+    """
+    # Kattis NAC uses 5 hr contest
+    contest = Contest(duration=5 * 3600, freeze=4 * 3600)
+    return contest, iter_kattis_teams(html, contest)
 
-    rows = table.find("tbody").find_all("tr")
+def iter_kattis_teams(html, contest):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+
+    rows = iter_rows(html, "tr", is_standings_row)
 
     problems_count = None
-    teams = []
 
     for row in rows:
-        cells = row.find_all("td")
+        cells = find_all(row, "td")
 
         if not cells:
             continue
 
-        rank = int(cells[0].text.strip())
-        team_name = cells[1].get_text(" ", strip=True)
+        rank = int(full_text(cells[0]).strip())
+        team_name = text(cells[1], " ")
         university = team_name  # Kattis doesn't include clean affiliation
-        solved = int(cells[3].text.strip())
-        penalty = int(cells[4].text.strip())
+        solved = int(full_text(cells[3]).strip())
+        penalty = int(full_text(cells[4]).strip())
 
         # the problem columns start at index 5
         problem_cells = cells[5:]
 
         if problems_count is None:
             problems_count = len(problem_cells)
+            contest.set_problems([chr(ord("A") + i) for i in range(problems_count)])
 
-        submissions = {}
+        team = contest.add_team(team_name, university)
+        team.report(rank, solved, penalty)
 
         for idx, pc in enumerate(problem_cells):
             prob_letter = chr(ord("A") + idx)
 
-            span = pc.find("span")
-            if not span:
+            span = find(pc, "span")
+            if span is None:
                 continue
 
             # Check if solved
-            is_solved = "solved" in span.get("class", []) or "first" in span.get("class", [])
+            span_classes = classes(span)
+            is_solved = "solved" in span_classes or "first" in span_classes
 
             if not is_solved:
                 continue
 
             # Tries
-            tries_el = pc.find("span", class_="standings-table-result-cell-primary")
-            time_el = pc.find("span", class_="standings-table-result-cell-time")
+            tries_el = find(pc, "span", "standings-table-result-cell-primary")
+            time_el = find(pc, "span", "standings-table-result-cell-time")
 
-            if not tries_el or not time_el:
+            if tries_el is None or time_el is None:
                 continue
 
-            tries = int(tries_el.text.strip())
-            timestr = time_el.text.strip()
+            tries = int(full_text(tries_el).strip())
+            timestr = full_text(time_el).strip()
             time_sec = min_to_sec(timestr)
 
             if time_sec is None:
                 continue  # invalid / ---
 
-            is_first = "first" in span.get("class", [])
-
-            submissions[prob_letter] = {
-                "tries": tries,
-                "time": time_sec,
-                "first": is_first
-            }
+            is_first = "first" in span_classes
 
-        teams.append({
-            "name": team_name,
-            "university": university,
-            "submissions": submissions
-        })
+            team.solve(prob_letter, time_sec, tries, is_first)
 
-    problems = [chr(ord("A") + i) for i in range(problems_count)]
+        yield team
 
-    result = {
-        "duration": 5 * 3600,   # Kattis NAC uses 5 hr contest
-        "freeze": 4 * 3600,   # Kattis NAC uses 5 hr contest
-        "problems": problems,
-        "teams": teams
-    }
-
-    return result
+    if problems_count is None:
+        raise ParseError("Could not find standings table.")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python kattis_to_replay_json.py <kattis-standings-url> <output.json>")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    follow_interval = parse_follow_args(args)
+
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+    verify = "--verify" in args
+    if verify:
+        args.remove("--verify")
+
+    if len(args) != 2:
+        print("Usage: python kattis_to_replay_json.py <kattis-standings-url> <output.json> [--follow [SECONDS]] [--minify] [--verify] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    url = sys.argv[1]
-    out = sys.argv[2]
+    url = args[0]
+    out = args[1]
+
+    if follow_interval is not None:
+        # Successive pages differ in a few rows; only those are reparsed
+        parser = IncrementalParser("kattis")
+        parse = parser.parse_html
+        if verify:
+            import replay_verify
+            parse = replay_verify.checked(parser.stream_html)
+        follow(url, parse, out, follow_interval, profile=profile)
+        if profile is not None:
+            profile.finish()
+        sys.exit(0)
+
+    with stage(profile, "fetch"):
+        contest, teams = stream_kattis_standings(url)
+
+    try:
+        stream_replay(contest, teams, out, minify=minify, profile=profile)
+    except ParseError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
 
-    data = parse_kattis_standings(url)
+    print(f"Saved replay JSON to {out}")
 
-    with open(out, "w") as f:
-        json.dump(data, f, indent=2)
+    mismatches = []
+    if verify:
+        import replay_verify
+        with stage(profile, "verify"):
+            mismatches = replay_verify.verify(contest)
+        replay_verify.report(mismatches)
 
-    print(f"Saved replay JSON to {out}")
+    if profile is not None:
+        profile.finish()
+    if mismatches:
+        sys.exit(1)
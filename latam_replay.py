@@ -2,7 +2,7 @@
 Converts a BOCA HTML scoreboard to the replay JSON format.
 
 Usage:
-    python parse_boca.py <input.html> <output.json>
+    python parse_boca.py <input.html> <output.json> [--minify]
 
 Notes:
 - BOCA encodes problem results as colored balloon images.
@@ -17,8 +17,10 @@ Notes:
   Freeze:   4 hours (14400 seconds)  — last hour frozen
 """
 
-from bs4 import BeautifulSoup
-import json
+from scoreboard_rows import iter_rows, text, classes, find, find_all, ancestor
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+from replay_model import Contest
 import sys
 import re
 
@@ -27,64 +29,71 @@ DURATION = 18000   # 5 hours in seconds
 FREEZE   = 14400   # 4 hours in seconds (freeze starts at 4h, last 1h frozen)
 
 
+def in_score_table(row):
+    table = ancestor(row, "table")
+    return table is not None and table.get("id") == "myscoretable"
+
+
 def parse_boca_html(html: str) -> dict:
-    soup = BeautifulSoup(html, "html.parser")
+    return collect_replay(*stream_boca_html(html))
 
-    # Find the score table
-    table = soup.find("table", id="myscoretable")
-    if not table:
-        raise ValueError("Could not find score table with id='myscoretable'")
 
-    # Determine problem letters from header row
-    header_row = table.find("tr")
-    header_cells = header_row.find_all("td")
-    # Header cells: #, User/Site, Name, A, B, C, ..., Total
-    # Find the problem columns: cells between index 3 and last (Total)
-    problems = []
-    for cell in header_cells[3:-1]:
-        letter = cell.get_text(strip=True).replace('\xa0', '').strip()
-        if letter:
-            problems.append(letter)
+def stream_boca_html(html: str) -> tuple:
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set from the header row.
+    """
+    contest = Contest("ICPC Latin America Championship 2026", DURATION, FREEZE)
+    return contest, iter_boca_teams(html, contest)
+
 
+def iter_boca_teams(html: str, contest: Contest):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+
+    problems = None
     seen_team_ids = set()
-    teams = []
 
-    all_rows = table.find("tbody").find_all("tr")
+    for row in iter_rows(html, "tr", in_score_table):
+        # Determine problem letters from the header row (the table's first row)
+        if problems is None:
+            header_cells = find_all(row, "td")
+            # Header cells: #, User/Site, Name, A, B, C, ..., Total
+            # Find the problem columns: cells between index 3 and last (Total)
+            problems = []
+            for cell in header_cells[3:-1]:
+                letter = text(cell).replace('\xa0', '').strip()
+                if letter:
+                    problems.append(letter)
+            contest.set_problems(problems)
+
+        if ancestor(row, "tbody") is None:
+            continue
 
-    for row in all_rows:
         # Only process rows in the overall ranking (sitegroup1)
-        classes = row.get("class", [])
-        if "sitegroup1" not in classes:
+        if "sitegroup1" not in classes(row):
             continue
 
-        cells = row.find_all("td")
+        cells = find_all(row, "td")
         if len(cells) < 4:
             continue
 
         # Team identifier: the link text inside the site cell (cell index 1)
         site_cell = cells[1]
-        link = site_cell.find("a")
-        team_id = link.get_text(strip=True) if link else site_cell.get_text(strip=True)
+        link = find(site_cell, "a")
+        team_id = text(link) if link is not None else text(site_cell)
         team_id = team_id.strip()
 
         if team_id in seen_team_ids:
             continue
         seen_team_ids.add(team_id)
 
-        # Team name: cell index 2 — grab text nodes before any <br> or <b> tag
+        # Team name: cell index 2 — the text before any <br> or <b> tag
         name_cell = cells[2]
-        from bs4 import NavigableString
-        raw_name = ""
-        for content in name_cell.contents:
-            if isinstance(content, NavigableString):
-                raw_name += str(content)
-            else:
-                # Stop at the first tag (br, b, etc.)
-                break
-        team_name = raw_name.strip()
+        team_name = (name_cell.text or "").strip()
         if not team_name:
             # Fallback: first line of text
-            team_name = name_cell.get_text(" ", strip=True).split("\n")[0].strip()
+            team_name = text(name_cell, " ").split("\n")[0].strip()
 
         # Parse university from brackets: e.g. "[UFMG] ooga booga" -> "UFMG"
         university = team_name
@@ -93,18 +102,18 @@ def parse_boca_html(html: str) -> dict:
             university = m.group(1)
 
         # Problem cells: indices 3 to 3+len(problems)-1
-        submissions = {}
+        team = contest.add_team(team_name, university)
         prob_cells = cells[3 : 3 + len(problems)]
 
         for i, pc in enumerate(prob_cells):
             prob_letter = problems[i]
 
             # Check if there's a balloon image (= accepted)
-            img = pc.find("img")
-            text = pc.get_text(strip=True).replace('\xa0', '').strip()
+            img = find(pc, "img")
+            cell_text = text(pc).replace('\xa0', '').strip()
 
             # Parse the "tries/time" text, e.g. "2/124" or "3/-"
-            match = re.search(r'(\d+)/(-|\d+)', text)
+            match = re.search(r'(\d+)/(-|\d+)', cell_text)
             if not match:
                 continue  # empty cell, no attempt
 
@@ -118,42 +127,39 @@ def parse_boca_html(html: str) -> dict:
             time_min = int(time_str)
             time_sec = time_min * 60
 
-            submissions[prob_letter] = {
-                "tries": tries,
-                "time": time_sec,
-                "first": False   # BOCA HTML doesn't distinguish first-solve; set False
-            }
+            # BOCA HTML doesn't distinguish first-solve
+            team.solve(prob_letter, time_sec, tries)
 
-        teams.append({
-            "name": team_name,
-            "university": university,
-            "submissions": submissions
-        })
+        yield team
 
-    return {
-        "name": "ICPC Latin America Championship 2026",
-        "duration": DURATION,
-        "freeze": FREEZE,
-        "problems": problems,
-        "teams": teams
-    }
+    if problems is None:
+        raise ValueError("Could not find score table with id='myscoretable'")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python parse_boca.py <input.html> <output.json>")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+
+    if len(args) != 2:
+        print("Usage: python parse_boca.py <input.html> <output.json> [--minify] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    html_path = sys.argv[1]
-    out_path  = sys.argv[2]
+    html_path = args[0]
+    out_path  = args[1]
 
-    with open(html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    with stage(profile, "read"):
+        with open(html_path, "rb") as f:
+            html = f.read()
 
-    data = parse_boca_html(html)
+    contest, teams = stream_boca_html(html)
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    count = stream_replay(contest, teams, out_path, minify=minify, profile=profile)
 
-    print(f"Parsed {len(data['teams'])} teams, {len(data['problems'])} problems.")
+    print(f"Parsed {count} teams, {len(contest.problems)} problems.")
     print(f"Saved to {out_path}")
+
+    if profile is not None:
+        profile.finish()
@@ -0,0 +1,182 @@
+"""
+Follow a live scoreboard page and stream only what changed.
+
+follow() polls a URL with one persistent requests.Session, sending the
+ETag / Last-Modified validators from the previous response. A 304, or a
+200 whose body hashes the same as last time, is skipped without parsing.
+
+The first snapshot is written as a full replay JSON (save_replay). Every
+later change is appended to <output>.deltas.ndjson, one line per changed
+cell:
+
+    {"seq": 7, "team": "HSE: FFTilted", "problem": "C", "submission": {"time": 13740, "tries": 2}}
+    {"seq": 7, "team": "New Team", "added": {...full team record...}}
+    {"seq": 9, "team": "Gone Team", "removed": true}
+
+"seq" is the poll that saw the change. A "submission" of null means the
+cell went back to unsolved (e.g. a rejudge). A failed fetch or a page the
+parser rejects (an error or maintenance page) is logged and skipped; the
+deltas continue from the last page that parsed.
+
+kattis_replay.py and neerc_replay.py expose this as --follow. To try it
+offline, serve recorded pages with snapshot_server.py.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+from replay_output import save_replay
+from replay_profile import stage
+
+
+def deltas_path(outfile):
+    return os.path.splitext(outfile)[0] + ".deltas.ndjson"
+
+
+def diff_replays(old, new):
+    """List of per-cell changes turning `old` into `new`."""
+    old_teams = {t["name"]: t for t in old["teams"]}
+    new_teams = {t["name"]: t for t in new["teams"]}
+    changes = []
+
+    for name, team in new_teams.items():
+        before = old_teams.get(name)
+        if before is None:
+            changes.append({"team": name, "added": team})
+            continue
+        for prob in new["problems"]:
+            cell = team["submissions"].get(prob)
+            if cell != before["submissions"].get(prob):
+                changes.append({"team": name, "problem": prob, "submission": cell})
+
+    for name in old_teams:
+        if name not in new_teams:
+            changes.append({"team": name, "removed": True})
+
+    return changes
+
+
+class Poller:
+    """Conditional GETs against one URL, remembering validators and body hash."""
+
+    def __init__(self, url, session=None):
+        if session is None:
+            import requests
+
+            session = requests.Session()
+        self.url = url
+        self.session = session
+        self.etag = None
+        self.last_modified = None
+        self.body_hash = None
+        self.stats = {"polls": 0, "not_modified": 0, "unchanged": 0, "changed": 0}
+
+    def poll(self):
+        """Return the page text if it changed since the last poll, else None."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        resp = self.session.get(self.url, headers=headers, timeout=30)
+        self.stats["polls"] += 1
+
+        if resp.status_code == 304:
+            self.stats["not_modified"] += 1
+            return None
+        resp.raise_for_status()
+
+        self.etag = resp.headers.get("ETag", self.etag)
+        self.last_modified = resp.headers.get("Last-Modified", self.last_modified)
+
+        body_hash = hashlib.sha256(resp.content).hexdigest()
+        if body_hash == self.body_hash:
+            self.stats["unchanged"] += 1
+            return None
+        self.body_hash = body_hash
+
+        self.stats["changed"] += 1
+        return resp.text
+
+
+def follow(url, parse_html, outfile, interval=5.0, max_polls=None, session=None, profile=None):
+    """
+    Poll `url` every `interval` seconds, parse changed pages with
+    parse_html(text) and write the full replay once plus deltas after.
+    Runs until interrupted, or for `max_polls` polls. Returns the poller
+    (for its stats) and the latest replay dict. A replay_profile.Profile
+    accumulates fetch, parse, diff and write time over all polls.
+    """
+    import requests
+
+    poller = Poller(url, session)
+    current = None
+    seq = 0
+
+    try:
+        while max_polls is None or seq < max_polls:
+            seq += 1
+            started = time.monotonic()
+
+            try:
+                with stage(profile, "fetch"):
+                    html = poller.poll()
+            except requests.RequestException as e:
+                print(f"[{seq}] fetch failed: {e}", file=sys.stderr)
+                html = None
+            if profile is not None:
+                profile.count("polls")
+
+            data = None
+            if html is not None:
+                try:
+                    with stage(profile, "parse"):
+                        data = parse_html(html)
+                except (Exception, SystemExit) as e:
+                    # A maintenance or error page; keep the last good
+                    # snapshot and try again at the next poll
+                    print(f"[{seq}] parse failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+            if data is not None:
+                if current is None:
+                    save_replay(data, outfile, profile=profile)
+                    # Start a fresh delta stream on top of the new base
+                    open(deltas_path(outfile), "w").close()
+                    print(f"[{seq}] saved full replay to {outfile}", file=sys.stderr)
+                else:
+                    with stage(profile, "diff"):
+                        changes = diff_replays(current, data)
+                    with stage(profile, "write"):
+                        with open(deltas_path(outfile), "a", encoding="utf-8") as f:
+                            for change in changes:
+                                f.write(json.dumps({"seq": seq, **change}, ensure_ascii=False) + "\n")
+                    print(f"[{seq}] {len(changes)} changed cells", file=sys.stderr)
+                current = data
+
+            if max_polls is not None and seq >= max_polls:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+
+    return poller, current
+
+
+def parse_follow_args(argv):
+    """Pop "--follow [SECONDS]" from argv; returns the interval or None."""
+    if "--follow" not in argv:
+        return None
+    i = argv.index("--follow")
+    interval = 5.0
+    if i + 1 < len(argv):
+        try:
+            interval = float(argv[i + 1])
+            del argv[i + 1]
+        except ValueError:
+            pass
+    del argv[i]
+    return interval
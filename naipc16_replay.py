@@ -1,56 +1,67 @@
 
-import json
-from bs4 import BeautifulSoup
+from scoreboard_rows import iter_rows, text, find_all, ancestor
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args
+from replay_model import Contest
 import sys
 import re
 
 CONTEST_DURATION = 300 * 60
 FREEZE_TIME = 240 * 60
 
-def parse_naipc_2016_from_file(path):
-    html = open(path, "r", encoding="utf-8").read()
-    soup = BeautifulSoup(html, "html.parser")
-
-    table = soup.find("table", id="standings")
-    if not table:
-        raise RuntimeError("standings table not found")
+def in_standings(row):
+    table = ancestor(row, "table")
+    return table is not None and table.get("id") == "standings"
 
-    # ---- extract problems from SECOND header row ----
-    thead = table.find("thead")
-    header_rows = thead.find_all("tr")
-    # if len(header_rows) < 2:
-    #     raise RuntimeError("unexpected header structure")
-
-    problem_headers = header_rows[0].find_all("th")
-    problems = [th.get_text(strip=True) for th in problem_headers]
+def parse_naipc_2016_from_file(path):
+    return collect_replay(*stream_naipc_2016_from_file(path))
+
+def stream_naipc_2016_from_file(path):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set from the table header.
+    """
+    contest = Contest("NAIPC 2016", CONTEST_DURATION, FREEZE_TIME)
+    return contest, iter_naipc_teams(path, contest)
+
+def iter_naipc_teams(path, contest):
+    problems = None
+
+    for row in iter_rows(path, "tr", in_standings):
+        # ---- extract problems from the first header row ----
+        if ancestor(row, "thead") is not None:
+            if problems is None:
+                problem_headers = find_all(row, "th")
+                problems = [text(th) for th in problem_headers]
+                contest.set_problems(problems)
+            continue
 
-    teams = []
+        if ancestor(row, "tbody") is None or problems is None:
+            continue
 
-    tbody = table.find("tbody")
-    for row in tbody.find_all("tr"):
-        cells = row.find_all("td")
+        cells = find_all(row, "td")
         if len(cells) < 4 + len(problems):
             continue
 
         # ---- team info ----
         team_cell = cells[1]
-        parts = list(team_cell.stripped_strings)
+        parts = [s.strip() for s in team_cell.itertext() if s.strip()]
         team_name = parts[0]
         university = parts[1] if len(parts) > 1 else team_name
 
-        submissions = {}
+        team = contest.add_team(team_name, university)
 
         # ---- problem cells ----
         prob_cells = cells[4 : 4 + len(problems)]
 
         for prob, cell in zip(problems, prob_cells):
-            text = cell.get_text(strip=True)
+            cell_text = text(cell)
 
-            if not text or text == ".":
+            if not cell_text or cell_text == ".":
                 continue
 
             # formats: "+2 123", "+ 45", "+0 7"
-            m = re.match(r"\+(\d*)\s*(\d+)", text)
+            m = re.match(r"\+(\d*)\s*(\d+)", cell_text)
             if not m:
                 continue
 
@@ -58,33 +69,29 @@ def parse_naipc_2016_from_file(path):
             tries = wrong + 1
             time_minutes = int(m.group(2))
 
-            submissions[prob] = {
-                "time": time_minutes * 60,
-                "tries": tries
-            }
-
-        teams.append({
-            "name": team_name,
-            "university": university,
-            "submissions": submissions
-        })
-
-    return {
-        "name": "NAIPC 2016",
-        "duration": CONTEST_DURATION,
-        "freeze": FREEZE_TIME,
-        "problems": problems,
-        "teams": teams
-    }
+            team.solve(prob, time_minutes * 60, tries)
+
+        yield team
+
+    if problems is None:
+        raise RuntimeError("standings table not found")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("usage: python naipc2016.py naipc16.txt out.json")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+
+    if len(args) != 2:
+        print("usage: python naipc2016.py naipc16.txt out.json [--minify] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    data = parse_naipc_2016_from_file(sys.argv[1])
+    contest, teams = stream_naipc_2016_from_file(args[0])
 
-    with open(sys.argv[2], "w") as f:
-        json.dump(data, f, indent=2)
+    stream_replay(contest, teams, args[1], minify=minify, profile=profile)
 
     print("done")
+
+    if profile is not None:
+        profile.finish()
@@ -1,45 +1,76 @@
-import json
-import requests
-from bs4 import BeautifulSoup
+from scoreboard_rows import iter_rows, text, full_text, classes, find, find_all, ancestor
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+from replay_model import Contest
+from live_follow import follow, parse_follow_args
+from replay_incremental import IncrementalParser
+import html as htmllib
+import mmap
 import sys
 import re
 
 CONTEST_DURATION = 300  # minutes (5 hours)
 FREEZE_TIME = 240       # minutes (4 hours)
 
-def parse_nerc(url):
+def is_team_row(row):
+    return any(c.startswith("row") for c in classes(row))
+
+def stream_nerc(url, validate=False):
+    import requests
+
     print(f"Fetching {url} ...")
     html = requests.get(url).text
-    soup = BeautifulSoup(html, "html.parser")
+    return stream_nerc_fast(html, validate)
 
-    table = soup.find("table")
-    if not table:
-        raise RuntimeError("No scoreboard table found")
+def parse_nerc(url):
+    return collect_replay(*stream_nerc(url))
 
-    rows = table.find_all("tr", class_=re.compile("^row"))
-    if not rows:
-        raise RuntimeError("No team rows found")
+def parse_nerc_html(html):
+    return collect_replay(*stream_nerc_html(html))
 
-    # ------------------------------------
-    # Infer problem count
-    # ------------------------------------
-    first_cells = rows[0].find_all("td")
-    PROBLEM_START = 2
-    PROBLEM_END = len(first_cells) - 3
-    problem_count = PROBLEM_END - PROBLEM_START
-    problems = [chr(ord("A") + i) for i in range(problem_count)]
+def stream_nerc_html(html):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set with the first row.
+    """
+    contest = Contest("NERC 2024", CONTEST_DURATION * 60, FREEZE_TIME * 60)
+    return contest, iter_nerc_teams(html, contest)
 
-    teams = []
+def iter_nerc_teams(html, contest):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+
+    rows = iter_rows(html, "tr", is_team_row)
+
+    table = None
+    problems = None
 
     for row in rows:
-        cells = row.find_all("td")
+        # Only rows of the first table on the page are standings
+        if table is None:
+            table = next(row.getroottree().iter("table"))
+        if ancestor(row, "table") is not table:
+            continue
+
+        cells = find_all(row, "td")
+
+        # ------------------------------------
+        # Infer problem count from the first row
+        # ------------------------------------
+        if problems is None:
+            PROBLEM_START = 2
+            PROBLEM_END = len(cells) - 3
+            problem_count = PROBLEM_END - PROBLEM_START
+            problems = [chr(ord("A") + i) for i in range(problem_count)]
+            contest.set_problems(problems)
+
         if len(cells) < PROBLEM_END:
             continue
 
         # ------------------------------------
         # Team name / university
         # ------------------------------------
-        raw_team = cells[1].get_text(" ", strip=True)
+        raw_team = text(cells[1], " ")
 
         if ":" in raw_team:
             team_name = raw_team
@@ -49,25 +80,23 @@ def parse_nerc(url):
             team_name = raw_team
             university = raw_team
 
-        submissions = {}
+        team = contest.add_team(team_name, university, logo="")
 
         # ------------------------------------
         # Parse problems
         # ------------------------------------
         for i, prob in enumerate(problems):
             cell = cells[PROBLEM_START + i]
-            text = cell.get_text(" ", strip=True)
-
-            if text == ".":
+            if text(cell, " ") == ".":
                 continue
 
-            i_tag = cell.find("i")
-            if not i_tag:
+            i_tag = find(cell, "i")
+            if i_tag is None:
                 continue
 
             # -------- tries --------
             # "+", "+1", "+2", ...
-            m = re.match(r"\+(\d*)", i_tag.contents[0].strip())
+            m = re.match(r"\+(\d*)", (i_tag.text or "").strip())
             if not m:
                 continue
 
@@ -75,53 +104,197 @@ def parse_nerc(url):
             tries = wrong + 1
 
             # -------- time (minutes only) --------
-            s_tag = cell.find("s")
-            if not s_tag:
+            s_tag = find(cell, "s")
+            if s_tag is None:
                 continue
 
-            tm = re.search(r"(\d+):(\d+)", s_tag.text)
+            tm = re.search(r"(\d+):(\d+)", full_text(s_tag))
             if not tm:
                 continue
 
             time_minutes = int(tm.group(1))
             time_seconds = int(tm.group(2))
 
-            is_first = "first-to-solve" in i_tag.get("class", [])
-
-            submissions[prob] = {
-                "time": time_minutes * 60 + time_seconds,
-                "tries": tries,
-                **({"first": True} if is_first else {})
-            }
-
-        teams.append({
-            "name": team_name,
-            "university": university,
-            "logo": "",
-            "submissions": submissions
-        })
-
-    return {
-        "name": "NERC 2024",
-        "duration": CONTEST_DURATION * 60,
-        "freeze": FREEZE_TIME * 60,
-        "problems": problems,
-        "teams": teams
-    }
+            is_first = "first-to-solve" in classes(i_tag)
+
+            team.solve(prob, time_minutes * 60 + time_seconds, tries, is_first)
+
+        yield team
+
+    if problems is None:
+        raise RuntimeError("No team rows found")
+
+# ----------------------------------------
+# DOM-free scanner
+#
+# PCMS pages are regular enough to read without building a tree: the first
+# <table> is cut out of the raw bytes, rows and cells are found with
+# precompiled patterns, and a solved cell has to match SOLVED_CELL exactly.
+# Anything else (a nested table, an unclosed cell, a comment, a row with a
+# different number of cells, an <i> in another shape) raises ScanError,
+# and stream_nerc_fast() parses the page with iter_nerc_teams() instead,
+# which stays the reference. With validate=True the scanner's result is
+# also compared with the reference's and the reference wins on mismatch.
+# ----------------------------------------
+
+class ScanError(ValueError):
+    pass
+
+ROW_TAG = re.compile(rb"<tr\b([^>]*)>")
+CLASS_ATTR = re.compile(rb'\bclass\s*=\s*"([^"]*)"')
+TAG = re.compile(rb"<[^>]*>")
+SOLVED_CELL = re.compile(
+    rb"<i\b([^>]*)>\s*\+(\d*)\s*<s>\s*(?:<br\s*/?>)?\s*(\d+):(\d+)\s*</s>\s*</i>\s*</td>")
+
+def attr_classes(attrs):
+    m = CLASS_ATTR.search(attrs)
+    if m is None:
+        if b"class" in attrs:
+            raise ScanError(f"unquoted class attribute {attrs!r}")
+        return []
+    return m.group(1).split()
+
+def cell_text(content):
+    """text(cell, " ") of a cell's inner markup."""
+    if b"<" not in content and b"&" not in content:
+        return content.decode("utf-8").strip()
+    pieces = (htmllib.unescape(p.decode("utf-8")).strip() for p in TAG.split(content))
+    return " ".join(p for p in pieces if p)
+
+def scan_nerc(page, contest):
+    """
+    Fill `contest` from the page bytes (or an mmap of them) in one pass.
+    Raises ScanError where the page is not shaped like a PCMS standings
+    table.
+    """
+    start = page.find(b"<table")
+    end = page.find(b"</table", start)
+    if start < 0 or end < 0:
+        raise ScanError("no complete <table>")
+    if page.find(b"<table", start + 6, end) >= 0:
+        raise ScanError("nested table")
+    if page.find(b"<!--", 0, end) >= 0:
+        raise ScanError("comment before the end of the table")
+
+    width = None
+    last = start
+    try:
+        for row in ROW_TAG.finditer(page, start, end):
+            close = page.find(b"</tr", row.end(), end)
+            if row.start() < last or close < 0:
+                raise ScanError("unclosed row")
+            last = close
+            if not any(c.startswith(b"row") for c in attr_classes(row.group(1))):
+                continue
+
+            # Only the name cell and the solved cells are looked at; the
+            # other cells are just counted
+            body = page[row.end():close]
+            cells = body.count(b"<td")
+            if cells != body.count(b"</td>"):
+                raise ScanError("unclosed cell")
+            if width is None:
+                width = cells
+                if width <= 5:
+                    raise ScanError(f"first row has {width} cells")
+                contest.set_problems([chr(ord("A") + i) for i in range(width - 5)])
+            elif cells != width:
+                raise ScanError(f"row with {cells} cells instead of {width}")
+
+            name_at = body.find(b">", body.find(b"<td", body.find(b"<td") + 3)) + 1
+            name_end = body.find(b"</td>", name_at)
+            if body.find(b"<td", name_at, name_end) >= 0:
+                raise ScanError("unclosed cell")
+            team_name = cell_text(body[name_at:name_end])
+            university = team_name.split(":", 1)[0].strip() if ":" in team_name else team_name
+            i = contest.add_team(team_name, university, logo="").index
+
+            at = body.find(b"<i", name_end)
+            while at >= 0:
+                j = body.count(b"<td", 0, at) - 3
+                after = at + 2
+                if 0 <= j < width - 5:
+                    m = SOLVED_CELL.match(body, at)
+                    cell_at = body.find(b">", body.rfind(b"<td", 0, at)) + 1
+                    if m is None or body[cell_at:at].strip():
+                        raise ScanError(f"unexpected cell {body[cell_at:cell_at + 80]!r}")
+                    attrs, wrong, minutes, seconds = m.groups()
+                    first = b"first-to-solve" in attrs and b"first-to-solve" in attr_classes(attrs)
+                    contest.solve(i, j, int(minutes) * 60 + int(seconds), int(wrong or 0) + 1, first)
+                    after = m.end()
+                at = body.find(b"<i", after)
+    except UnicodeDecodeError as e:
+        raise ScanError(f"not UTF-8: {e}") from None
+
+    if width is None:
+        raise ScanError("no team rows")
+    return contest
+
+def stream_nerc_fast(page, validate=False):
+    """stream_nerc_html() through the scanner, falling back to lxml."""
+    contest = Contest("NERC 2024", CONTEST_DURATION * 60, FREEZE_TIME * 60)
+    return contest, iter_nerc_fast(page, contest, validate)
+
+def iter_nerc_fast(page, contest, validate=False):
+    if isinstance(page, str):
+        page = page.encode("utf-8")
+    try:
+        scan_nerc(page, contest)
+        if validate:
+            reference = parse_nerc_html(page[:])
+            if contest.to_dict() != reference:
+                raise ScanError("result differs from the lxml parser")
+    except ScanError as e:
+        print(f"NEERC scanner: {e}; using the lxml parser", file=sys.stderr)
+        contest.truncate(0)
+        yield from iter_nerc_teams(page[:], contest)
+        return
+    yield from contest.teams()
+
+def parse_nerc_fast(source, validate=False):
+    """
+    The replay dict for a page given as bytes or a file path; a file is
+    scanned through an mmap instead of being read into memory first.
+    """
+    if not isinstance(source, str):
+        return collect_replay(*stream_nerc_fast(source, validate))
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as page:
+        return collect_replay(*stream_nerc_fast(page, validate))
 
 # ----------------------------------------
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python nerc_to_replay_json.py <url> <output.json>")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    follow_interval = parse_follow_args(args)
+
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+    validate = "--validate" in args
+    if validate:
+        args.remove("--validate")
+
+    if len(args) != 2:
+        print("Usage: python nerc_to_replay_json.py <url> <output.json> [--follow [SECONDS]] [--minify] [--validate] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    url = sys.argv[1]
-    outfile = sys.argv[2]
+    url = args[0]
+    outfile = args[1]
 
-    data = parse_nerc(url)
+    if follow_interval is not None:
+        # Successive pages differ in a few rows; only those are reparsed
+        follow(url, IncrementalParser("nerc").parse_html, outfile, follow_interval, profile=profile)
+        if profile is not None:
+            profile.finish()
+        sys.exit(0)
 
-    with open(outfile, "w") as f:
-        json.dump(data, f, indent=2)
+    with stage(profile, "fetch"):
+        contest, teams = stream_nerc(url, validate)
+
+    stream_replay(contest, teams, outfile, minify=minify, profile=profile)
 
     print(f"Saved replay JSON to {outfile}")
+
+    if profile is not None:
+        profile.finish()
@@ -0,0 +1,172 @@
+"""
+Content-addressed cache of parse results.
+
+A parse result only depends on the page bytes, the format and the parser's
+code, so the cache key is a hash of exactly those: the input bytes, the
+format name and the source of the parser module plus every module of this
+repository it imports, directly or through other modules (found by reading
+the import statements, without importing anything). Editing a parser or
+anything it uses invalidates its entries; editing a manifest's contest
+metadata does not (metadata is applied after the cache).
+
+Entries are compact JSON files in <cache_dir>. The directory is kept under
+`max_bytes` by evicting the least recently used entries (a hit refreshes
+the file's mtime). put() keeps a running total of the directory's size
+(scanned once, on the first put) and only scans and evicts when that goes
+over budget, down to EVICT_TO of it so the next few puts do not scan
+again. Other processes' writes are picked up at that scan, so with several
+writers the directory can run over by what they added in between.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_DIR = ".parse_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+READ_CHUNK = 1 << 20
+EVICT_TO = 0.9
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_source_hashes = {}
+
+
+def local_modules(module_name):
+    """
+    {name: path} of `module_name` and every module next to it that it
+    imports, transitively, sorted by name. Imports inside functions count;
+    the standard library and installed packages are left out.
+    """
+    found = {}
+    pending = [module_name]
+    while pending:
+        name = pending.pop().split(".")[0]
+        path = os.path.join(MODULE_DIR, name + ".py")
+        if name in found or not os.path.isfile(path):
+            continue
+        found[name] = path
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                pending.append(node.module)
+    return dict(sorted(found.items()))
+
+
+def source_hash(module_name):
+    """Hash of a module's source and its local_modules(), without importing them."""
+    if module_name not in _source_hashes:
+        h = hashlib.sha256()
+        for name, path in local_modules(module_name).items():
+            h.update(name.encode() + b"\0")
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _source_hashes[module_name] = h.hexdigest()
+    return _source_hashes[module_name]
+
+
+class ParseCache:
+    def __init__(self, cache_dir=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._total = None  # bytes in cache_dir, as of the last scan plus our puts
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, fmt, module_name, source):
+        """
+        Key for a page given as raw bytes or as a path. A file is hashed in
+        chunks, so a large input (an event feed) is never held in memory.
+        """
+        h = hashlib.sha256()
+        h.update(fmt.encode())
+        h.update(source_hash(module_name).encode())
+        if isinstance(source, bytes):
+            h.update(source)
+        else:
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                    h.update(chunk)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process since the read; the data is still good
+        with self._lock:
+            self.stats["hits"] += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        size = os.path.getsize(tmp)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._total is not None:
+                self._total += size - replaced
+            over = self._total is None or self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self, target=None):
+        """
+        Scan the directory and remove the least recently used entries until
+        it holds at most `target` bytes (EVICT_TO of max_bytes by default,
+        nothing when it is within max_bytes already).
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+        if target is None:
+            target = int(self.max_bytes * EVICT_TO) if total > self.max_bytes else total
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._total = total
+            self.stats["evictions"] += evicted
@@ -1,34 +1,40 @@
-import json
-import requests
-from bs4 import BeautifulSoup
+from scoreboard_rows import iter_rows, full_text, classes, find_all
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args, stage
+from replay_model import Contest, ParseError
 import sys
 import re
 
 def min_to_sec(m):
 	return int(float(m) * 60)
 
-def parse_domjudge(url):
-	print(f"Fetching {url} ...")
-	f = open("inner.html")
-	html = f.read()
-	soup = BeautifulSoup(html, "html.parser")
-	
-	# Find all table rows
-	rows = soup.find_all("tr")
-	if not rows:
-		print("ERROR: No rows found.")
-		sys.exit(1)
+def parse_domjudge(url, path="inner.html"):
+	return collect_replay(*stream_domjudge(url, path))
+
+def stream_domjudge(url, path="inner.html"):
+	"""
+	(contest, teams): the Contest being filled in and a generator of its
+	Team views, one per row. The problems are set with the first row.
+	"""
+	contest = Contest(duration=5 * 3600, freeze=4 * 3600)
+	return contest, iter_pc2_teams(path, contest)
+
+def iter_pc2_teams(path, contest):
+	# Stream all table rows
+	rows = iter_rows(path, "tr")
 	
-	teams = []
 	problems_count = None
+	row_count = 0
 	
 	for row in rows:
-		cells = row.find_all("td")
+		row_count += 1
+		cells = find_all(row, "td")
 		if not cells or len(cells) < 6:
 			continue
 		
 		# Skip header rows
-		if cells[0].text.strip() == "Rank" or not cells[0].text.strip().isdigit():
+		rank_text = full_text(cells[0]).strip()
+		if rank_text == "Rank" or not rank_text.isdigit():
 			continue
 		
 		# Column structure:
@@ -39,11 +45,11 @@ def parse_domjudge(url):
 		# Problem cells start at index 4
 		
 		try:
-			rank = int(cells[0].text.strip())
+			rank = int(rank_text)
 		except:
 			continue
 			
-		team_text = cells[1].text.strip()
+		team_text = full_text(cells[1]).strip()
 		# Extract university name (remove leading number if present)
 		team_parts = team_text.split(None, 1)
 		if len(team_parts) >= 2 and team_parts[0].isdigit():
@@ -51,8 +57,8 @@ def parse_domjudge(url):
 		else:
 			university = team_text
 		
-		solved = int(cells[2].text.strip())
-		penalty = int(cells[3].text.strip())
+		solved = int(full_text(cells[2]).strip())
+		penalty = int(full_text(cells[3]).strip())
 		
 		# Problem cells start at index 4
 		problem_cells = cells[4:]
@@ -60,20 +66,22 @@ def parse_domjudge(url):
 		# Detect number of problems (excluding the last summary column if present)
 		if problems_count is None:
 			# Check if last cell looks like a summary (e.g., "17/12")
-			last_cell = problem_cells[-1].text.strip()
+			last_cell = full_text(problem_cells[-1]).strip()
 			if "/" in last_cell and last_cell.count("/") == 1:
 				problems_count = len(problem_cells) - 1
 			else:
 				problems_count = len(problem_cells)
+			contest.set_problems([chr(ord("A") + i) for i in range(problems_count)])
 		
-		submissions = {}
+		team = contest.add_team(university)
+		team.report(rank, solved, penalty)
 		
 		for idx in range(problems_count):
 			pc = problem_cells[idx]
 			prob_letter = chr(ord("A") + idx)
 			
-			cell_text = pc.text.strip()
-			cell_classes = pc.get("class", [])
+			cell_text = full_text(pc).strip()
+			cell_classes = classes(pc)
 			
 			# Skip if empty or marked as "no"
 			if not cell_text or cell_text == "--" or "no" in cell_classes:
@@ -92,38 +100,50 @@ def parse_domjudge(url):
 			time_min = int(match.group(2))
 			time_sec = min_to_sec(time_min)
 			
-			submissions[prob_letter] = {
-				"time": time_sec,
-				"tries": tries,
-				"first": False  # Can't determine from this format
-			}
+			# First solves can't be determined from this format
+			team.solve(prob_letter, time_sec, tries)
 		
-		teams.append({
-			"name": university,
-			"university": university,
-			"submissions": submissions
-		})
-	
-	problems = [chr(ord("A") + i) for i in range(problems_count)]
+		yield team
 	
-	return {
-		"duration": 5 * 3600,  
-		"freeze": 4 * 3600,   
-		"problems": problems,
-		"teams": teams
-	}
+	if not row_count:
+		raise ParseError("No rows found.")
 
 if __name__ == "__main__":
-	if len(sys.argv) != 3:
-		print("Usage: python domjudge_to_replay_json.py <domjudge-scoreboard-url> <output.json>")
+	args = sys.argv[1:]
+	profile = profile_from_args(args)
+	minify = "--minify" in args
+	if minify:
+		args.remove("--minify")
+	verify = "--verify" in args
+	if verify:
+		args.remove("--verify")
+
+	if len(args) != 2:
+		print("Usage: python domjudge_to_replay_json.py <domjudge-scoreboard-url> <output.json> [--minify] [--verify] [--profile [FILE.pstats]]")
 		sys.exit(1)
 	
-	url = sys.argv[1]
-	outfile = sys.argv[2]
+	url = args[0]
+	outfile = args[1]
 	
-	data = parse_domjudge(url)
+	print(f"Fetching {url} ...")
+	contest, teams = stream_domjudge(url)
 	
-	with open(outfile, "w") as f:
-		json.dump(data, f, indent=2)
+	try:
+		stream_replay(contest, teams, outfile, minify=minify, profile=profile)
+	except ParseError as e:
+		print(f"ERROR: {e}")
+		sys.exit(1)
 	
 	print(f"Saved replay JSON to {outfile}")
+
+	mismatches = []
+	if verify:
+		import replay_verify
+		with stage(profile, "verify"):
+			mismatches = replay_verify.verify(contest)
+		replay_verify.report(mismatches)
+
+	if profile is not None:
+		profile.finish()
+	if mismatches:
+		sys.exit(1)
@@ -1,5 +1,7 @@
-from bs4 import BeautifulSoup
-import json
+from scoreboard_rows import iter_rows, full_text, classes, find, find_all
+from replay_output import collect_replay, stream_replay
+from replay_profile import profile_from_args
+from replay_model import Contest
 import sys
 
 def parse_time(time_str):
@@ -11,94 +13,99 @@ def parse_time(time_str):
     return None
 
 def parse_standings(html_file):
-    with open(html_file, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f, "html.parser")
-
-    # Extract problem letters from the header row
-    header = soup.find("div", class_="grid1")
+    return collect_replay(*stream_standings(html_file))
+
+def stream_standings(html_file):
+    """
+    (contest, teams): the Contest being filled in and a generator of its
+    Team views, one per row. The problems are set from the header row.
+    """
+    contest = Contest("EUC 2026", 5 * 3600, 4 * 3600)
+    return contest, iter_standings_teams(html_file, contest)
+
+def iter_standings_teams(html_file, contest):
+    header = None
     problem_letters = []
-    if header:
-        header_cells = header.find_all("div", class_="result-cell--header")
-        for cell in header_cells:
-            letter = cell.contents[0].strip() if cell.contents else ""
-            problem_letters.append(letter.upper())
-
-    teams = []
 
     # Each team is in a div.grid1 that contains a div.grid3
-    for grid1 in soup.find_all("div", class_="grid1"):
-        grid3 = grid1.find("div", class_="grid3")
-        if not grid3:
+    for grid1 in iter_rows(html_file, "div", lambda el: "grid1" in classes(el)):
+        # Extract problem letters from the header row (the first div.grid1)
+        if header is None:
+            header = grid1
+            header_cells = find_all(header, "div", "result-cell--header")
+            for cell in header_cells:
+                letter = (cell.text or "").strip()
+                problem_letters.append(letter.upper())
+            contest.set_problems(problem_letters if problem_letters else [chr(ord("A") + i) for i in range(11)])
+
+        grid3 = find(grid1, "div", "grid3")
+        if grid3 is None:
             continue
 
         # Skip header row
-        if grid3.find("div", class_="result-cell--header"):
+        if find(grid3, "div", "result-cell--header") is not None:
             continue
 
         # Team name
-        name_div = grid3.find("div", class_="contestant__name")
-        if not name_div:
+        name_div = find(grid3, "div", "contestant__name")
+        if name_div is None:
             continue
-        team_name = name_div.contents[0].strip()
+        team_name = (name_div.text or "").strip()
 
         # Result cells (inside div.results)
-        results_div = grid3.find("div", class_="results")
-        if not results_div:
+        results_div = find(grid3, "div", "results")
+        if results_div is None:
             continue
 
-        result_cells = results_div.find_all("div", class_="result-cell", recursive=False)
+        result_cells = find_all(results_div, "div", "result-cell", recursive=False)
 
-        submissions = {}
+        team = contest.add_team(team_name)
         for idx, cell in enumerate(result_cells):
-            classes = cell.get("class", [])
-            if "result-cell--OK" not in classes:
-                continue
+            if idx >= len(contest.problems):
+                break
 
-            prob_letter = problem_letters[idx] if idx < len(problem_letters) else chr(ord("A") + idx)
+            cell_classes = classes(cell)
+            if "result-cell--OK" not in cell_classes:
+                continue
 
-            time_span = cell.find("span", class_="result-cell__time")
-            if not time_span:
+            time_span = find(cell, "span", "result-cell__time")
+            if time_span is None:
                 continue
 
-            time_sec = parse_time(time_span.text)
+            time_sec = parse_time(full_text(time_span))
             if time_sec is None:
                 continue
 
-            bombs_span = cell.find("span", class_="result-cell__bombs")
-            wrong = int(bombs_span.text.strip().replace("+", "")) if bombs_span else 0
+            bombs_span = find(cell, "span", "result-cell__bombs")
+            wrong = int(full_text(bombs_span).strip().replace("+", "")) if bombs_span is not None else 0
             tries = wrong + 1
 
-            is_first = "first-solve-badge" in classes
+            is_first = "first-solve-badge" in cell_classes
 
-            submissions[prob_letter] = {
-                "time": time_sec,
-                "tries": tries,
-                "first": is_first
-            }
+            team.solve(idx, time_sec, tries, is_first)
 
-        teams.append({
-            "name": team_name,
-            "university": team_name,
-            "submissions": submissions
-        })
+        yield team
 
-    return {
-        "name": "EUC 2026",
-        "duration": 5 * 3600,
-        "freeze": 4 * 3600,
-        "problems": problem_letters if problem_letters else [chr(ord("A") + i) for i in range(11)],
-        "teams": teams
-    }
+    if header is None:
+        contest.set_problems([chr(ord("A") + i) for i in range(11)])
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python polish_replay.py <standings.html> <output.json>")
+    args = sys.argv[1:]
+    profile = profile_from_args(args)
+    minify = "--minify" in args
+    if minify:
+        args.remove("--minify")
+
+    if len(args) != 2:
+        print("Usage: python polish_replay.py <standings.html> <output.json> [--minify] [--profile [FILE.pstats]]")
         sys.exit(1)
 
-    data = parse_standings(sys.argv[1])
+    contest, teams = stream_standings(args[0])
+
+    count = stream_replay(contest, teams, args[1], ensure_ascii=False, minify=minify, profile=profile)
 
-    with open(sys.argv[2], "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"Saved {count} teams, {len(contest.problems)} problems to {args[1]}")
 
-    print(f"Saved {len(data['teams'])} teams, {len(data['problems'])} problems to {sys.argv[2]}")
+    if profile is not None:
+        profile.finish()
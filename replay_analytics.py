@@ -0,0 +1,304 @@
+"""
+Problem difficulty and solve curves for every contest in the archive,
+computed with NumPy.
+
+Every replay is read once into columns, one entry per accepted cell:
+
+    problem   index of the problem across all contests being analyzed
+    time      accepted time in seconds
+    tries     tries including the accepted one
+
+plus one entry per problem for its contest's team count and length. All
+statistics for all problems then come out of a few passes over those
+columns (np.bincount for per-problem sums, one np.lexsort by problem and
+time for the order statistics), not a loop per contest:
+
+    solves       teams that solved the problem
+    rate         solves / teams in the contest
+    first        time of the first solve (seconds, -1 if unsolved)
+    median       median solve time (seconds, NaN if unsolved)
+    last         time of the last solve (seconds, -1 if unsolved)
+    mean_tries   tries per solve
+    curve        cumulative solves at the end of each minute, one row per
+                 problem, duration // 60 + 1 columns (a solve at the very
+                 end counts in the last one)
+
+Results are memoized per contest under a sha256 of the file's bytes and of
+this module's source: in memory for the life of the process and as .npz
+files in CACHE_DIR, so unchanged replays are not read again and only the
+new or changed ones go through the passes (together). distributions()
+bins the problems' solve rates into tenths, per series ("nac", "naipc",
+"neerc", ... from the slug) and overall.
+
+Usage:
+    python replay_analytics.py [replay.json ...] [--json FILE] [--no-cache]
+
+Without files it analyzes every replay in src/assets. Prints one table per
+contest and the solve-rate distributions; --json writes everything,
+curves included.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from parse_cache import source_hash
+from replay_archive import pop_option, replay_files, slug_for
+
+CACHE_DIR = ".analytics_cache"
+RATE_BINS = np.linspace(0.0, 1.0, 11)
+ARRAYS = ("solves", "rate", "first", "median", "last", "mean_tries", "curve")
+
+_memo = {}  # key -> stats dict
+
+
+def series_of(slug):
+    return re.sub(r"\d+$", "", slug) or slug
+
+
+# ------------------------------------
+# Loading
+# ------------------------------------
+
+def columns(data):
+    """(problems, time, tries) of every accepted cell of a replay dict, as lists."""
+    index = {p: j for j, p in enumerate(data["problems"])}
+    problems, times, tries = [], [], []
+    for team in data["teams"]:
+        for letter, info in team["submissions"].items():
+            if info and letter in index:
+                problems.append(index[letter])
+                times.append(info["time"])
+                tries.append(info["tries"])
+    return problems, times, tries
+
+
+def analyze(replays):
+    """
+    Stats for a list of (slug, replay dict), all problems of all of them in
+    the same passes. Returns one stats dict per replay, in order.
+    """
+    if not replays:
+        return []
+
+    counts = np.array([len(data["problems"]) for _, data in replays], dtype=np.int64)
+    base = np.concatenate(([0], np.cumsum(counts)))
+    total = int(base[-1])
+    teams = np.repeat([len(data["teams"]) for _, data in replays], counts)
+    minutes = np.repeat([data["duration"] // 60 + 1 for _, data in replays], counts)
+
+    pid, t, tries = [], [], []
+    for k, (_, data) in enumerate(replays):
+        problems, times, n = columns(data)
+        pid.append(np.asarray(problems, dtype=np.int64) + base[k])
+        t.append(np.asarray(times, dtype=np.int64))
+        tries.append(np.asarray(n, dtype=np.int64))
+    pid, t, tries = np.concatenate(pid), np.concatenate(t), np.concatenate(tries)
+
+    solves = np.bincount(pid, minlength=total)
+    solved = solves > 0
+    rate = np.divide(solves, teams, out=np.zeros(total), where=teams > 0)
+    mean_tries = np.divide(np.bincount(pid, weights=tries, minlength=total), solves,
+                           out=np.full(total, np.nan), where=solved)
+
+    # Solve times grouped by problem, ascending within each group
+    order = np.lexsort((t, pid))
+    sorted_t = np.append(t[order], 0)  # the pad keeps unsolved problems' indexes in range
+    start = np.cumsum(solves) - solves
+    first = np.where(solved, sorted_t[start], -1)
+    last = np.where(solved, sorted_t[start + solves - 1], -1)
+    lo, hi = start + (solves - 1) // 2, start + solves // 2
+    median = np.where(solved, (sorted_t[lo] + sorted_t[hi]) / 2, np.nan)
+
+    # Solves per minute, one row per problem, then running totals
+    width = int(minutes.max())
+    minute = np.minimum(t // 60, minutes[pid] - 1)
+    curve = np.bincount(pid * width + minute, minlength=total * width).reshape(total, width)
+    curve = np.cumsum(curve, axis=1, dtype=np.int32)
+
+    result = []
+    for k, (slug, data) in enumerate(replays):
+        s = slice(base[k], base[k + 1])
+        result.append({
+            "slug": slug,
+            "name": data.get("name") or slug,
+            "series": series_of(slug),
+            "teams": len(data["teams"]),
+            "duration": data["duration"],
+            "problems": list(data["problems"]),
+            "solves": solves[s],
+            "rate": rate[s],
+            "first": first[s],
+            "median": median[s],
+            "last": last[s],
+            "mean_tries": mean_tries[s],
+            "curve": curve[s, :data["duration"] // 60 + 1],
+        })
+    return result
+
+
+# ------------------------------------
+# Memoized batch API
+# ------------------------------------
+
+def cache_key(body):
+    h = hashlib.sha256()
+    h.update(source_hash("replay_analytics").encode())
+    h.update(body)
+    return h.hexdigest()
+
+
+def load_cached(path):
+    try:
+        with np.load(path) as f:
+            stats = json.loads(str(f["meta"]))
+            stats.update((name, f[name]) for name in ARRAYS)
+        return stats
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached(path, stats):
+    meta = {k: v for k, v in stats.items() if k not in ARRAYS}
+    tmp = f"{path}.tmp{os.getpid()}.npz"
+    np.savez(tmp, meta=np.array(json.dumps(meta)), **{name: stats[name] for name in ARRAYS})
+    os.replace(tmp, path)
+
+
+def analyze_files(paths=None, cache_dir=CACHE_DIR):
+    """
+    Stats for each replay file (every replay in src/assets by default), in
+    order, and {"memory", "disk", "computed"} counts of where they came
+    from. cache_dir=None skips the .npz files (the in-memory memo is
+    always used).
+    """
+    paths = replay_files(paths)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    result = [None] * len(paths)
+    counts = {"memory": 0, "disk": 0, "computed": 0}
+    pending = []  # (position, key, slug, replay dict)
+    for i, path in enumerate(paths):
+        with open(path, "rb") as f:
+            body = f.read()
+        key = cache_key(body)
+        stats = _memo.get(key)
+        if stats is not None:
+            counts["memory"] += 1
+        elif cache_dir and (stats := load_cached(os.path.join(cache_dir, key + ".npz"))):
+            counts["disk"] += 1
+        else:
+            pending.append((i, key, slug_for(path), json.loads(body)))
+            continue
+        result[i] = with_slug(stats, slug_for(path))
+        _memo[key] = stats
+
+    fresh = analyze([(slug, data) for _, _, slug, data in pending])
+    for (i, key, slug, data), stats in zip(pending, fresh):
+        # Entries are keyed on the bytes alone, so they keep nothing that
+        # depends on the file's name; the same bytes under another name
+        # are the same numbers
+        stats = {k: v for k, v in stats.items() if k not in ("slug", "series")}
+        stats["name"] = data.get("name")
+        _memo[key] = stats
+        result[i] = with_slug(stats, slug)
+        if cache_dir:
+            save_cached(os.path.join(cache_dir, key + ".npz"), stats)
+    counts["computed"] = len(pending)
+    return result, counts
+
+
+def with_slug(stats, slug):
+    """A cached entry with what comes from the file's name filled in."""
+    return dict(stats, slug=slug, name=stats["name"] or slug, series=series_of(slug))
+
+
+def distributions(stats):
+    """{series: problems per solve-rate tenth}, plus "all"; the last bin includes 100%."""
+    rates = {}
+    for s in stats:
+        rates.setdefault(s["series"], []).append(s["rate"])
+    rates["all"] = [s["rate"] for s in stats]
+    return {series: np.histogram(np.concatenate(r), RATE_BINS)[0].tolist()
+            for series, r in rates.items()}
+
+
+def report_dict(stats):
+    """JSON-ready report: every contest with its per-problem stats and curves."""
+    contests = []
+    for s in stats:
+        contest = {k: s[k] for k in ("slug", "name", "series", "teams", "duration")}
+        contest["problems"] = [
+            {"problem": letter,
+             "solves": int(s["solves"][j]),
+             "rate": round(float(s["rate"][j]), 4),
+             "first": int(s["first"][j]) if s["solves"][j] else None,
+             "median": float(s["median"][j]) if s["solves"][j] else None,
+             "last": int(s["last"][j]) if s["solves"][j] else None,
+             "mean_tries": round(float(s["mean_tries"][j]), 3) if s["solves"][j] else None,
+             "curve": s["curve"][j].tolist()}
+            for j, letter in enumerate(s["problems"])
+        ]
+        contests.append(contest)
+    return {"contests": contests, "rate_bins": RATE_BINS.round(1).tolist(),
+            "distributions": distributions(stats)}
+
+
+# ------------------------------------
+# Report
+# ------------------------------------
+
+def minutes(seconds):
+    return "-" if seconds is None or seconds < 0 or np.isnan(seconds) else f"{seconds / 60:.0f}"
+
+
+def print_contest(s):
+    print(f"{s['name']} ({s['slug']}, {s['teams']} teams)")
+    print(f"  {'prob':<6}{'solves':>7}{'rate':>7}{'first':>7}{'median':>8}{'last':>6}{'tries':>7}")
+    for j in np.argsort(-s["solves"], kind="stable"):
+        tries = f"{s['mean_tries'][j]:.2f}" if s["solves"][j] else "-"
+        print(f"  {s['problems'][j]:<6}{s['solves'][j]:>7}{s['rate'][j]:>7.0%}"
+              f"{minutes(s['first'][j]):>7}{minutes(s['median'][j]):>8}{minutes(s['last'][j]):>6}"
+              f"{tries:>7}")
+    print()
+
+
+def print_distributions(stats):
+    labels = [f"{int(lo * 100)}-{int(hi * 100)}%" for lo, hi in zip(RATE_BINS, RATE_BINS[1:])]
+    print("Problems by solve rate")
+    print(f"  {'series':<8}" + "".join(f"{label:>9}" for label in labels))
+    for series, counts in distributions(stats).items():
+        print(f"  {series:<8}" + "".join(f"{n:>9}" for n in counts))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    out = pop_option(args, "--json", None)
+    cache_dir = CACHE_DIR
+    if "--no-cache" in args:
+        args.remove("--no-cache")
+        cache_dir = None
+    if any(a.startswith("--") for a in args):
+        print("Usage: python replay_analytics.py [replay.json ...] [--json FILE] [--no-cache]")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats, counts = analyze_files(args, cache_dir)
+    elapsed = time.perf_counter() - start
+
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report_dict(stats), f, separators=(",", ":"), ensure_ascii=False)
+    else:
+        for s in stats:
+            print_contest(s)
+        print_distributions(stats)
+    print(f"{len(stats)} contests, {sum(len(s['problems']) for s in stats)} problems in "
+          f"{elapsed * 1000:.1f} ms ({', '.join(f'{n} {k}' for k, n in counts.items())})",
+          file=sys.stderr)
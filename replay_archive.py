@@ -0,0 +1,292 @@
+"""
+SQLite archive of every converted contest, for queries across contests.
+
+Each replay (a replay JSON file, a replay dict, or a replay_model.Contest
+straight from a parser) is stored in normalized tables:
+
+    contests      id, slug, name, duration, freeze, source_sha256
+    universities  id, name
+    teams         id, contest_id, position, name, university_id, logo
+    problems      id, contest_id, position, letter
+    submissions   team_id, problem_id, contest_id, time, tries, first
+
+with indexes on university name, team name and (contest, time). A contest
+is identified by its slug (the file name without .json, e.g. "nac2024").
+Re-ingesting a slug replaces only that contest's rows, and a file whose
+bytes have not changed since the last ingest is skipped.
+
+Penalty is in seconds, 20 minutes per wrong try, as in replay_keyframes.py.
+Standings are the true standings at time t; the freeze is not applied.
+
+Usage:
+    python replay_archive.py ingest [replay.json ...] [--db FILE]
+    python replay_archive.py history <university or team> [--db FILE]
+    python replay_archive.py curve <slug> <problem> [--db FILE]
+    python replay_archive.py standings <slug> <minute> [--db FILE]
+
+ingest without files loads every replay in src/assets.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from replay_model import PENALTY_PER_TRY, Contest
+
+DEFAULT_DB = "replay_archive.sqlite"
+ASSETS_GLOB = os.path.join("src", "assets", "*.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contests (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    name TEXT,
+    duration INTEGER NOT NULL,
+    freeze INTEGER NOT NULL,
+    source_sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS universities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    university_id INTEGER NOT NULL REFERENCES universities(id),
+    logo TEXT
+);
+CREATE TABLE IF NOT EXISTS problems (
+    id INTEGER PRIMARY KEY,
+    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    letter TEXT NOT NULL,
+    UNIQUE (contest_id, letter)
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    problem_id INTEGER NOT NULL REFERENCES problems(id) ON DELETE CASCADE,
+    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+    time INTEGER NOT NULL,
+    tries INTEGER NOT NULL,
+    first INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (team_id, problem_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS teams_name ON teams(name);
+CREATE INDEX IF NOT EXISTS teams_university ON teams(university_id);
+CREATE INDEX IF NOT EXISTS teams_contest ON teams(contest_id);
+CREATE INDEX IF NOT EXISTS submissions_contest_time ON submissions(contest_id, time);
+"""
+
+
+def connect(path=DEFAULT_DB):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def slug_for(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def ingest(conn, slug, data, source_sha256=None):
+    """
+    Store one replay (a dict or a Contest) under `slug`, replacing whatever
+    was stored under it before. Other contests are not touched.
+    """
+    if isinstance(data, Contest):
+        data = data.to_dict()
+
+    with conn:
+        conn.execute("DELETE FROM contests WHERE slug = ?", (slug,))
+        contest_id = conn.execute(
+            "INSERT INTO contests (slug, name, duration, freeze, source_sha256) VALUES (?, ?, ?, ?, ?)",
+            (slug, data.get("name"), data["duration"], data["freeze"], source_sha256),
+        ).lastrowid
+
+        problem_ids = {}
+        for position, letter in enumerate(data["problems"]):
+            problem_ids[letter] = conn.execute(
+                "INSERT INTO problems (contest_id, position, letter) VALUES (?, ?, ?)",
+                (contest_id, position, letter),
+            ).lastrowid
+
+        universities = {}
+        rows = []
+        for position, team in enumerate(data["teams"]):
+            university = team.get("university") or team["name"]
+            if university not in universities:
+                conn.execute("INSERT OR IGNORE INTO universities (name) VALUES (?)", (university,))
+                universities[university] = conn.execute(
+                    "SELECT id FROM universities WHERE name = ?", (university,)
+                ).fetchone()[0]
+
+            team_id = conn.execute(
+                "INSERT INTO teams (contest_id, position, name, university_id, logo) VALUES (?, ?, ?, ?, ?)",
+                (contest_id, position, team["name"], universities[university], team.get("logo")),
+            ).lastrowid
+
+            for letter, info in team["submissions"].items():
+                if info and letter in problem_ids:
+                    rows.append((team_id, problem_ids[letter], contest_id, info["time"],
+                                 info["tries"], 1 if info.get("first") else 0))
+
+        conn.executemany(
+            "INSERT INTO submissions (team_id, problem_id, contest_id, time, tries, first) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+        # Universities only the replaced contest referred to
+        conn.execute("DELETE FROM universities WHERE id NOT IN (SELECT university_id FROM teams)")
+
+    return contest_id
+
+
+def ingest_file(conn, path, slug=None):
+    """
+    Ingest a replay JSON file. Returns False if the stored copy came from
+    the same bytes and nothing was done.
+    """
+    slug = slug or slug_for(path)
+    with open(path, "rb") as f:
+        body = f.read()
+    digest = hashlib.sha256(body).hexdigest()
+
+    row = conn.execute("SELECT source_sha256 FROM contests WHERE slug = ?", (slug,)).fetchone()
+    if row and row[0] == digest:
+        return False
+
+    ingest(conn, slug, json.loads(body), digest)
+    return True
+
+
+def replay_files(paths=None):
+    """Replay JSON files, leaving out the side files save_replay may write next to them."""
+    paths = paths or sorted(glob.glob(ASSETS_GLOB))
+    return [p for p in paths if "." not in slug_for(p)]
+
+
+# ------------------------------------
+# Queries
+# ------------------------------------
+
+# Per-team solved count and penalty, restricted to submissions up to :t
+TEAM_TOTALS = f"""
+SELECT t.id AS team_id, t.contest_id, t.name, u.name AS university,
+       COUNT(s.team_id) AS solved,
+       COALESCE(SUM(s.time + (s.tries - 1) * {PENALTY_PER_TRY}), 0) AS penalty
+FROM teams t
+JOIN universities u ON u.id = t.university_id
+LEFT JOIN submissions s ON s.team_id = t.id AND s.time <= :t
+WHERE {{where}}
+GROUP BY t.id
+"""
+
+RANKED = f"""
+WITH totals AS ({TEAM_TOTALS})
+SELECT RANK() OVER (PARTITION BY contest_id ORDER BY solved DESC, penalty) AS rank,
+       team_id, contest_id, name, university, solved, penalty
+FROM totals
+"""
+
+
+def standings_at(conn, slug, t):
+    """[(rank, team, university, solved, penalty)] at contest second t, best first."""
+    query = RANKED.format(where="t.contest_id = (SELECT id FROM contests WHERE slug = :slug)")
+    rows = conn.execute(
+        f"SELECT rank, name, university, solved, penalty FROM ({query}) "
+        "ORDER BY solved DESC, penalty, name",
+        {"slug": slug, "t": t},
+    )
+    return rows.fetchall()
+
+
+def team_history(conn, name):
+    """
+    Final results of every team whose name or university is `name`, in
+    every contest: [(slug, contest, rank, teams, team, university, solved, penalty)].
+    """
+    query = RANKED.format(where="t.contest_id IN (SELECT contest_id FROM teams t2 "
+                                "JOIN universities u2 ON u2.id = t2.university_id "
+                                "WHERE t2.name = :name OR u2.name = :name)")
+    rows = conn.execute(
+        f"""
+        SELECT c.slug, c.name, r.rank,
+               (SELECT COUNT(*) FROM teams WHERE contest_id = c.id),
+               r.name, r.university, r.solved, r.penalty
+        FROM ({query}) r
+        JOIN contests c ON c.id = r.contest_id
+        WHERE r.name = :name OR r.university = :name
+        ORDER BY c.slug, r.rank
+        """,
+        {"name": name, "t": 1 << 62},
+    )
+    return rows.fetchall()
+
+
+def solve_curve(conn, slug, letter):
+    """[(time, solves so far)] for one problem, one entry per accepted submission."""
+    rows = conn.execute(
+        """
+        SELECT s.time, COUNT(*) OVER (ORDER BY s.time ROWS UNBOUNDED PRECEDING)
+        FROM submissions s
+        JOIN problems p ON p.id = s.problem_id
+        JOIN contests c ON c.id = s.contest_id
+        WHERE c.slug = ? AND p.letter = ?
+        ORDER BY s.time
+        """,
+        (slug, letter),
+    )
+    return rows.fetchall()
+
+
+def pop_option(args, name, default):
+    if name not in args:
+        return default
+    i = args.index(name)
+    value = args[i + 1]
+    del args[i:i + 2]
+    return value
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db = pop_option(args, "--db", DEFAULT_DB)
+
+    usage = ("Usage: python replay_archive.py ingest [replay.json ...] [--db FILE]\n"
+             "       python replay_archive.py history <university or team> [--db FILE]\n"
+             "       python replay_archive.py curve <slug> <problem> [--db FILE]\n"
+             "       python replay_archive.py standings <slug> <minute> [--db FILE]")
+    if not args:
+        print(usage)
+        sys.exit(1)
+
+    command, args = args[0], args[1:]
+    conn = connect(db)
+
+    if command == "ingest":
+        for path in replay_files(args):
+            changed = ingest_file(conn, path)
+            print(f"[{'  ok' if changed else 'skip'}] {slug_for(path)}")
+
+    elif command == "history" and len(args) == 1:
+        for slug, name, rank, teams, team, university, solved, penalty in team_history(conn, args[0]):
+            print(f"{slug:<12}{rank:>4}/{teams:<5}{solved:>3} solved {penalty // 60:>6} min  {team}")
+
+    elif command == "curve" and len(args) == 2:
+        for time, solves in solve_curve(conn, args[0], args[1]):
+            print(f"{time // 60:>4}:{time % 60:02d}  {solves}")
+
+    elif command == "standings" and len(args) == 2:
+        for rank, team, university, solved, penalty in standings_at(conn, args[0], float(args[1]) * 60):
+            print(f"{rank:>4}  {solved:>3} {penalty // 60:>6}  {team}")
+
+    else:
+        print(usage)
+        sys.exit(1)
@@ -0,0 +1,318 @@
+"""
+A long-running conversion worker on a Unix domain socket, and its client.
+
+Converting one snapshot with a fresh `python *_replay.py` pays interpreter
+startup and the imports (lxml, the parser modules, replay_output and the
+side-file writers it loads) before a single row is parsed, which dominates
+when a page is converted every few seconds. The daemon imports every parser
+in replay_formats.FORMATS once, keeps their compiled regexes and an
+optional parse cache warm, and runs jobs sent over the socket.
+
+Protocol, one job per connection: the client sends a JSON header line,
+
+    {"format": "nerc", "input": "/abs/page.html"}            page on disk
+    {"format": "nerc", "size": 123456}                        page bytes follow
+
+plus optional "output" (the daemon writes the replay there with
+save_replay, like batch_replay.py, and its side files too with
+"side_files": true), "minify" and the "name" / "duration" / "freeze"
+overrides. The daemon answers with a JSON
+header line, {"ok": true, "teams": ..., "problems": ..., "seconds": ...,
+"size": N} followed by N bytes of replay JSON when no output was given, or
+{"ok": false, "error": "..."}. {"op": "ping"} and {"op": "stop"} are also
+understood.
+
+The client side (convert(), the convert command) only imports the standard
+library; when no daemon is listening it converts in-process instead, so
+scripts can use it unconditionally.
+
+Usage:
+    python replay_daemon.py serve [--socket PATH] [--cache]
+    python replay_daemon.py convert <format> <input> <output|-> [--minify]
+                                    [--socket PATH] [--local]
+    python replay_daemon.py ping|stop [--socket PATH]
+
+--local skips the daemon. The socket defaults to $REPLAY_DAEMON_SOCKET or
+.replay_daemon.sock in the current directory. See bench_daemon.py for
+per-job latency against a cold invocation.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+
+DEFAULT_SOCKET = os.environ.get("REPLAY_DAEMON_SOCKET", ".replay_daemon.sock")
+METADATA_KEYS = ("name", "duration", "freeze")
+
+
+# ----------------------------------------
+# Framing
+# ----------------------------------------
+
+def send_message(wfile, header, payload=b""):
+    if payload:
+        header = dict(header, size=len(payload))
+    wfile.write(json.dumps(header).encode() + b"\n")
+    if payload:
+        wfile.write(payload)
+    wfile.flush()
+
+
+def read_message(rfile):
+    """(header, payload) from a stream; payload is b"" without a "size"."""
+    line = rfile.readline()
+    if not line.endswith(b"\n"):
+        raise ConnectionError("connection closed before a complete header")
+    header = json.loads(line)
+    size = header.get("size", 0)
+    payload = rfile.read(size) if size else b""
+    if len(payload) != size:
+        raise ConnectionError(f"expected {size} bytes, got {len(payload)}")
+    return header, payload
+
+
+# ----------------------------------------
+# Jobs
+# ----------------------------------------
+
+def run_job(header, payload, cache=None):
+    """
+    Convert one job in this process. Returns (response header, payload),
+    the payload being the replay JSON when the job has no "output".
+    """
+    import replay_formats
+    from replay_output import dumps_bytes, save_replay
+
+    start = time.perf_counter()
+    source = payload if "size" in header else header["input"]
+    metadata = {key: header[key] for key in METADATA_KEYS if header.get(key) is not None}
+
+    # A job's output is its response, so what a parser prints is kept for
+    # the error a sys.exit() turns into
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            data = replay_formats.convert(header["format"], source, metadata, cache)
+    except SystemExit as e:
+        raise RuntimeError(log.getvalue().strip() or f"parser exited with status {e.code}") from None
+
+    minify = header.get("minify", False)
+    if header.get("output"):
+        save_replay(data, header["output"], ensure_ascii=False, minify=minify,
+                    side_files=header.get("side_files", False))
+        body = b""
+    else:
+        body = dumps_bytes(data, minify=minify, ensure_ascii=False)
+
+    response = {
+        "ok": True,
+        "teams": len(data["teams"]),
+        "problems": len(data["problems"]),
+        "seconds": time.perf_counter() - start,
+    }
+    return response, body
+
+
+# ----------------------------------------
+# Server
+# ----------------------------------------
+
+class DaemonServer(socketserver.UnixStreamServer):
+    # Jobs are CPU-bound and the parsers print, so they run one at a time;
+    # batch_replay.py is the tool for converting many pages in parallel
+    def __init__(self, path, cache=None):
+        super().__init__(path, DaemonHandler)
+        self.cache = cache
+        self.started = time.time()
+        self.jobs = 0
+        self.stopping = False
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            header, payload = read_message(self.rfile)
+        except (ConnectionError, ValueError) as e:
+            send_message(self.wfile, {"ok": False, "error": f"bad request: {e}"})
+            return
+
+        op = header.get("op", "convert")
+        if op == "ping":
+            send_message(self.wfile, {"ok": True, "pid": os.getpid(), "jobs": self.server.jobs,
+                                      "uptime": time.time() - self.server.started})
+        elif op == "stop":
+            send_message(self.wfile, {"ok": True})
+            self.server.stopping = True
+        elif op == "convert":
+            self.server.jobs += 1
+            try:
+                response, body = run_job(header, payload, self.server.cache)
+            except (Exception, SystemExit) as e:
+                response, body = {"ok": False, "error": f"{type(e).__name__}: {e}"}, b""
+            send_message(self.wfile, response, body)
+        else:
+            send_message(self.wfile, {"ok": False, "error": f"unknown op {op!r}"})
+
+
+def warm_up():
+    """Import every parser module and what the output path needs."""
+    import replay_formats
+    import replay_output  # noqa: F401 (keyframes, resolver, timeline)
+
+    for fmt in replay_formats.FORMATS:
+        replay_formats.parser_module(fmt)
+
+
+def serve(path=DEFAULT_SOCKET, use_cache=False):
+    if os.path.exists(path):
+        if ping(path) is not None:
+            print(f"A daemon is already listening on {path}", file=sys.stderr)
+            return 1
+        os.unlink(path)  # left behind by a daemon that was killed
+
+    start = time.perf_counter()
+    warm_up()
+    cache = None
+    if use_cache:
+        from parse_cache import ParseCache
+
+        cache = ParseCache()
+
+    server = DaemonServer(path, cache)
+    print(f"Serving conversions on {path} (warm-up {time.perf_counter() - start:.2f}s, "
+          f"pid {os.getpid()})", file=sys.stderr)
+    try:
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+    print(f"Stopped after {server.jobs} jobs", file=sys.stderr)
+    return 0
+
+
+# ----------------------------------------
+# Client
+# ----------------------------------------
+
+def request(header, payload=b"", path=DEFAULT_SOCKET):
+    """
+    Send one message to the daemon and return its (header, payload), or
+    None when no daemon is listening on `path`.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        with sock.makefile("rwb") as f:
+            send_message(f, header, payload)
+            return read_message(f)
+    finally:
+        sock.close()
+
+
+def ping(path=DEFAULT_SOCKET):
+    response = request({"op": "ping"}, path=path)
+    return response and response[0]
+
+
+def convert(fmt, source, output=None, minify=False, metadata=None, path=DEFAULT_SOCKET,
+            use_daemon=True):
+    """
+    Convert a page (a file path or its raw bytes) as `fmt`, on the daemon
+    when one is listening and in-process otherwise. With `output` the
+    replay is written there; without, the replay JSON
+    bytes come back. Returns (response header, replay bytes, where), where
+    is "daemon" or "local". Raises RuntimeError when the job fails.
+    """
+    header = {"format": fmt, "minify": minify}
+    header.update({key: value for key, value in (metadata or {}).items() if key in METADATA_KEYS})
+    if output:
+        header["output"] = os.path.abspath(output)
+    payload = b""
+    if isinstance(source, bytes):
+        payload = source
+    else:
+        # The daemon may run in another directory
+        header["input"] = os.path.abspath(source)
+
+    response = request(header, payload, path) if use_daemon else None
+    where = "daemon"
+    if response is None:
+        where = "local"
+        if payload:
+            header["size"] = len(payload)
+        try:
+            response = run_job(header, payload)
+        except (Exception, SystemExit) as e:
+            response = ({"ok": False, "error": f"{type(e).__name__}: {e}"}, b"")
+
+    header, body = response
+    if not header.get("ok"):
+        raise RuntimeError(header.get("error", "conversion failed"))
+    return header, body, where
+
+
+# ----------------------------------------
+# CLI
+# ----------------------------------------
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    socket_path = DEFAULT_SOCKET
+    if "--socket" in args:
+        i = args.index("--socket")
+        socket_path = args[i + 1]
+        del args[i:i + 2]
+
+    flags = {flag: flag in args for flag in ("--cache", "--minify", "--local")}
+    args = [a for a in args if a not in flags]
+
+    command = args[0] if args else None
+    if command == "serve" and len(args) == 1:
+        sys.exit(serve(socket_path, flags["--cache"]))
+
+    if command in ("ping", "stop") and len(args) == 1:
+        response = request({"op": command}, path=socket_path)
+        if response is None:
+            print(f"No daemon listening on {socket_path}")
+            sys.exit(1)
+        if command == "ping":
+            info = response[0]
+            print(f"Daemon pid {info['pid']}: {info['jobs']} jobs, up {info['uptime']:.0f}s")
+        else:
+            print("Daemon stopped")
+        sys.exit(0)
+
+    if command == "convert" and len(args) == 4:
+        fmt, source, output = args[1:]
+        try:
+            info, body, where = convert(fmt, source, None if output == "-" else output,
+                                        flags["--minify"], path=socket_path,
+                                        use_daemon=not flags["--local"])
+        except RuntimeError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            sys.exit(1)
+        if output == "-":
+            sys.stdout.buffer.write(body)
+        else:
+            print(f"Saved {info['teams']} teams, {info['problems']} problems to {output} "
+                  f"({where}, {info['seconds'] * 1000:.0f} ms)", file=sys.stderr)
+        sys.exit(0)
+
+    print("Usage: python replay_daemon.py serve [--socket PATH] [--cache]\n"
+          "       python replay_daemon.py convert <format> <input> <output|-> [--minify] "
+          "[--socket PATH] [--local]\n"
+          "       python replay_daemon.py ping|stop [--socket PATH]")
+    sys.exit(1)
@@ -0,0 +1,227 @@
+"""
+Incremental ranking for replays.
+
+App.jsx's computeTeams rebuilds every team and re-sorts the whole list for
+each revealed submission. ReplayEngine instead keeps every team's sort key
+(solved desc, penalty asc, name) in a bucketed sorted list with a Fenwick
+tree over the bucket sizes, so applying a submission and asking for a rank
+only cost a couple of binary searches plus a short list insert.
+
+    engine = ReplayEngine(data)
+    for event in build_timeline(data)["events"]:
+        old_rank, new_rank = engine.apply(event)
+    engine.rank_of("Some Team"), engine.top(10)
+
+Events are timeline records ([team, problem, time, tries, first], see
+replay_timeline.py) and can be applied in any order.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+from replay_model import PENALTY_PER_TRY
+
+
+class SortedKeyList:
+    """
+    Sorted list of unique keys split into buckets of at most 2 * load items.
+    A Fenwick tree over the bucket lengths turns a bucket number into a
+    position (and back) in O(log n).
+    """
+
+    def __init__(self, keys=(), load=256):
+        self._load = load
+        keys = sorted(keys)
+        self._buckets = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._maxes = [b[-1] for b in self._buckets]
+        self._len = len(keys)
+        self._rebuild_index()
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild_index(self):
+        n = len(self._buckets)
+        tree = [0] * (n + 1)
+        for i, b in enumerate(self._buckets, 1):
+            tree[i] += len(b)
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _update(self, bucket, delta):
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, bucket):
+        """Number of keys in the buckets before `bucket`."""
+        total = 0
+        i = bucket
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, key):
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._rebuild_index()
+            return
+
+        b = bisect_left(self._maxes, key)
+        if b == len(self._buckets):
+            b -= 1
+        bucket = self._buckets[b]
+        insort(bucket, key)
+        self._maxes[b] = bucket[-1]
+
+        if len(bucket) > 2 * self._load:
+            half = len(bucket) // 2
+            self._buckets[b:b + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[b:b + 1] = [bucket[half - 1], bucket[-1]]
+            self._rebuild_index()
+        else:
+            self._update(b, 1)
+
+    def remove(self, key):
+        b = bisect_left(self._maxes, key)
+        bucket = self._buckets[b]
+        del bucket[bisect_left(bucket, key)]
+        self._len -= 1
+
+        if bucket:
+            self._maxes[b] = bucket[-1]
+            self._update(b, -1)
+        else:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._rebuild_index()
+
+    def index(self, key):
+        """Number of keys smaller than `key`."""
+        b = bisect_left(self._maxes, key)
+        if b == len(self._buckets):
+            return self._len
+        return self._before(b) + bisect_left(self._buckets[b], key)
+
+    def count_le(self, key):
+        b = bisect_right(self._maxes, key)
+        if b == len(self._buckets):
+            return self._len
+        return self._before(b) + bisect_right(self._buckets[b], key)
+
+    def __getitem__(self, k):
+        if not 0 <= k < self._len:
+            raise IndexError(k)
+        # Fenwick descent to the bucket holding position k
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return self._buckets[pos][k]
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+
+class ReplayEngine:
+    def __init__(self, data):
+        self.teams = [t["name"] for t in data["teams"]]
+        self.problems = list(data["problems"])
+        self._index_of = {name: i for i, name in enumerate(self.teams)}
+
+        n = len(self.teams)
+        self.solved = [0] * n
+        self.penalty = [0] * n
+        self._accepted = [set() for _ in range(n)]
+        self._keys = [self._key(i) for i in range(n)]
+        self._sorted = SortedKeyList(self._keys)
+
+        # (team, key before the change) for every applied event
+        self._log = []
+
+    def _key(self, team):
+        return (-self.solved[team], self.penalty[team], self.teams[team], team)
+
+    def _team(self, team):
+        return team if isinstance(team, int) else self._index_of[team]
+
+    def apply(self, event):
+        """
+        Apply one accepted submission. Returns (old_rank, new_rank); a
+        repeated solve of the same problem is ignored, like in App.jsx.
+        """
+        team, problem, time, tries = event[0], event[1], event[2], event[3]
+        old_key = self._keys[team]
+        old_rank = self._sorted.index(old_key) + 1
+
+        if problem in self._accepted[team]:
+            return old_rank, old_rank
+
+        self._accepted[team].add(problem)
+        self.solved[team] += 1
+        self.penalty[team] += time + (tries - 1) * PENALTY_PER_TRY
+
+        new_key = self._key(team)
+        self._sorted.remove(old_key)
+        self._sorted.add(new_key)
+        self._keys[team] = new_key
+        self._log.append((team, old_key))
+
+        return old_rank, self._sorted.index(new_key) + 1
+
+    def sort_key(self, team):
+        """Current sort key (-solved, penalty, name, index); smaller is better."""
+        return self._keys[self._team(team)]
+
+    def rank_of(self, team):
+        """1-based rank of a team (index or name)."""
+        return self._sorted.index(self._keys[self._team(team)]) + 1
+
+    def top(self, k):
+        """Indices of the k best teams, best first."""
+        k = min(k, len(self._sorted))
+        return [self._sorted[i][3] for i in range(k)]
+
+    def standings(self):
+        return [key[3] for key in self._sorted]
+
+    def checkpoint(self):
+        return len(self._log)
+
+    def rank_changes_since(self, checkpoint):
+        """
+        {team: (rank at checkpoint, rank now)} for every team that solved
+        something since `checkpoint` and moved. Teams that were only pushed
+        down by those moves are not listed.
+        """
+        old_keys = {}
+        for team, key in self._log[checkpoint:]:
+            old_keys.setdefault(team, key)
+        if not old_keys:
+            return {}
+
+        # The checkpoint's key set is the current one with the moved teams'
+        # keys swapped back, so count around that
+        new_sorted = sorted(self._keys[t] for t in old_keys)
+        old_sorted = sorted(old_keys.values())
+
+        changes = {}
+        for team, key in old_keys.items():
+            below = (self._sorted.index(key)
+                     - bisect_left(new_sorted, key)
+                     + bisect_left(old_sorted, key))
+            old_rank = below + 1
+            new_rank = self.rank_of(team)
+            if old_rank != new_rank:
+                changes[team] = (old_rank, new_rank)
+        return changes
@@ -0,0 +1,100 @@
+"""
+Registry of the scoreboard formats the converters understand.
+
+Maps a short format name to the module that parses it and a function that
+turns a page (saved on disk or already fetched) into the replay dict.
+Modules are imported lazily so a process only pays for the parsers it
+actually uses.
+"""
+
+import importlib
+
+from replay_profile import stage
+
+
+FORMATS = {
+    # name: (module, convert(module, source) -> replay dict)
+    # `source` is a path to a saved page or the page's raw bytes
+    "domjudge": ("domjudge_replay", lambda m, src: m.parse_domjudge(label(src), src)),
+    "domjudge_euc": ("domjudge_euc_replay", lambda m, src: m.parse_domjudge(label(src), src)),
+    "pc2": ("pc2_replay", lambda m, src: m.parse_domjudge(label(src), src)),
+    "kattis": ("kattis_replay", lambda m, src: m.parse_kattis_html(read_bytes(src))),
+    "nerc": ("neerc_replay", lambda m, src: m.parse_nerc_fast(src)),
+    "boca": ("latam_replay", lambda m, src: m.parse_boca_html(read_bytes(src))),
+    "polish": ("polish_replay", lambda m, src: m.parse_standings(src)),
+    "apac": ("apac2026_replay", lambda m, src: m.parse_apac_standings(read_bytes(src))),
+    "naipc16": ("naipc16_replay", lambda m, src: m.parse_naipc_2016_from_file(src)),
+    "ccs": ("ccs_feed", lambda m, src: m.parse_event_feed(src)),
+}
+
+# Keys a manifest or caller may use to override what the parser reports
+METADATA_KEYS = ("name", "duration", "freeze")
+
+
+def read_bytes(source):
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def label(source):
+    return "<page bytes>" if isinstance(source, bytes) else source
+
+
+def parser_module(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    return importlib.import_module(FORMATS[fmt][0])
+
+
+def convert(fmt, source, metadata=None, cache=None, profile=None):
+    """
+    Parse a page (a file path or its raw bytes) as `fmt` and apply
+    metadata overrides. With a parse_cache.ParseCache, an unchanged page
+    parsed by unchanged code is returned from the cache without parsing.
+    The page is hashed as it is read and the parser still gets the path,
+    so streaming and mmap parsers keep their memory use. With a
+    replay_profile.Profile, reading (hashing), cache lookups and parsing
+    are timed as separate stages.
+    """
+    if cache is None:
+        module = parser_module(fmt)
+        with stage(profile, "parse"):
+            data = FORMATS[fmt][1](module, source)
+    else:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        with stage(profile, "read"):
+            key = cache.key(fmt, FORMATS[fmt][0], source)
+        with stage(profile, "cache"):
+            data = cache.get(key)
+        if data is None:
+            module = parser_module(fmt)
+            with stage(profile, "parse"):
+                data = FORMATS[fmt][1](module, source)
+            with stage(profile, "cache"):
+                cache.put(key, data)
+
+    if profile is not None:
+        profile.count("rows", len(data["teams"]))
+
+    return apply_metadata(data, metadata)
+
+
+def apply_metadata(data, metadata):
+    """`data` with the name, duration and freeze from `metadata` where it sets them."""
+    if not metadata:
+        return data
+
+    # Keep the metadata keys first, like the hand-written assets
+    result = {}
+    for key in METADATA_KEYS:
+        if metadata.get(key) is not None:
+            result[key] = metadata[key]
+        elif key in data:
+            result[key] = data[key]
+    for key, value in data.items():
+        result.setdefault(key, value)
+
+    return result
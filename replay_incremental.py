@@ -0,0 +1,170 @@
+"""
+Row-level incremental reparse of successive snapshots of one scoreboard.
+
+Between two polls of a live page only a handful of team rows change, but the
+parsers extract every cell of every row again. IncrementalParser splits the
+page into team rows with one regex over the raw bytes, looks each row's
+markup up in the rows of the previous snapshot (a dict keyed on the bytes,
+so equal rows are found by hash) and runs the format's own parser only on
+the rows it has not seen: the page with every known team row cut out, so
+the table, thead and tbody around them are still there. The previous
+Contest is then patched in place (Contest.copy_team); rows that only moved
+are copied from the old grid without parsing.
+
+Supported formats are domjudge, kattis and nerc. Their team rows are found
+by ROWS[fmt]: where the region holding them starts and ends (the whole page
+for None) and a pattern for a team row's opening tag; the row runs to the
+next </tr>. The first snapshot, a change in the problems, or a
+reparse that yields a different number of teams than it was given rows all
+fall back to a full parse; when a full parse finds a different number of
+teams than the pattern found rows, the page is not split again and every
+poll is a full parse. So is a poll where more than FULL_REPARSE_SHARE of
+the rows changed.
+
+A row's rank cell is part of its markup, so a team that climbs k places
+also changes the k rows it passes. The usual poll, a few new tries and
+solves, reparses a few rows.
+
+Usage:
+    parser = IncrementalParser("kattis")
+    data = parser.parse_html(page)          # replay dict, like parse_kattis_html
+    contest, teams = parser.stream_html(page)
+
+kattis_replay.py and neerc_replay.py use it for --follow, and
+watch_replay.py for the formats above. bench_incremental.py measures it.
+"""
+
+import importlib
+import re
+import sys
+
+FULL_REPARSE_SHARE = 0.5
+
+# fmt: (module, stream(module, page) -> (contest, teams))
+PARSERS = {
+    "domjudge": ("domjudge_replay", lambda m, page: m.stream_domjudge("<page bytes>", page)),
+    "kattis": ("kattis_replay", lambda m, page: m.stream_kattis_html(page)),
+    "nerc": ("neerc_replay", lambda m, page: m.stream_nerc_fast(page)),
+}
+
+# fmt: (start of the region holding the team rows, its end, a team row's
+# opening tag); None for the whole page. See is_team_row and
+# is_standings_row in the parser modules
+ROWS = {
+    "domjudge": (None, None, rb'<tr\b[^>]*\bid="team:(?![^"]*mobile)[^"]*"[^>]*>'),
+    "kattis": (rb'<table\b[^>]*\bstandings-table\b[^>]*>.*?<tbody\b[^>]*>', b"</tbody",
+               rb'<tr\b[^>]*>'),
+    "nerc": (None, None, rb'<tr\b[^>]*\bclass="(?:[^"]*\s)?row[^"]*"[^>]*>'),
+}
+
+
+class IncrementalParser:
+    def __init__(self, fmt):
+        if fmt not in PARSERS:
+            raise ValueError(f"No incremental parser for {fmt!r} (expected one of {', '.join(PARSERS)})")
+        self.fmt = fmt
+        self.module = importlib.import_module(PARSERS[fmt][0])
+        start, self.region_end, row = ROWS[fmt]
+        self.region_start = start and re.compile(start, re.S)
+        self.row = re.compile(row)
+        self.contest = None
+        self.rows = None     # markup of each team row of the last snapshot, None if not split
+        self.splittable = True
+        self.stats = {"full": 0, "incremental": 0, "rows_parsed": 0, "rows_reused": 0}
+
+    def split(self, page):
+        """
+        (start, end) of every team row, in page order. Only opening tags
+        go through a regex; the rest is bytes.find.
+        """
+        start, end = 0, len(page)
+        if self.region_start is not None:
+            m = self.region_start.search(page)
+            if m is None:
+                return []
+            start = m.end()
+            end = page.find(self.region_end, start)
+            if end < 0:
+                end = len(page)
+
+        spans = []
+        for m in self.row.finditer(page, start, end):
+            close = page.find(b"</tr", m.end(), end)
+            close = page.find(b">", close) + 1 if close >= 0 else 0
+            if not close:
+                break  # unterminated row; the count check falls back to full parses
+            spans.append((m.start(), close))
+        return spans
+
+    def _run(self, page):
+        contest, teams = PARSERS[self.fmt][1](self.module, page)
+        for _ in teams:
+            pass
+        return contest
+
+    def full_parse(self, page, spans):
+        self.contest = self._run(page)
+        self.stats["full"] += 1
+        self.stats["rows_parsed"] += len(self.contest)
+
+        if len(spans) != len(self.contest) and self.splittable:
+            print(f"{self.fmt}: found {len(spans)} team rows but parsed {len(self.contest)} teams; "
+                  f"parsing every snapshot in full", file=sys.stderr)
+            self.splittable = False
+        self.rows = [page[s:e] for s, e in spans] if self.splittable else None
+        return self.contest
+
+    def parse(self, page):
+        """The Contest for a new snapshot (page bytes or str), patched from the last one."""
+        if isinstance(page, str):
+            page = page.encode("utf-8")
+
+        spans = self.split(page) if self.splittable else []
+        if self.rows is None:
+            return self.full_parse(page, spans)
+
+        rows = [page[s:e] for s, e in spans]
+        known = {row: i for i, row in enumerate(self.rows)}
+        changed = [k for k, row in enumerate(rows) if row not in known]
+        if len(changed) > len(rows) * FULL_REPARSE_SHARE:
+            return self.full_parse(page, spans)
+
+        fresh = None
+        if changed:
+            # The page with every known team row cut out
+            pieces, last = [], 0
+            for k, (s, e) in enumerate(spans):
+                pieces.append(page[last:s])
+                if rows[k] not in known:
+                    pieces.append(rows[k])
+                last = e
+            pieces.append(page[last:])
+            fresh = self._run(b"".join(pieces))
+            if len(fresh) != len(changed) or fresh.problems != self.contest.problems:
+                return self.full_parse(page, spans)
+
+        contest = self.contest
+        moved = any(known.get(row, i) != i for i, row in enumerate(rows))
+        old = contest.copy() if moved else contest
+        new_rows = iter(range(len(changed)))
+        for i, row in enumerate(rows):
+            j = known.get(row)
+            if j is None:
+                contest.copy_team(i, fresh, next(new_rows))
+            elif j != i or i >= len(contest):
+                contest.copy_team(i, old, j)
+        contest.truncate(len(rows))
+
+        self.rows = rows
+        self.stats["incremental"] += 1
+        self.stats["rows_parsed"] += len(changed)
+        self.stats["rows_reused"] += len(rows) - len(changed)
+        return contest
+
+    def stream_html(self, page):
+        """(contest, teams) like the parsers' stream functions, for replay_verify.checked."""
+        contest = self.parse(page)
+        return contest, contest.teams()
+
+    def parse_html(self, page):
+        return self.parse(page).to_dict()
@@ -0,0 +1,157 @@
+"""
+Standings keyframes for seeking without recomputing from scratch.
+
+Every `interval` contest seconds the full standings are stored: the rank
+order (team indices, best first) and each team's solved count and penalty
+(seconds, 20 minutes per wrong try, as in App.jsx). A seek to time t starts
+from the keyframe at or before t and only replays the timeline events since
+then (see replay_timeline.py):
+
+    {
+      "interval": 300,
+      "keyframes": [
+        {"time": 0, "event": 0, "order": [...], "solved": [...], "penalty": [...]},
+        {"time": 300, "event": 14, ...},
+        ...
+      ]
+    }
+
+"event" is how many timeline events the keyframe already includes. The
+keyframes ignore the freeze; clamp t to the freeze before seeking, as the
+App does.
+
+Usage:
+    python replay_keyframes.py <replay.json> [--interval MINUTES]
+    python replay_keyframes.py <replay.json> --report
+"""
+
+import json
+import sys
+
+from replay_model import PENALTY_PER_TRY
+from replay_timeline import build_timeline, revealed_count
+
+DEFAULT_INTERVAL = 5 * 60
+
+
+def rank_order(data, solved, penalty):
+    names = [t["name"] for t in data["teams"]]
+    return sorted(range(len(names)), key=lambda i: (-solved[i], penalty[i], names[i]))
+
+
+def build_keyframes(data, timeline=None, interval=DEFAULT_INTERVAL):
+    if timeline is None:
+        timeline = build_timeline(data)
+    events = timeline["events"]
+
+    solved = [0] * len(data["teams"])
+    penalty = [0] * len(data["teams"])
+    keyframes = []
+
+    k = 0
+    t = 0
+    while True:
+        while k < len(events) and events[k][2] <= t:
+            team, _, time, tries, _ = events[k]
+            solved[team] += 1
+            penalty[team] += time + (tries - 1) * PENALTY_PER_TRY
+            k += 1
+
+        keyframes.append({
+            "time": t,
+            "event": k,
+            "order": rank_order(data, solved, penalty),
+            "solved": list(solved),
+            "penalty": list(penalty),
+        })
+
+        if t >= data["duration"] and k == len(events):
+            break
+        t += interval
+
+    return {"interval": interval, "keyframes": keyframes}
+
+
+def standings_at(data, timeline, keyframes, t):
+    """
+    Standings at time t as (order, solved, penalty), starting from the
+    nearest keyframe and replaying only the events after it.
+    """
+    frames = keyframes["keyframes"]
+    frame = frames[min(int(t) // keyframes["interval"], len(frames) - 1)]
+
+    solved = list(frame["solved"])
+    penalty = list(frame["penalty"])
+    events = timeline["events"]
+    end = revealed_count(timeline, t)
+
+    if end == frame["event"]:
+        return frame["order"], solved, penalty
+
+    for team, _, time, tries, _ in events[frame["event"]:end]:
+        solved[team] += 1
+        penalty[team] += time + (tries - 1) * PENALTY_PER_TRY
+
+    return rank_order(data, solved, penalty), solved, penalty
+
+
+def tradeoff_report(data, intervals=(60, 120, 300, 600, 1800, 3600)):
+    """Side file size vs. events replayed per seek, for each interval."""
+    timeline = build_timeline(data)
+    seek_times = range(0, data["duration"] + 1, 10)
+
+    rows = []
+    for interval in intervals:
+        keyframes = build_keyframes(data, timeline, interval)
+        size = len(json.dumps(keyframes, separators=(",", ":")))
+
+        frames = keyframes["keyframes"]
+        replayed = []
+        for t in seek_times:
+            frame = frames[min(t // interval, len(frames) - 1)]
+            replayed.append(revealed_count(timeline, t) - frame["event"])
+
+        rows.append({
+            "interval": interval,
+            "keyframes": len(frames),
+            "bytes": size,
+            "avg_events_per_seek": sum(replayed) / len(replayed),
+            "max_events_per_seek": max(replayed),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    interval = DEFAULT_INTERVAL
+    if "--interval" in args:
+        i = args.index("--interval")
+        interval = int(float(args[i + 1]) * 60)
+        del args[i:i + 2]
+
+    report = "--report" in args
+    if report:
+        args.remove("--report")
+
+    if len(args) != 1:
+        print("Usage: python replay_keyframes.py <replay.json> [--interval MINUTES] [--report]")
+        sys.exit(1)
+
+    with open(args[0], encoding="utf-8") as f:
+        data = json.load(f)
+
+    if report:
+        print(f"{len(data['teams'])} teams, {len(build_timeline(data)['events'])} events")
+        print(f"{'interval':>9}{'frames':>8}{'bytes':>10}{'avg/seek':>10}{'max/seek':>10}")
+        for r in tradeoff_report(data):
+            print(f"{r['interval'] // 60:>7}m{r['keyframes']:>8}{r['bytes']:>10}"
+                  f"{r['avg_events_per_seek']:>10.1f}{r['max_events_per_seek']:>10}")
+        sys.exit(0)
+
+    from replay_output import side_path, write_json
+
+    keyframes = build_keyframes(data, interval=interval)
+    out = side_path(args[0], "keyframes")
+    write_json(keyframes, out, compact=True)
+    print(f"Saved {len(keyframes['keyframes'])} keyframes to {out}")
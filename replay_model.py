@@ -0,0 +1,257 @@
+"""
+Shared in-memory model of a scraped scoreboard.
+
+Every parser fills a Contest instead of building a dict per team and per
+accepted problem. The teams x problems grid lives in flat typed arrays,
+row-major (team i, problem j is index i * len(problems) + j):
+
+    times   int32   accepted time in seconds, NO_TIME if unsolved
+    tries   uint16  tries including the accepted one, 0 if unsolved
+    first   uint64  one bitmask per team, bit j set for first to solve j
+
+Team is a two-slot view (contest, index) over one row of the grid.
+
+Parsers that can see the scoreboard's own totals also record them with
+Team.report(rank, solved, penalty) in `reported` (int32, three per team,
+NO_TIME where unknown), so replay_verify.py can check the grid against
+them. They are not part of the replay JSON.
+
+A parser that finds no scoreboard in a page raises ParseError; its CLI
+prints the message and exits with status 1.
+
+to_dict() produces the replay JSON schema from prompt.md: a submission is
+{"time", "tries"} plus "first": true only for first solves, and a team has
+"logo" only if the parser gave it one.
+"""
+
+from array import array
+
+NO_TIME = -1
+MAX_PROBLEMS = 64
+PENALTY_PER_TRY = 20 * 60
+
+_NOT_REPORTED = array("i", [NO_TIME] * 3)
+
+
+class ParseError(ValueError):
+    """The page is not a scoreboard the parser recognises."""
+
+
+class Contest:
+    __slots__ = ("name", "duration", "freeze", "problems", "team_names", "universities",
+                 "logos", "times", "tries", "first", "reported", "_index", "_blank_times",
+                 "_blank_tries")
+
+    def __init__(self, name=None, duration=5 * 3600, freeze=4 * 3600, problems=None):
+        self.name = name
+        self.duration = duration
+        self.freeze = freeze
+        self.problems = None
+        self.team_names = []
+        self.universities = []
+        self.logos = []
+        self.times = array("i")
+        self.tries = array("H")
+        self.first = array("Q")
+        self.reported = array("i")
+        if problems is not None:
+            self.set_problems(problems)
+
+    def set_problems(self, problems):
+        """Fix the problem letters. Has to happen before the first team is added."""
+        if self.team_names:
+            raise ValueError("problems must be set before any team is added")
+        if len(problems) > MAX_PROBLEMS:
+            raise ValueError(f"at most {MAX_PROBLEMS} problems are supported, got {len(problems)}")
+        self.problems = list(problems)
+        self._index = {p: j for j, p in enumerate(self.problems)}
+        self._blank_times = array("i", [NO_TIME]) * len(self.problems)
+        self._blank_tries = array("H", [0]) * len(self.problems)
+
+    def __len__(self):
+        return len(self.team_names)
+
+    def add_team(self, name, university=None, logo=None):
+        """Append an unsolved row and return its Team view."""
+        if self.problems is None:
+            raise ValueError("set_problems() has to be called before add_team()")
+        self.team_names.append(name)
+        self.universities.append(name if university is None else university)
+        self.logos.append(logo)
+        self.times.extend(self._blank_times)
+        self.tries.extend(self._blank_tries)
+        self.first.append(0)
+        self.reported.extend(_NOT_REPORTED)
+        return Team(self, len(self.team_names) - 1)
+
+    def solve(self, team, problem, time, tries, first=False):
+        """Record an accepted problem (a letter or a column index) for team index `team`."""
+        j = self._index[problem] if isinstance(problem, str) else problem
+        k = team * len(self.problems) + j
+        self.times[k] = time
+        self.tries[k] = tries
+        if first:
+            self.first[team] |= 1 << j
+        else:
+            self.first[team] &= ~(1 << j)
+
+    def report(self, team, rank, solved, penalty):
+        """Record the rank, solved count and penalty (minutes) the scoreboard shows for a team."""
+        self.reported[3 * team:3 * team + 3] = array("i", (rank, solved, penalty))
+
+    def copy(self):
+        contest = Contest(self.name, self.duration, self.freeze, self.problems)
+        contest.team_names = self.team_names[:]
+        contest.universities = self.universities[:]
+        contest.logos = self.logos[:]
+        contest.times = self.times[:]
+        contest.tries = self.tries[:]
+        contest.first = self.first[:]
+        contest.reported = self.reported[:]
+        return contest
+
+    def copy_team(self, i, source, j):
+        """
+        Overwrite team i (or append it, when i == len(self)) with team j of
+        `source`, a Contest with the same problems.
+        """
+        if i == len(self.team_names):
+            self.add_team(source.team_names[j])
+        width = len(self.problems)
+        self.team_names[i] = source.team_names[j]
+        self.universities[i] = source.universities[j]
+        self.logos[i] = source.logos[j]
+        self.times[i * width:(i + 1) * width] = source.times[j * width:(j + 1) * width]
+        self.tries[i * width:(i + 1) * width] = source.tries[j * width:(j + 1) * width]
+        self.first[i] = source.first[j]
+        self.reported[3 * i:3 * i + 3] = source.reported[3 * j:3 * j + 3]
+
+    def truncate(self, n):
+        """Drop every team from index n on."""
+        width = len(self.problems or ())
+        for values, size in ((self.team_names, 1), (self.universities, 1), (self.logos, 1),
+                             (self.times, width), (self.tries, width), (self.first, 1),
+                             (self.reported, 3)):
+            del values[n * size:]
+
+    def team(self, i):
+        return Team(self, i)
+
+    def teams(self):
+        return (Team(self, i) for i in range(len(self.team_names)))
+
+    # ------------------------------------
+    # Bulk operations over the grid
+    # ------------------------------------
+
+    def _rows(self, values):
+        width = len(self.problems)
+        return (values[i * width:(i + 1) * width] for i in range(len(self.team_names)))
+
+    def solved_counts(self):
+        """Number of accepted problems per team."""
+        return [len(row) - row.count(0) for row in self._rows(self.tries)]
+
+    def penalties(self, per_try=PENALTY_PER_TRY):
+        """Penalty per team in seconds: accepted time plus per_try for each wrong try."""
+        result = []
+        for times, tries in zip(self._rows(self.times), self._rows(self.tries)):
+            result.append(sum(t + (n - 1) * per_try for t, n in zip(times, tries) if n))
+        return result
+
+    def first_solvers(self):
+        """Team index of the first solver of each problem, or None."""
+        solvers = [None] * len(self.problems)
+        for i, mask in enumerate(self.first):
+            while mask:
+                j = (mask & -mask).bit_length() - 1
+                if solvers[j] is None:
+                    solvers[j] = i
+                mask &= mask - 1
+        return solvers
+
+    # ------------------------------------
+    # Replay JSON
+    # ------------------------------------
+
+    def header(self):
+        """The replay dict without "teams"."""
+        header = {} if self.name is None else {"name": self.name}
+        header["duration"] = self.duration
+        header["freeze"] = self.freeze
+        header["problems"] = self.problems
+        return header
+
+    def submissions(self, i):
+        width = len(self.problems)
+        base = i * width
+        mask = self.first[i]
+        submissions = {}
+        for j, prob in enumerate(self.problems):
+            tries = self.tries[base + j]
+            if not tries:
+                continue
+            submissions[prob] = {"time": self.times[base + j], "tries": tries}
+            if mask >> j & 1:
+                submissions[prob]["first"] = True
+        return submissions
+
+    def team_dict(self, i):
+        team = {"name": self.team_names[i], "university": self.universities[i]}
+        if self.logos[i] is not None:
+            team["logo"] = self.logos[i]
+        team["submissions"] = self.submissions(i)
+        return team
+
+    def to_dict(self):
+        data = self.header()
+        data["teams"] = [self.team_dict(i) for i in range(len(self.team_names))]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        contest = cls(data.get("name"), data["duration"], data["freeze"], data["problems"])
+        for team in data["teams"]:
+            i = contest.add_team(team["name"], team.get("university"), team.get("logo")).index
+            for prob, info in team["submissions"].items():
+                if info:
+                    contest.solve(i, prob, info["time"], info["tries"], info.get("first", False))
+        return contest
+
+
+class Team:
+    """View of one team's row in a Contest."""
+
+    __slots__ = ("contest", "index")
+
+    def __init__(self, contest, index):
+        self.contest = contest
+        self.index = index
+
+    @property
+    def name(self):
+        return self.contest.team_names[self.index]
+
+    @property
+    def university(self):
+        return self.contest.universities[self.index]
+
+    @property
+    def logo(self):
+        return self.contest.logos[self.index]
+
+    @property
+    def submissions(self):
+        return self.contest.submissions(self.index)
+
+    def solve(self, problem, time, tries, first=False):
+        self.contest.solve(self.index, problem, time, tries, first)
+
+    def report(self, rank, solved, penalty):
+        self.contest.report(self.index, rank, solved, penalty)
+
+    def to_dict(self):
+        return self.contest.team_dict(self.index)
+
+    def __repr__(self):
+        return f"Team({self.name!r}, index={self.index})"
@@ -0,0 +1,185 @@
+"""
+Writing replay JSON (and the side files derived from it) to disk.
+
+Every converter's entry point and the batch driver go through save_replay()
+or stream_replay(), so anything computed from the finished replay is
+produced for all formats.
+
+The side files (SIDE_FILES: the event timeline, standings keyframes and
+unfreeze ceremony, written next to the replay as <name>.<kind>.json) are
+offline-only for now: the frontend and build_assets.py do not use them.
+They are written only with side_files=True (batch_replay.py --side-files),
+or afterwards from a replay JSON with replay_timeline.py,
+replay_keyframes.py and replay_resolver.py.
+
+stream_replay() writes teams as a parser yields them (see replay_model.py)
+instead of from a finished dict. Team records are serialized with orjson when it is
+installed (json otherwise); the layout is the same as json.dump(indent=2),
+or fully compact with minify=True.
+
+stream_replay(), save_replay() and collect_replay() take profile= (a
+replay_profile.Profile) to time the parse, write and side-file stages.
+"""
+
+import contextlib
+import itertools
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from replay_keyframes import DEFAULT_INTERVAL, build_keyframes
+from replay_profile import stage
+from replay_resolver import resolve
+from replay_timeline import build_timeline
+
+SIDE_FILES = ("timeline", "keyframes", "resolver")
+
+
+def side_path(path, kind):
+    """src/assets/nac2025.json -> src/assets/nac2025.<kind>.json"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{kind}{ext or '.json'}"
+
+
+def side_paths(path):
+    return [side_path(path, kind) for kind in SIDE_FILES]
+
+
+@contextlib.contextmanager
+def atomic_open(path):
+    """
+    A binary file to write `path` through: a temporary file next to it,
+    renamed into place when the block ends. Readers never see a
+    half-written file; if the block raises (a parser failing mid-stream),
+    the temporary file is removed and `path` is left as it was.
+    """
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def write_json(data, path, compact=False, ensure_ascii=True):
+    if compact:
+        body = json.dumps(data, separators=(",", ":"), ensure_ascii=ensure_ascii)
+    else:
+        body = json.dumps(data, indent=2, ensure_ascii=ensure_ascii)
+    with atomic_open(path) as f:
+        f.write(body.encode("utf-8"))
+
+
+def dumps_bytes(value, minify=False, ensure_ascii=True):
+    """One JSON value as UTF-8 bytes, in json.dumps' layout."""
+    if orjson is not None:
+        out = orjson.dumps(value, option=0 if minify else orjson.OPT_INDENT_2)
+        # orjson never escapes non-ASCII; only fall back when it matters
+        if not ensure_ascii or out.isascii():
+            return out
+    if minify:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=ensure_ascii).encode()
+    return json.dumps(value, indent=2, ensure_ascii=ensure_ascii).encode("utf-8")
+
+
+def write_replay_stream(header, teams, f, minify=False, ensure_ascii=True):
+    """
+    Write {**header, "teams": [...]} to the binary file `f`, serializing one
+    team at a time. Returns the number of teams written.
+    """
+    # Everything but the teams array, with the array left open
+    head = dumps_bytes({**header, "teams": []}, minify, ensure_ascii)
+    f.write(head[:head.rindex(b"[") + 1])
+
+    sep = b"," if minify else b",\n    "
+    count = 0
+    for team in teams:
+        chunk = dumps_bytes(team, minify, ensure_ascii)
+        if not minify:
+            chunk = chunk.replace(b"\n", b"\n    ")
+        f.write(sep + chunk if count else (b"" if minify else b"\n    ") + chunk)
+        count += 1
+
+    if minify:
+        f.write(b"]}")
+    else:
+        f.write(b"\n  ]\n}" if count else b"]\n}")
+    return count
+
+
+def stream_replay(contest, teams, path, ensure_ascii=True, minify=False,
+                  keyframe_interval=DEFAULT_INTERVAL, side_files=False, profile=None):
+    """
+    Write a replay while the parser produces it: `contest` is the
+    replay_model.Contest the parser fills in and `teams` the generator of
+    its Team views.
+
+    The header is written once the first team is available, so a parser may
+    set the problems while reading its first row. Each team is serialized
+    as soon as it is parsed; the contest itself only keeps the compact
+    arrays, which the side files (with side_files=True) are built from at
+    the end, never from a full replay dict. Returns the number of teams
+    written.
+    """
+    teams = iter(teams) if profile is None else profile.iter("parse", teams)
+
+    with stage(profile, "write"):
+        first = next(teams, None)
+        if first is not None:
+            teams = itertools.chain([first], teams)
+
+        with atomic_open(path) as f:
+            write_replay_stream(contest.header(), (t.to_dict() for t in teams), f, minify, ensure_ascii)
+
+    if side_files:
+        with stage(profile, "collect"):
+            # Past the timeline the side files only need the team names
+            data = contest.header()
+            data["teams"] = [{"name": name} for name in contest.team_names]
+        _save_side_files(data, path, keyframe_interval, profile, contest)
+    return len(contest)
+
+
+def _save_side_files(data, path, keyframe_interval, profile=None, contest=None):
+    # With the Contest, the timeline comes from its arrays and `data` may
+    # hold only the team names
+    with stage(profile, "timeline"):
+        timeline = build_timeline(data if contest is None else contest)
+        write_json(timeline, side_path(path, "timeline"), compact=True)
+
+    with stage(profile, "keyframes"):
+        keyframes = build_keyframes(data, timeline, keyframe_interval)
+        write_json(keyframes, side_path(path, "keyframes"), compact=True)
+
+    with stage(profile, "resolver"):
+        write_json(resolve(data, timeline), side_path(path, "resolver"), compact=True)
+
+
+def save_replay(data, path, ensure_ascii=True, keyframe_interval=DEFAULT_INTERVAL, minify=False,
+                side_files=False, profile=None):
+    """
+    Write the replay JSON to `path`, and with side_files=True its event
+    timeline, standings keyframes and unfreeze ceremony next to it.
+    """
+    with stage(profile, "write"):
+        header = {k: v for k, v in data.items() if k != "teams"}
+        with atomic_open(path) as f:
+            write_replay_stream(header, data["teams"], f, minify, ensure_ascii)
+
+    if side_files:
+        _save_side_files(data, path, keyframe_interval, profile)
+
+
+def collect_replay(contest, teams, profile=None):
+    """The replay dict for a parser's (contest, teams) stream."""
+    for _ in (teams if profile is None else profile.iter("parse", teams)):
+        pass
+    with stage(profile, "collect"):
+        return contest.to_dict()
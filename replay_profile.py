@@ -0,0 +1,156 @@
+"""
+Per-stage timing for the converters, batch and live modes.
+
+A Profile collects wall time per named stage, counters and peak RSS:
+
+    profile = Profile().start()
+    with profile.stage("fetch"):
+        html = fetch(url)
+    stream_replay(contest, teams, out, profile=profile)   # parse, write
+    profile.finish()                                      # report to stderr
+
+Stages nest and each one is charged only its own time: stream_replay
+writes teams while the parser produces them, so the time spent inside the
+parser's generator (Profile.iter) goes to "parse" and only the rest to
+"write". The stages used across the project are:
+
+    fetch      network requests
+    read       reading a saved page
+    parse      the parser's row loop (lxml, cell parsing, Contest updates)
+    write      serializing and writing the replay JSON
+    collect    building the replay dict from the Contest (collect_replay),
+               or the team names the side files need (stream_replay)
+    timeline, keyframes, resolver
+               building and writing each side file (side_files=True)
+
+Every entry point takes --profile [FILE.pstats]; with a file name the run is
+also recorded with cProfile and dumped there (read it with
+python -m pstats FILE.pstats). Functions take profile=None, and with None
+the only cost is one check per stage, not per row.
+"""
+
+import cProfile
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+NO_STAGE = nullcontext()
+_DONE = object()
+
+
+class Profile:
+    def __init__(self, pstats_path=None):
+        self.pstats_path = pstats_path
+        self.stages = {}   # name -> seconds, not counting nested stages
+        self.counts = {}
+        self.total = None
+        self.peak_rss_mb = None
+        self._stack = []
+        self._started = None
+        self._profiler = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.pstats_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def iter(self, name, items, counter="rows"):
+        """Yield from `items`, charging the time spent producing each one to `name`."""
+        items = iter(items)
+        while True:
+            with self.stage(name):
+                item = next(items, _DONE)
+            if item is _DONE:
+                return
+            self.count(counter)
+            yield item
+
+    def stop(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.pstats_path)
+            self._profiler = None
+        if self._started is not None:
+            self.total = time.perf_counter() - self._started
+        # ru_maxrss is in kilobytes on Linux
+        self.peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return self
+
+    def as_dict(self):
+        return {
+            "total_s": self.total,
+            "stages": dict(self.stages),
+            "counts": dict(self.counts),
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        total = self.total or sum(self.stages.values())
+        stages = dict(self.stages)
+        stages["other"] = max(0.0, total - sum(stages.values()))
+
+        print(f"{'stage':<12}{'seconds':>10}{'share':>8}", file=file)
+        for name, seconds in stages.items():
+            share = seconds / total * 100 if total else 0.0
+            print(f"{name:<12}{seconds:>10.3f}{share:>7.1f}%", file=file)
+        print(f"{'total':<12}{total:>10.3f}", file=file)
+
+        extra = [f"{name} {n}" for name, n in self.counts.items()]
+        if self.peak_rss_mb is not None:
+            extra.append(f"peak RSS {self.peak_rss_mb:.0f} MB")
+        if extra:
+            print(", ".join(extra), file=file)
+        if self.pstats_path:
+            print(f"cProfile stats written to {self.pstats_path}", file=file)
+
+    def finish(self, file=None):
+        self.stop()
+        self.report(file)
+
+
+def stage(profile, name):
+    """profile.stage(name), or a no-op context when profiling is off."""
+    return NO_STAGE if profile is None else profile.stage(name)
+
+
+def format_stages(stats):
+    """One-line summary of an as_dict() result, e.g. "parse 1.20s, write 0.10s"."""
+    parts = [f"{name} {seconds:.2f}s" for name, seconds in stats["stages"].items()]
+    parts += [f"{name} {n}" for name, n in stats["counts"].items()]
+    return ", ".join(parts)
+
+
+def profile_from_args(args):
+    """
+    Pop "--profile [FILE.pstats]" from args and return a started Profile,
+    or None without the flag. The next argument is only taken as the dump
+    file if it ends in .pstats or .prof.
+    """
+    if "--profile" not in args:
+        return None
+    i = args.index("--profile")
+    path = None
+    if i + 1 < len(args) and args[i + 1].endswith((".pstats", ".prof")):
+        path = args.pop(i + 1)
+    del args[i]
+    return Profile(path).start()
@@ -0,0 +1,154 @@
+"""
+Every team's rank at every minute of a contest, computed with NumPy.
+
+Replaying the timeline and re-sorting at each minute (what computeTeams in
+App.jsx would do 300 times) costs a full sort of Python objects per minute.
+Here the whole series comes out of a few array operations:
+
+    times, tries   teams x problems matrices (the Contest's own arrays,
+                   viewed without copying)
+    solved[k, i]   problems team i has solved by time point k: each accepted
+                   cell adds 1 at the first time point at or after its time,
+                   then a cumulative sum down the time axis
+    penalty[k, i]  the same with time + 20 min per wrong try (seconds)
+    ranks[k, i]    1 + number of teams with more solved, or as many solved
+                   and less penalty, at time point k
+
+Ranks come from one argsort per time slice of a combined (solved, penalty)
+key, all slices in a single np.argsort call, and a running maximum so tied
+teams share a rank, as in replay_archive.standings_at(). The freeze is
+ignored.
+
+Time points are every `step` seconds from 0, plus the end of the contest;
+a larger step downsamples. The rank matrix is uint16 (uint32 past 65535
+teams), so a 300-minute contest costs 600 bytes per team.
+
+Usage:
+    python replay_ranks.py <replay.json> [--step MINUTES] [--out FILE]
+
+prints the top ten's rank at every hour, or with --out writes
+{"step", "times", "teams", "ranks"} as compact JSON, "ranks" one row per
+time point.
+"""
+
+import json
+import sys
+
+import numpy as np
+
+from replay_model import PENALTY_PER_TRY, Contest
+
+DEFAULT_STEP = 60
+
+
+def as_contest(data):
+    return data if isinstance(data, Contest) else Contest.from_dict(data)
+
+
+def grid(contest):
+    """(times, tries) as teams x problems NumPy views of the Contest's arrays."""
+    n, width = len(contest), len(contest.problems)
+    times = np.frombuffer(contest.times, dtype=np.int32).reshape(n, width)
+    tries = np.frombuffer(contest.tries, dtype=np.uint16).reshape(n, width)
+    return times, tries
+
+
+def time_points(duration, step=DEFAULT_STEP):
+    """0, step, 2 * step, ... and the end of the contest, in seconds."""
+    return np.append(np.arange(0, duration, step, dtype=np.int64), duration)
+
+
+def standings_series(data, step=DEFAULT_STEP):
+    """
+    (points, solved, penalty): the time points and two (points x teams)
+    matrices. Solves after the last time point are not counted.
+    """
+    contest = as_contest(data)
+    times, tries = grid(contest)
+    points = time_points(contest.duration, step)
+    n, count = len(contest), len(points)
+
+    team, _ = np.nonzero(tries)
+    accepted = tries > 0
+    t = times[accepted].astype(np.int64)
+    cost = t + PENALTY_PER_TRY * (tries[accepted].astype(np.int64) - 1)
+
+    # Row of the first time point that includes each solve; row `count`
+    # collects the ones past the end and is dropped
+    slot = np.searchsorted(points, t) * n + team
+    size = (count + 1) * n
+    solved = np.bincount(slot, minlength=size).reshape(count + 1, n)[:count]
+    penalty = np.bincount(slot, weights=cost, minlength=size).reshape(count + 1, n)[:count]
+
+    solved = np.cumsum(solved, axis=0, dtype=np.int32)
+    penalty = np.cumsum(penalty, axis=0).astype(np.int64)
+    return points, solved, penalty
+
+
+def ranks_from(solved, penalty, problems):
+    """Competition ranks (ties share the best rank) for each row of the matrices."""
+    count, n = solved.shape
+
+    # One sortable key per cell, smaller is better: fewer unsolved, then
+    # less penalty. int32 sorts faster when the key fits in it
+    span = int(penalty.max(initial=0)) + 1
+    dtype = np.int32 if (problems + 1) * span < 1 << 31 else np.int64
+    key = (problems - solved.astype(dtype)) * dtype(span) + penalty.astype(dtype)
+
+    order = np.argsort(key, axis=1)
+    ordered = np.take_along_axis(key, order, axis=1)
+
+    # Position in the sorted row, held over a run of equal keys
+    starts = np.ones(ordered.shape, dtype=bool)
+    np.not_equal(ordered[:, 1:], ordered[:, :-1], out=starts[:, 1:])
+    sorted_ranks = np.where(starts, np.arange(1, n + 1, dtype=np.uint32), 0)
+    np.maximum.accumulate(sorted_ranks, axis=1, out=sorted_ranks)
+
+    ranks = np.empty((count, n), dtype=np.uint16 if n < 1 << 16 else np.uint32)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=1)
+    return ranks
+
+
+def rank_matrix(data, step=DEFAULT_STEP):
+    """(points, ranks): time points in seconds and the (points x teams) rank matrix."""
+    contest = as_contest(data)
+    points, solved, penalty = standings_series(contest, step)
+    return points, ranks_from(solved, penalty, len(contest.problems))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    step = DEFAULT_STEP
+    if "--step" in args:
+        i = args.index("--step")
+        step = int(float(args[i + 1]) * 60)
+        del args[i:i + 2]
+
+    out = None
+    if "--out" in args:
+        i = args.index("--out")
+        out = args[i + 1]
+        del args[i:i + 2]
+
+    if len(args) != 1:
+        print("Usage: python replay_ranks.py <replay.json> [--step MINUTES] [--out FILE]")
+        sys.exit(1)
+
+    with open(args[0], encoding="utf-8") as f:
+        contest = Contest.from_dict(json.load(f))
+
+    points, ranks = rank_matrix(contest, step)
+
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump({"step": step, "times": points.tolist(), "teams": contest.team_names,
+                       "ranks": ranks.tolist()}, f, separators=(",", ":"), ensure_ascii=False)
+        print(f"Wrote {ranks.shape[0]} x {ranks.shape[1]} ranks to {out}")
+        sys.exit(0)
+
+    print(f"{ranks.shape[0]} time points x {ranks.shape[1]} teams ({ranks.nbytes} bytes)")
+    hours = [k for k, t in enumerate(points.tolist()) if t % 3600 == 0 and t] or [len(points) - 1]
+    print("rank at hour " + "".join(f"{points[k] // 3600:>5}" for k in hours) + "  team")
+    for i in np.argsort(ranks[-1], kind="stable")[:10].tolist():
+        print(" " * 12 + "".join(f"{ranks[k, i]:>5}" for k in hours) + f"  {contest.team_names[i]}")
@@ -0,0 +1,104 @@
+"""
+Precomputed unfreeze ceremony (resolver) for a replay.
+
+The standings are frozen at `freeze`: submissions after it stay hidden.
+The ceremony then repeatedly takes the lowest-ranked team that still has
+hidden problems and reveals its leftmost one, until nothing is hidden. Each
+reveal can move that team up; everyone else stays put.
+
+resolve() returns the whole ceremony as a step list the frontend can play
+back from the freeze standings:
+
+    {
+      "freeze": 14400,
+      "order": [12, 3, 40, ...],
+      "fields": ["team", "problem", "time", "tries", "first", "from", "to"],
+      "steps": [[40, 2, 15012, 1, 0, 57, 31], ...]
+    }
+
+"order" is the standings at the freeze (team indices, best first), "team"
+and "problem" index into the replay's lists as in replay_timeline.py, and
+"from"/"to" are the team's 1-based ranks before and after the reveal. The
+replay only has accepted submissions, so every step is a solve; wrong
+attempts after the freeze cannot be shown.
+
+The worst pending team comes off a heap and ranks come from ReplayEngine,
+so a ceremony with E hidden solves over T teams costs O(E log T).
+
+Usage:
+    python replay_resolver.py <replay.json> [<replay.json> ...]
+"""
+
+import heapq
+import json
+import sys
+
+from replay_engine import ReplayEngine
+from replay_timeline import build_timeline
+
+FIELDS = ["team", "problem", "time", "tries", "first", "from", "to"]
+
+
+class _Worst:
+    """Heap entry that orders the worst-ranked sort key first."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return self.key > other.key
+
+
+def resolve(data, timeline=None):
+    if timeline is None:
+        timeline = build_timeline(data)
+    freeze = data["freeze"]
+
+    engine = ReplayEngine(data)
+    pending = [[] for _ in data["teams"]]
+    for event in timeline["events"]:
+        if event[2] <= freeze:
+            engine.apply(event)
+        else:
+            pending[event[0]].append(event)
+
+    # pop() takes the leftmost hidden problem
+    for events in pending:
+        events.sort(key=lambda e: e[1], reverse=True)
+
+    order = engine.standings()
+
+    # Only the revealed team's key changes, and it is the one just popped,
+    # so every pending team has exactly one up-to-date heap entry
+    heap = [_Worst(engine.sort_key(team)) for team, events in enumerate(pending) if events]
+    heapq.heapify(heap)
+
+    steps = []
+    while heap:
+        team = heapq.heappop(heap).key[3]
+        event = pending[team].pop()
+        old_rank, new_rank = engine.apply(event)
+        steps.append(list(event) + [old_rank, new_rank])
+        if pending[team]:
+            heapq.heappush(heap, _Worst(engine.sort_key(team)))
+
+    return {"freeze": freeze, "order": order, "fields": FIELDS, "steps": steps}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python replay_resolver.py <replay.json> [<replay.json> ...]")
+        sys.exit(1)
+
+    from replay_output import side_path, write_json
+
+    for path in sys.argv[1:]:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        resolver = resolve(data)
+        out = side_path(path, "resolver")
+        write_json(resolver, out, compact=True)
+        moves = sum(1 for s in resolver["steps"] if s[5] != s[6])
+        print(f"Saved {len(resolver['steps'])} reveals ({moves} rank changes) to {out}")
@@ -0,0 +1,118 @@
+"""
+Pre-sorted event timeline written next to each replay JSON.
+
+The frontend otherwise flattens teams x problems into a submission list,
+sorts it on every contest load and filters it on every tick. The timeline
+has that list already sorted, plus a per-minute offset index, so finding
+the submissions revealed at time t is one lookup (and a short scan within
+the minute) instead of a sort and a full scan:
+
+    {
+      "fields": ["team", "problem", "time", "tries", "first"],
+      "events": [[12, 0, 65, 1, 1], [3, 0, 140, 2, 0], ...],
+      "minute_index": [0, 1, 1, 4, ...]
+    }
+
+"team" and "problem" index into the replay's "teams" and "problems" lists.
+minute_index[m] is the number of events with time < 60 * m, so the events
+revealed at time t are events[:k] where k starts at
+minute_index[t // 60] and only events within that minute need checking.
+
+build_timeline() takes a replay dict or a replay_model.Contest; from a
+Contest the events are read off its typed arrays, without team records.
+
+Usage:
+    python replay_timeline.py <replay.json> [<replay.json> ...]
+"""
+
+import json
+import sys
+
+from replay_model import Contest
+
+FIELDS = ["team", "problem", "time", "tries", "first"]
+
+
+def build_events(data):
+    if isinstance(data, Contest):
+        return contest_events(data)
+
+    events = []
+    for team_idx, team in enumerate(data["teams"]):
+        for prob_idx, prob in enumerate(data["problems"]):
+            info = team["submissions"].get(prob)
+            if not info:
+                continue
+            events.append([
+                team_idx,
+                prob_idx,
+                info["time"],
+                info["tries"],
+                1 if info.get("first") else 0,
+            ])
+
+    events.sort(key=lambda e: (e[2], e[0], e[1]))
+    return events
+
+
+def contest_events(contest):
+    width = len(contest.problems)
+    times, first = contest.times, contest.first
+    events = []
+    for k, tries in enumerate(contest.tries):
+        if tries:
+            team_idx, prob_idx = divmod(k, width)
+            events.append([team_idx, prob_idx, times[k], tries, first[team_idx] >> prob_idx & 1])
+
+    events.sort(key=lambda e: (e[2], e[0], e[1]))
+    return events
+
+
+def build_minute_index(events, duration):
+    last_time = events[-1][2] if events else 0
+    minutes = max(duration, last_time) // 60 + 2
+
+    index = []
+    k = 0
+    for m in range(minutes):
+        while k < len(events) and events[k][2] < 60 * m:
+            k += 1
+        index.append(k)
+    return index
+
+
+def build_timeline(data):
+    events = build_events(data)
+    duration = data.duration if isinstance(data, Contest) else data["duration"]
+    return {
+        "fields": FIELDS,
+        "events": events,
+        "minute_index": build_minute_index(events, duration),
+    }
+
+
+def revealed_count(timeline, t):
+    """Number of events with time <= t."""
+    events = timeline["events"]
+    index = timeline["minute_index"]
+    m = min(int(t) // 60, len(index) - 1)
+    k = index[m]
+    while k < len(events) and events[k][2] <= t:
+        k += 1
+    return k
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python replay_timeline.py <replay.json> [<replay.json> ...]")
+        sys.exit(1)
+
+    from replay_output import side_path, write_json
+
+    for path in sys.argv[1:]:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        timeline = build_timeline(data)
+        out = side_path(path, "timeline")
+        write_json(timeline, out, compact=True)
+        print(f"Saved {len(timeline['events'])} events to {out}")
@@ -0,0 +1,97 @@
+"""
+Streaming row extraction shared by all the *_replay.py converters.
+
+The converters used to build a BeautifulSoup tree of the whole page and then
+call find_all("tr"). iter_rows() instead runs lxml's incremental HTML parser
+over the page and yields one matching element (a team row) at a time. Once
+the caller moves on to the next row, the previous one is cleared and detached
+from the tree, so memory stays at roughly one row no matter how big the
+scoreboard is.
+
+The helpers below (text, full_text, classes, has_class, find, find_all) cover
+the small part of the BeautifulSoup API the converters relied on.
+"""
+
+import io
+
+from lxml import etree
+
+
+def iter_rows(source, tags="tr", match=None, encoding="utf-8"):
+    """
+    Yield every element named in `tags` (a tag name or a tuple of them) for
+    which match(element) is true, in document order.
+
+    `source` is a file path, the raw page bytes, or a binary file object.
+    Each yielded element is freed after the caller is done with it, so keep
+    the values you need, not the element.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    context = etree.iterparse(
+        source,
+        events=("end",),
+        tag=tags,
+        html=True,
+        encoding=encoding,
+        remove_comments=True,
+    )
+
+    for _, el in context:
+        if match is not None and not match(el):
+            continue
+
+        yield el
+
+        # Free the row and everything before it at the same level
+        el.clear(keep_tail=True)
+        parent = el.getparent()
+        if parent is not None:
+            while el.getprevious() is not None:
+                del parent[0]
+
+    del context
+
+
+def text(el, sep=""):
+    """Equivalent of BeautifulSoup's get_text(sep, strip=True)."""
+    return sep.join(s.strip() for s in el.itertext() if s.strip())
+
+
+def full_text(el):
+    """Equivalent of BeautifulSoup's .text: all text, unstripped."""
+    return "".join(el.itertext())
+
+
+def classes(el):
+    return (el.get("class") or "").split()
+
+
+def has_class(el, cls):
+    # Like BeautifulSoup's class_="...": a value with spaces must match the
+    # whole attribute, a single name only has to be one of the classes
+    if " " in cls:
+        return el.get("class") == cls
+    return cls in classes(el)
+
+
+def find(el, tag, cls=None, attr=None):
+    """First descendant `tag` with class `cls` and/or attribute `attr` set."""
+    for d in el.iterdescendants(tag):
+        if cls is not None and not has_class(d, cls):
+            continue
+        if attr is not None and d.get(attr) is None:
+            continue
+        return d
+    return None
+
+
+def find_all(el, tag, cls=None, recursive=True):
+    found = el.iterdescendants(tag) if recursive else el.iterchildren(tag)
+    return [d for d in found if cls is None or has_class(d, cls)]
+
+
+def ancestor(el, tag):
+    """Nearest enclosing `tag` element, or None."""
+    return next(el.iterancestors(tag), None)
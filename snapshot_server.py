@@ -0,0 +1,197 @@
+"""
+Local stand-in for a live scoreboard: serves recorded snapshots in order.
+
+Every file in <dir> (sorted by name) is one snapshot. Each snapshot is
+served for `repeat` requests before moving to the next; the last one is
+served forever. Responses carry an ETag and Last-Modified, and a request
+whose If-None-Match matches the current snapshot gets a 304.
+
+With --feed it instead serves one CCS event-feed NDJSON file, starting
+after the event named by the since_token or since_id query parameter, like
+a Contest API /event-feed endpoint that has reached the end of the contest.
+
+With --api it serves a mock Contest API from a directory of JSON files:
+GET /api/v4/contests/x/teams returns <dir>/api/v4/contests/x/teams.json.
+
+Usage:
+    python snapshot_server.py <dir> [port] [repeat]
+    python snapshot_server.py --feed <event-feed.ndjson> [port]
+    python snapshot_server.py --api <dir> [port]
+
+then e.g.
+    python neerc_replay.py http://127.0.0.1:8000/ out.json --follow 1
+    python ccs_feed.py http://127.0.0.1:8000/event-feed out.json
+    python contest_api.py http://127.0.0.1:8000/api/v4 synthetic out.json
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class SnapshotServer(ThreadingHTTPServer):
+    def __init__(self, address, snapshots, repeat=1):
+        super().__init__(address, SnapshotHandler)
+        self.snapshots = snapshots
+        self.repeat = repeat
+        self.requests_served = 0
+        self.lock = threading.Lock()
+
+    def next_snapshot(self):
+        with self.lock:
+            i = min(self.requests_served // self.repeat, len(self.snapshots) - 1)
+            self.requests_served += 1
+        return i, self.snapshots[i]
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        i, body = self.server.next_snapshot()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # One second per snapshot keeps Last-Modified distinct and ordered
+        self.send_header("Last-Modified", formatdate(1_700_000_000 + i, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeedServer(ThreadingHTTPServer):
+    def __init__(self, address, path):
+        super().__init__(address, FeedHandler)
+        self.feed_path = path
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        since = (query.get("since_token") or query.get("since_id") or [None])[0]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+
+        with open(self.server.feed_path, "rb") as f:
+            for line in f:
+                if since is not None:
+                    if line.strip() and event_id(line) == since:
+                        since = None
+                    continue
+                self.wfile.write(line)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ApiServer(ThreadingHTTPServer):
+    def __init__(self, address, directory):
+        super().__init__(address, ApiHandler)
+        self.directory = os.path.abspath(directory)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        root = self.server.directory
+        path = os.path.normpath(os.path.join(root, urlsplit(self.path).path.strip("/") + ".json"))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def event_id(line):
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event.get("token") if "token" in event else event.get("id")
+
+
+def load_snapshots(directory):
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            snapshots.append(f.read())
+    if not snapshots:
+        raise RuntimeError(f"No snapshots in {directory}")
+    return snapshots
+
+
+def serve(directory, port=8000, repeat=1):
+    """Start the server in a background thread and return it."""
+    server = SnapshotServer(("127.0.0.1", port), load_snapshots(directory), repeat)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_feed(path, port=8000):
+    """Serve an event feed in a background thread and return the server."""
+    server = FeedServer(("127.0.0.1", port), path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_api(directory, port=8000):
+    """Serve a mock Contest API in a background thread and return the server."""
+    server = ApiServer(("127.0.0.1", port), directory)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (3, 4) and sys.argv[1] in ("--feed", "--api"):
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 8000
+        if sys.argv[1] == "--feed":
+            server = FeedServer(("127.0.0.1", port), sys.argv[2])
+            print(f"Serving {sys.argv[2]} on http://127.0.0.1:{port}/event-feed")
+        else:
+            server = ApiServer(("127.0.0.1", port), sys.argv[2])
+            print(f"Serving {sys.argv[2]} as a Contest API on http://127.0.0.1:{port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    if len(sys.argv) not in (2, 3, 4):
+        print("Usage: python snapshot_server.py <dir> [port] [repeat]\n"
+              "       python snapshot_server.py --feed <event-feed.ndjson> [port]\n"
+              "       python snapshot_server.py --api <dir> [port]")
+        sys.exit(1)
+
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    server = SnapshotServer(("127.0.0.1", port), load_snapshots(sys.argv[1]), repeat)
+    print(f"Serving {len(server.snapshots)} snapshots on http://127.0.0.1:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
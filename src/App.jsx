@@ -1,6 +1,27 @@
 import { useEffect, useState, useRef } from "react";
 import "./App.css";
 
+const BASE = import.meta.env.BASE_URL;
+
+// Download one contest listed in the manifest (see build_assets.py), using
+// the precompressed .gz when the browser can inflate it itself
+async function fetchContest(entry) {
+  if (entry.gz && "DecompressionStream" in window) {
+    try {
+      const res = await fetch(BASE + entry.gz);
+      if (res.ok) {
+        const stream = res.body.pipeThrough(new DecompressionStream("gzip"));
+        return await new Response(stream).json();
+      }
+    } catch {
+      // Fall back to the plain file below
+    }
+  }
+  const res = await fetch(BASE + entry.url);
+  if (!res.ok) throw new Error(res.statusText);
+  return res.json();
+}
+
 // Convert seconds → minutes
 function formatTime(sec) {
   return `${Math.round(sec / 60)}`;
@@ -15,6 +36,7 @@ function formatTimeLeft(sec) {
 
 export default function App() {
   const [contestData, setContestData] = useState(null);
+  const [contests, setContests] = useState(null);
   const [error, setError] = useState(null);
 
   const [currentTime, setCurrentTime] = useState(0);
@@ -26,18 +48,33 @@ export default function App() {
   const sortedSubsRef = useRef([]);
 
   // --------------------------------------------------
-  // Load contest data based on URL
+  // Load contest data based on URL (or the contest list without one)
   // --------------------------------------------------
   useEffect(() => {
     const params = new URLSearchParams(window.location.search);
     const contestId = params.get("contest");
 
-    import(`./assets/${contestId}.json`)
-      .then((mod) => {
-        setContestData(mod.default);
+    fetch(`${BASE}contests/manifest.json`)
+      .then((res) => {
+        if (!res.ok) throw new Error(res.statusText);
+        return res.json();
+      })
+      .then((manifest) => {
+        if (!contestId) {
+          setContests(manifest.contests);
+          return;
+        }
+        const entry = manifest.contests.find((c) => c.id === contestId);
+        if (!entry) {
+          setError(`Unknown contest "${contestId}".`);
+          return;
+        }
+        return fetchContest(entry).then(setContestData, () => {
+          setError(`Contest "${contestId}" could not be downloaded. Try reloading the page.`);
+        });
       })
       .catch(() => {
-        setError(`Contest "${contestId}" not found`);
+        setError("The contest list could not be loaded. Try reloading the page.");
       });
   }, []);
 
@@ -85,7 +122,24 @@ export default function App() {
   if (error) {
     return (<div className="page">
       <h1 className="title">Error</h1>
-      <div className="errorMessage">{error}</div>
+      <div className="errorMessage">
+        {error} <a href="?">See all contests</a>
+      </div>
+    </div>
+    );
+  }
+
+  if (contests) {
+    return (<div className="page">
+      <h1 className="title">Contests</h1>
+      <ul className="contestList">
+        {contests.map((c) => (
+          <li key={c.id}>
+            <a href={`?contest=${c.id}`}>{c.name}</a>{" "}
+            <span className="contestInfo">{c.teams} teams, {c.problems} problems</span>
+          </li>
+        ))}
+      </ul>
     </div>
     );
   }
@@ -0,0 +1,48 @@
+import os
+
+import batch_replay
+from replay_output import side_paths
+
+
+def touch(path, mtime):
+    with open(path, "a"):
+        pass
+    os.utime(path, (mtime, mtime))
+
+
+def make_job(tmp_path, side_files=False):
+    job = {"format": "nerc", "input": str(tmp_path / "page.html"),
+           "output": str(tmp_path / "out.json"), "side_files": side_files}
+    manifest = str(tmp_path / "batch.json")
+    touch(job["input"], 1000)
+    touch(manifest, 1000)
+    touch(job["output"], 2e9)  # newer than the parser's modules too
+    return job, manifest
+
+
+def test_up_to_date_checks_side_files(tmp_path):
+    job, manifest = make_job(tmp_path)
+    assert batch_replay.is_up_to_date(job, manifest)
+
+    job["side_files"] = True
+    assert not batch_replay.is_up_to_date(job, manifest)
+
+    paths = side_paths(job["output"])
+    for path in paths:
+        touch(path, 2e9)
+    assert batch_replay.is_up_to_date(job, manifest)
+
+    os.utime(paths[0], (500, 500))
+    assert not batch_replay.is_up_to_date(job, manifest)
+
+
+def test_missing_dependency_is_stale(tmp_path, monkeypatch):
+    job, manifest = make_job(tmp_path)
+    modules = {"nerc_replay": str(tmp_path / "nerc_replay.py"),
+               "gone": str(tmp_path / "gone.py")}
+    touch(modules["nerc_replay"], 1000)
+    monkeypatch.setattr(batch_replay, "local_modules", lambda name: modules)
+
+    assert not batch_replay.is_up_to_date(job, manifest)
+    touch(modules["gone"], 1000)
+    assert batch_replay.is_up_to_date(job, manifest)
@@ -0,0 +1,112 @@
+import json
+import random
+
+import pytest
+
+import snapshot_server
+from ccs_feed import convert_feed, parse_event_feed
+from replay_output import side_path
+
+
+def reltime(seconds):
+    return f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}.000"
+
+
+def event_lines(teams=20, problems=5, submissions=300, seed=1):
+    """A 2023-format event feed, one encoded line per event."""
+    rng = random.Random(seed)
+    events = [
+        ("contests", "c", {"id": "c", "name": "Feed Test", "duration": "5:00:00.000",
+                           "scoreboard_freeze_duration": "1:00:00.000"}),
+        ("judgement-types", "AC", {"id": "AC", "solved": True, "penalty": False}),
+        ("judgement-types", "WA", {"id": "WA", "solved": False, "penalty": True}),
+    ]
+    events += [("problems", f"p{j}", {"id": f"p{j}", "label": chr(65 + j), "ordinal": j})
+               for j in range(problems)]
+    events += [("teams", f"t{i}", {"id": f"t{i}", "name": f"Team {i}"}) for i in range(teams)]
+    times = sorted(rng.randrange(5 * 3600) for _ in range(submissions))
+    for k, time in enumerate(times):
+        events.append(("submissions", f"s{k}", {
+            "id": f"s{k}", "team_id": f"t{rng.randrange(teams)}",
+            "problem_id": f"p{rng.randrange(problems)}", "contest_time": reltime(time)}))
+        events.append(("judgements", f"j{k}", {
+            "id": f"j{k}", "submission_id": f"s{k}",
+            "judgement_type_id": rng.choice(["AC", "WA", "WA"])}))
+    return [json.dumps({"type": kind, "id": oid, "data": data, "token": f"e{n}"}).encode() + b"\n"
+            for n, (kind, oid, data) in enumerate(events)]
+
+
+def outputs(out):
+    with open(out, encoding="utf-8") as f:
+        replay = json.load(f)
+    with open(side_path(str(out), "submissions"), encoding="utf-8") as f:
+        return replay, json.load(f)
+
+
+@pytest.fixture
+def lines():
+    return event_lines()
+
+
+def test_truncated_final_line_is_left_for_the_next_run(lines, tmp_path):
+    feed, out = tmp_path / "feed.ndjson", tmp_path / "out.json"
+    cut = len(lines[-1]) // 2
+    feed.write_bytes(b"".join(lines)[:-cut])
+
+    _, stats = convert_feed(str(feed), str(out))
+    assert stats == {"events": len(lines) - 1, "malformed": 0, "truncated": 1}
+    assert outputs(out)[0] == parse_event_feed(b"".join(lines[:-1]))
+    with open(side_path(str(out), "feed"), encoding="utf-8") as f:
+        assert json.load(f)["offset"] == sum(map(len, lines[:-1]))
+
+    # The writer finishes the line; a resumed run picks up only that event
+    feed.write_bytes(b"".join(lines))
+    _, stats = convert_feed(str(feed), str(out), resume=True)
+    assert stats == {"events": 1, "malformed": 0, "truncated": 0}
+    assert outputs(out)[0] == parse_event_feed(b"".join(lines))
+
+
+def test_malformed_line_is_skipped(lines, tmp_path):
+    feed, out = tmp_path / "feed.ndjson", tmp_path / "out.json"
+    feed.write_bytes(b"".join(lines[:10]) + b"{not json\n" + b"".join(lines[10:]))
+
+    _, stats = convert_feed(str(feed), str(out))
+    assert stats == {"events": len(lines), "malformed": 1, "truncated": 0}
+    assert outputs(out)[0] == parse_event_feed(b"".join(lines))
+
+
+@pytest.mark.parametrize("split", [0.3, 0.8])
+def test_resume_matches_a_full_conversion(lines, tmp_path, split):
+    whole, out = tmp_path / "whole.ndjson", tmp_path / "whole.json"
+    whole.write_bytes(b"".join(lines))
+    convert_feed(str(whole), str(out))
+    expected = outputs(out)
+
+    feed, resumed = tmp_path / "feed.ndjson", tmp_path / "out.json"
+    k = int(len(lines) * split)
+    feed.write_bytes(b"".join(lines[:k]))
+    convert_feed(str(feed), str(resumed))
+    feed.write_bytes(b"".join(lines))
+    _, stats = convert_feed(str(feed), str(resumed), resume=True)
+
+    assert stats["events"] == len(lines) - k
+    assert outputs(resumed) == expected
+
+
+def test_resume_over_http_uses_the_last_token(lines, tmp_path):
+    feed, out = tmp_path / "feed.ndjson", tmp_path / "out.json"
+    k = len(lines) // 2
+    feed.write_bytes(b"".join(lines[:k]))
+
+    server = snapshot_server.serve_feed(str(feed), port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/event-feed"
+        _, stats = convert_feed(url, str(out))
+        assert stats["events"] == k
+        feed.write_bytes(b"".join(lines))
+        _, stats = convert_feed(url, str(out), resume=True)
+    finally:
+        server.shutdown()
+
+    assert stats["events"] == len(lines) - k
+    assert outputs(out)[0] == parse_event_feed(b"".join(lines))
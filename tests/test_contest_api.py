@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import gen_scoreboard
+import snapshot_server
+from contest_api import ENDPOINTS, fetch_contest_api, parse_contest_api, problem_time
+
+
+@pytest.fixture
+def contest():
+    return gen_scoreboard.synthetic_contest(60, 10, seed=3)
+
+
+def test_round_trip(contest):
+    files = gen_scoreboard.contest_api_files(contest)
+    docs = {}
+    for path, doc in files.items():
+        name = path.rsplit("/", 1)[-1]
+        docs[name if name in ENDPOINTS else "contest"] = doc
+
+    assert parse_contest_api(docs) == gen_scoreboard.expected_contest_api(contest)
+
+
+def test_round_trip_over_http(contest, tmp_path):
+    root = gen_scoreboard.write_contest_api(contest, str(tmp_path))
+    with open(f"{root}/synthetic.expected.json", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    server = snapshot_server.serve_api(str(tmp_path), port=0)
+    try:
+        docs = fetch_contest_api(f"http://127.0.0.1:{server.server_address[1]}/api/v4", "synthetic")
+    finally:
+        server.shutdown()
+
+    assert parse_contest_api(docs) == expected
+
+
+def test_problem_time_formats():
+    assert problem_time(47) == 47 * 60
+    assert problem_time("0:47:12.345") == 47 * 60 + 12
@@ -0,0 +1,70 @@
+import copy
+import json
+
+import pytest
+
+import gen_scoreboard
+import snapshot_server
+from kattis_replay import parse_kattis_html
+from live_follow import deltas_path, follow
+
+
+def snapshots(tmp_path, pages, repeat):
+    directory = tmp_path / "snapshots"
+    directory.mkdir()
+    for i, page in enumerate(pages):
+        (directory / f"{i:02d}.html").write_text(page, encoding="utf-8")
+    server = snapshot_server.serve(str(directory), port=0, repeat=repeat)
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+@pytest.fixture
+def pages():
+    contest = gen_scoreboard.synthetic_contest(30, 8)
+    changed = copy.deepcopy(contest)
+    # A late solve on an unattempted cell; the rows keep their order
+    team = changed["teams"][10]
+    j = next(j for j, c in enumerate(team["cells"]) if c is None)
+    team["cells"][j] = {"tries": 1, "time": changed["duration"] - 60, "first": False}
+    return (gen_scoreboard.render_kattis(contest), gen_scoreboard.render_kattis(changed),
+            team["name"], changed["problems"][j])
+
+
+def read_deltas(out):
+    with open(deltas_path(str(out)), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_not_modified_then_one_delta(tmp_path, pages):
+    before, after, name, problem = pages
+    server, url = snapshots(tmp_path, [before, after], repeat=2)
+    out = tmp_path / "out.json"
+    try:
+        poller, current = follow(url, parse_kattis_html, str(out), interval=0, max_polls=4)
+    finally:
+        server.shutdown()
+
+    # Polls 2 and 4 revalidate the page they already have
+    assert poller.stats["not_modified"] == 2
+    assert poller.stats["changed"] == 2
+    deltas = read_deltas(out)
+    assert len(deltas) == 1
+    assert deltas[0]["seq"] == 3
+    assert deltas[0]["team"] == name
+    assert deltas[0]["problem"] == problem
+    assert current == parse_kattis_html(after)
+
+
+def test_error_page_keeps_following(tmp_path, pages):
+    before, after, name, problem = pages
+    maintenance = gen_scoreboard.page("<p>Scoreboard temporarily unavailable</p>")
+    server, url = snapshots(tmp_path, [before, maintenance, after], repeat=1)
+    out = tmp_path / "out.json"
+    try:
+        poller, current = follow(url, parse_kattis_html, str(out), interval=0, max_polls=3)
+    finally:
+        server.shutdown()
+
+    deltas = read_deltas(out)
+    assert [(d["seq"], d["team"], d["problem"]) for d in deltas] == [(3, name, problem)]
+    assert current == parse_kattis_html(after)
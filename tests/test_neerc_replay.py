@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+import gen_scoreboard
+from bench_nerc import REAL, render_replay
+from neerc_replay import ScanError, parse_nerc_fast, parse_nerc_html, scan_nerc
+from replay_model import Contest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [f"synthetic{seed}" for seed in range(3)] + [os.path.basename(path)[:-5] for path in REAL]
+
+
+def render(label):
+    if label.startswith("synthetic"):
+        contest = gen_scoreboard.synthetic_contest(150, 13, seed=int(label[-1]))
+        return gen_scoreboard.render_nerc(contest)
+    with open(os.path.join(ROOT, "src", "assets", label + ".json"), encoding="utf-8") as f:
+        return render_replay(json.load(f))
+
+
+@pytest.mark.parametrize("label", PAGES)
+def test_scanner_matches_lxml(label, tmp_path, capsys):
+    page = render(label)
+    expected = parse_nerc_html(page.encode("utf-8"))
+    assert parse_nerc_fast(page.encode("utf-8")) == expected
+
+    path = tmp_path / "standings.html"
+    path.write_text(page, encoding="utf-8")
+    assert parse_nerc_fast(str(path)) == expected  # through the mmap
+    assert parse_nerc_fast(page.encode("utf-8"), validate=True) == expected
+    assert "lxml" not in capsys.readouterr().err
+
+
+def test_malformed_cell_falls_back_to_lxml(tmp_path, capsys):
+    page = gen_scoreboard.render_nerc(gen_scoreboard.synthetic_contest(60, 8, seed=4))
+    page = page.replace("<s><br>", "<s><u></u><br>", 1).encode("utf-8")
+
+    with pytest.raises(ScanError, match="unexpected cell"):
+        scan_nerc(page, Contest("x"))
+
+    path = tmp_path / "standings.html"
+    path.write_bytes(page)
+    assert parse_nerc_fast(str(path)) == parse_nerc_html(page)
+    assert "NEERC scanner: unexpected cell" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("page, error", [
+    (b"<html><p>no standings</p></html>", "no complete <table>"),
+    (b"<table><!-- --><tr class=row0><td>1</td></tr></table>", "comment"),
+    (b'<table><tr class="header"><th>A</th></tr></table>', "no team rows"),
+])
+def test_scanner_rejects_unexpected_pages(page, error):
+    with pytest.raises(ScanError, match=error):
+        scan_nerc(page, Contest("x"))
+
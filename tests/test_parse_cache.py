@@ -0,0 +1,40 @@
+import os
+
+import parse_cache
+from parse_cache import ParseCache
+
+
+def entry_size(tmp_path):
+    cache = ParseCache(str(tmp_path / "probe"))
+    cache.put("probe", {"x": "0" * 100})
+    return os.path.getsize(cache._path("probe"))
+
+
+def test_eviction_removes_least_recently_used_first(tmp_path):
+    size = entry_size(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"), max_bytes=3 * size + size // 2)
+    for i, key in enumerate("abc"):
+        cache.put(key, {"x": "0" * 100})
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+
+    assert cache.get("a") is not None  # a hit makes "a" the most recent
+    cache.put("d", {"x": "0" * 100})
+
+    assert sorted(os.listdir(cache.cache_dir)) == ["a.json", "c.json", "d.json"]
+    assert cache.stats["evictions"] == 1
+
+
+def test_put_only_scans_when_over_budget(tmp_path, monkeypatch):
+    size = entry_size(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"), max_bytes=10 * size)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    for i in range(10):
+        cache.put(str(i), {"x": "0" * 100})
+    assert len(scans) == 1  # the first put learns the directory's size
+
+    cache.put("10", {"x": "0" * 100})
+    assert len(scans) == 2
+    assert len(os.listdir(cache.cache_dir)) * size <= cache.max_bytes * parse_cache.EVICT_TO
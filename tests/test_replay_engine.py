@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from replay_engine import ReplayEngine, SortedKeyList
+from replay_model import PENALTY_PER_TRY
+
+
+def random_events(rng, teams, problems, count):
+    # Random order, with repeated solves of the same cell mixed in
+    return [[rng.randrange(teams), rng.randrange(problems), rng.randrange(300 * 60),
+             rng.randint(1, 5), 0] for _ in range(count)]
+
+
+class Reference:
+    """Rebuilds every key and re-sorts the whole field, like App.jsx."""
+
+    def __init__(self, names):
+        self.names = names
+        self.solved = [0] * len(names)
+        self.penalty = [0] * len(names)
+        self.accepted = set()
+
+    def apply(self, event):
+        team, problem, time, tries = event[:4]
+        if (team, problem) not in self.accepted:
+            self.accepted.add((team, problem))
+            self.solved[team] += 1
+            self.penalty[team] += time + (tries - 1) * PENALTY_PER_TRY
+
+    def standings(self):
+        return sorted(range(len(self.names)),
+                      key=lambda t: (-self.solved[t], self.penalty[t], self.names[t], t))
+
+    def ranks(self):
+        return {team: rank for rank, team in enumerate(self.standings(), 1)}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_engine_matches_full_sort(seed):
+    rng = random.Random(seed)
+    # Repeated names make the index the only tie-breaker; 600 teams span buckets
+    names = [f"Team {rng.randrange(400)}" for _ in range(600)]
+    engine = ReplayEngine({"teams": [{"name": n} for n in names], "problems": list("ABCDEFGH")})
+    reference = Reference(names)
+
+    ranks = reference.ranks()
+    for event in random_events(rng, len(names), 8, 1500):
+        before = ranks[event[0]]
+        reference.apply(event)
+        ranks = reference.ranks()
+        assert engine.apply(event) == (before, ranks[event[0]])
+
+        if rng.random() < 0.05:
+            assert engine.standings() == reference.standings()
+            team = rng.randrange(len(names))
+            assert engine.rank_of(team) == ranks[team]
+            assert engine.sort_key(team) == (-reference.solved[team], reference.penalty[team],
+                                             names[team], team)
+    assert engine.standings() == reference.standings()
+    assert engine.top(10) == reference.standings()[:10]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rank_changes_since_matches_full_sort(seed):
+    rng = random.Random(seed)
+    names = [f"Team {i:03}" for i in range(300)]
+    engine = ReplayEngine({"teams": [{"name": n} for n in names], "problems": list("ABCDEF")})
+    reference = Reference(names)
+
+    for _ in range(20):
+        checkpoint = engine.checkpoint()
+        before = reference.ranks()
+        batch = random_events(rng, len(names), 6, rng.randint(1, 60))
+        moved = set()
+        for event in batch:
+            if (event[0], event[1]) not in reference.accepted:
+                moved.add(event[0])
+            reference.apply(event)
+            engine.apply(event)
+
+        after = reference.ranks()
+        expected = {t: (before[t], after[t]) for t in moved if before[t] != after[t]}
+        assert engine.rank_changes_since(checkpoint) == expected
+
+
+def test_sorted_key_list_matches_sorted():
+    rng = random.Random(7)
+    keys = SortedKeyList(rng.sample(range(10_000), 50), load=4)
+    reference = sorted(keys)
+    for _ in range(2000):
+        if reference and rng.random() < 0.4:
+            key = rng.choice(reference)
+            keys.remove(key)
+            reference.remove(key)
+        else:
+            key = rng.randrange(10_000)
+            if key in reference:
+                continue
+            keys.add(key)
+            reference.append(key)
+            reference.sort()
+
+        probe = rng.randrange(10_000)
+        assert len(keys) == len(reference)
+        assert keys.index(probe) == sum(k < probe for k in reference)
+        assert keys.count_le(probe) == sum(k <= probe for k in reference)
+        if reference:
+            k = rng.randrange(len(reference))
+            assert keys[k] == reference[k]
+    assert list(keys) == reference
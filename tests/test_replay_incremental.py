@@ -0,0 +1,60 @@
+import copy
+import random
+
+import pytest
+
+import gen_scoreboard
+from replay_incremental import PARSERS, IncrementalParser
+
+
+def next_snapshot(rng, contest, minute):
+    """A later poll: a few new tries and solves, now and then a team joining or leaving."""
+    contest = copy.deepcopy(contest)
+    teams = contest["teams"]
+    for t in rng.sample(teams, rng.randint(1, 4)):
+        j = rng.randrange(len(t["cells"]))
+        c = t["cells"][j]
+        if c is None:
+            t["cells"][j] = {"tries": 1, "time": None, "first": False}
+        elif c["time"] is None:
+            c["tries"] += 1
+            if rng.random() < 0.5:
+                c["time"] = minute * 60
+    if rng.random() < 0.15:
+        del teams[rng.randrange(len(teams))]
+    if rng.random() < 0.15:
+        teams.append({"name": f"Late Team {minute}", "university": "Somewhere",
+                      "cells": [None] * len(contest["problems"])})
+    gen_scoreboard.rank_teams(teams)
+    return contest
+
+
+@pytest.mark.parametrize("fmt", PARSERS)
+def test_incremental_matches_full_parse(fmt):
+    rng = random.Random(fmt)
+    render = gen_scoreboard.GENERATORS[fmt][0]
+    contest = gen_scoreboard.synthetic_contest(80, 8, seed=5)
+    parser = IncrementalParser(fmt)
+
+    for minute in range(200, 300, 5):
+        page = render(contest).encode("utf-8")
+        full = IncrementalParser(fmt)
+        expected = full.full_parse(page, full.split(page)).to_dict()
+        assert parser.parse(page).to_dict() == expected
+        contest = next_snapshot(rng, contest, minute)
+
+    # A climb or a team leaving changes the rank cell of many rows, which
+    # can make a poll a full parse; most are still incremental
+    assert parser.stats["full"] + parser.stats["incremental"] == 20
+    assert parser.stats["incremental"] > parser.stats["full"]
+
+
+def test_unchanged_snapshot_parses_no_rows():
+    render = gen_scoreboard.GENERATORS["kattis"][0]
+    page = render(gen_scoreboard.synthetic_contest(30, 5, seed=1)).encode("utf-8")
+    parser = IncrementalParser("kattis")
+    first = parser.parse(page).to_dict()
+
+    assert parser.parse(page).to_dict() == first
+    assert parser.stats["rows_parsed"] == 30
+    assert parser.stats["rows_reused"] == 30
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from replay_model import Contest, ParseError
+from replay_output import atomic_open, side_paths, stream_replay
+
+
+def failing_teams(contest, after):
+    for i in range(after):
+        team = contest.add_team(f"Team {i}")
+        team.solve("A", 60 * (i + 1), 1)
+        yield team
+    raise ParseError("bad time cell")
+
+
+def test_parser_error_leaves_no_temporary_file(tmp_path):
+    out = tmp_path / "out.json"
+    out.write_text("previous")
+    contest = Contest("Broken", problems=["A", "B"])
+
+    with pytest.raises(ParseError):
+        stream_replay(contest, failing_teams(contest, 3), str(out))
+
+    assert os.listdir(tmp_path) == ["out.json"]
+    assert out.read_text() == "previous"
+
+
+def test_stream_replay_writes_side_files_only_when_asked(tmp_path):
+    out = tmp_path / "out.json"
+    contest = Contest("Fine", problems=["A"])
+
+    assert stream_replay(contest, (contest.add_team(f"T{i}") for i in range(4)), str(out)) == 4
+    assert os.listdir(tmp_path) == ["out.json"]
+
+    contest = Contest("Fine", problems=["A"])
+    teams = (contest.add_team(f"T{i}") for i in range(4))
+    assert stream_replay(contest, teams, str(out), side_files=True) == 4
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(p) for p in [str(out)] + side_paths(str(out)))
+
+
+def test_atomic_open_replaces_only_on_success(tmp_path):
+    path = tmp_path / "data.bin"
+    with atomic_open(str(path)) as f:
+        f.write(b"one")
+    with pytest.raises(KeyboardInterrupt):
+        with atomic_open(str(path)) as f:
+            f.write(b"two")
+            raise KeyboardInterrupt
+    assert path.read_bytes() == b"one"
+    assert os.listdir(tmp_path) == ["data.bin"]
@@ -0,0 +1,44 @@
+import json
+import threading
+
+import pytest
+
+import gen_scoreboard
+import watch_replay
+
+
+def write_page(path, teams):
+    path.write_text(gen_scoreboard.render_nerc(gen_scoreboard.synthetic_contest(teams, 5)),
+                    encoding="utf-8")
+
+
+@pytest.mark.parametrize("poll", [None, 0.1])
+def test_snapshot_written_during_startup_is_converted(tmp_path, monkeypatch, poll):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    write_page(snapshots / "a.html", 10)
+    config_path = tmp_path / "watch.json"
+    config_path.write_text(json.dumps({
+        "watch": "snapshots", "debounce": 0.1,
+        "rules": [{"pattern": "*.html", "format": "nerc", "output": "out/{stem}.json"}],
+    }))
+
+    convert_stale = watch_replay.Converter.convert_stale
+
+    def slow_startup(converter):
+        convert_stale(converter)
+        write_page(snapshots / "b.html", 12)
+
+    monkeypatch.setattr(watch_replay.Converter, "convert_stale", slow_startup)
+
+    result = {}
+    thread = threading.Thread(daemon=True, target=lambda: result.update(
+        converter=watch_replay.watch(watch_replay.load_config(str(config_path)), poll,
+                                     max_batches=1)))
+    thread.start()
+    thread.join(10)
+
+    assert not thread.is_alive(), "b.html was never picked up"
+    with open(tmp_path / "out" / "b.json", encoding="utf-8") as f:
+        assert len(json.load(f)["teams"]) == 12
+    assert result["converter"].stats["converted"] == 2
@@ -0,0 +1,365 @@
+"""
+Watch a directory of saved scoreboard snapshots and reconvert the ones that
+change.
+
+During a contest the pages (inner.html and friends) are saved into one
+directory tree. This waits for files to be written there, maps each one to
+its parser through a config and converts it again, so the replay JSON the
+frontend reads follows the snapshots without running *_replay.py by hand.
+
+    {
+      "watch": "snapshots",
+      "debounce": 0.5,
+      "rules": [
+        {"pattern": "nac2025/*.html", "format": "domjudge",
+         "output": "src/assets/{parent}.json", "name": "NAC 2025"},
+        {"pattern": "*.html", "format": "nerc", "output": "out/{stem}.json"}
+      ]
+    }
+
+"pattern" is matched (fnmatch) against the path relative to the watched
+directory and the first matching rule wins; files no rule matches are
+ignored. "output" may use {stem} (file name without extension) and
+{parent} (its directory's name). "format" is a replay_formats.FORMATS name
+and "name", "duration", "freeze" and "minify" work as in batch_replay.py.
+Relative paths are resolved against the config's directory.
+
+On Linux changes come from inotify (through ctypes, no extra package);
+elsewhere, or with --poll, the tree is re-scanned every few seconds. Either
+way the process sleeps between changes, and only finished files count:
+inotify reports a file when the writer closes it or renames it into place,
+and the poller once its size and mtime held still over a whole interval,
+so a slow copy (rsync, curl) is never converted half-written. A burst of
+writes is debounced: the batch is converted once no event has arrived for
+`debounce` seconds (at most MAX_DELAY after the first). Only files whose bytes changed since their
+last conversion are parsed, and for domjudge, kattis and nerc only the rows
+that changed (replay_incremental.py). Outputs are written through
+save_replay, which renames a finished temporary file into place, so the
+frontend never reads a half-written JSON.
+
+Each conversion reports its latency from the snapshot's mtime to the output
+being in place; Ctrl-C prints the median and worst.
+
+Usage:
+    python watch_replay.py <config.json> [--poll SECONDS] [--debounce SECONDS]
+
+At startup, snapshots whose output is missing or older are converted first.
+"""
+
+import contextlib
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import select
+import statistics
+import struct
+import sys
+import time
+
+import replay_formats
+from replay_incremental import PARSERS, IncrementalParser
+from replay_output import save_replay
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL = 2.0
+MAX_DELAY = 5.0
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# IN_CREATE only for new directories; a file counts once it is closed
+# after writing or renamed into place, never while it is being written
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+
+
+def walk_files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            yield os.path.join(dirpath, name)
+
+
+# ----------------------------------------
+# Watchers: changes(timeout) blocks until something under the root was
+# written (returning the paths) or the timeout passes (returning an empty
+# set); timeout=None waits indefinitely
+# ----------------------------------------
+
+class InotifyWatcher:
+    def __init__(self, root):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.dirs = {}   # watch descriptor -> directory
+        for dirpath, _, _ in os.walk(root):
+            self.add_watch(dirpath)
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.dirs[wd] = path
+
+    def changes(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        data = os.read(self.fd, 1 << 16)
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, size = EVENT.unpack_from(data, pos)
+            name = data[pos + EVENT.size:pos + EVENT.size + size].rstrip(b"\0")
+            pos += EVENT.size + size
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; treat everything as changed (the
+                # content hashes skip what did not)
+                changed.update(walk_files(self.root))
+                continue
+            if wd not in self.dirs or not name:
+                continue
+            path = os.path.join(self.dirs[wd], os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # A new snapshot directory: watch it and pick up
+                    # anything written before the watch was in place
+                    for dirpath, _, _ in os.walk(path):
+                        try:
+                            self.add_watch(dirpath)
+                        except OSError as e:
+                            # Gone again, or out of watches; the rest of
+                            # the tree is still watched
+                            print(f"Not watching {dirpath}: {e}", file=sys.stderr)
+                    changed.update(walk_files(path))
+            elif not mask & IN_CREATE:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # A file is reported once its (mtime, size) is the same in two scans in
+    # a row and differs from what was last reported
+    def __init__(self, root, interval=DEFAULT_POLL):
+        self.root = root
+        self.interval = interval
+        self.seen = self.scan()
+        self.last_scan = self.seen
+
+    def scan(self):
+        seen = {}
+        for path in walk_files(self.root):
+            with contextlib.suppress(FileNotFoundError):
+                st = os.stat(path)
+                seen[path] = (st.st_mtime_ns, st.st_size)
+        return seen
+
+    def changes(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval,
+                                                              deadline - time.monotonic())
+            if wait <= 0:
+                return set()
+            time.sleep(wait)
+            scan = self.scan()
+            changed = {path for path, sig in scan.items()
+                       if self.last_scan.get(path) == sig and self.seen.get(path) != sig}
+            self.last_scan = scan
+            self.seen.update((path, scan[path]) for path in changed)
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, poll=None):
+    if poll is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling every {DEFAULT_POLL}s", file=sys.stderr)
+    return PollingWatcher(root, poll or DEFAULT_POLL)
+
+
+def next_batch(watcher, debounce=DEFAULT_DEBOUNCE):
+    """Block until files change, then collect the burst until `debounce` seconds of quiet."""
+    changed = set()
+    while not changed:
+        changed = watcher.changes(None)
+    first = time.monotonic()
+    while True:
+        wait = min(debounce, MAX_DELAY - (time.monotonic() - first))
+        if wait <= 0:
+            return changed
+        more = watcher.changes(wait)
+        if not more:
+            return changed
+        changed |= more
+
+
+# ----------------------------------------
+# Config and conversion
+# ----------------------------------------
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    config["watch"] = os.path.join(base, config.get("watch", "."))
+    for rule in config.get("rules", ()):
+        for key in ("pattern", "format", "output"):
+            if key not in rule:
+                raise ValueError(f"Rule {rule!r} is missing {key!r}")
+        if rule["format"] not in replay_formats.FORMATS:
+            raise ValueError(f"Rule {rule!r} has an unknown format")
+        rule["output"] = os.path.join(base, rule["output"])
+    return config
+
+
+def match_rule(config, path):
+    """(rule, output path) for a snapshot, or (None, None) when no rule matches."""
+    relative = os.path.relpath(path, config["watch"]).replace(os.sep, "/")
+    for rule in config["rules"]:
+        if fnmatch.fnmatch(relative, rule["pattern"]):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            return rule, rule["output"].format(stem=stem, parent=parent)
+    return None, None
+
+
+class Converter:
+    def __init__(self, config):
+        self.config = config
+        self.hashes = {}   # snapshot -> sha256 of the bytes last converted
+        self.parsers = {}  # snapshot -> IncrementalParser, for the formats that have one
+        self.latencies = []
+        self.stats = {"converted": 0, "unchanged": 0, "failed": 0}
+
+    def convert(self, path, timed=True):
+        rule, output = match_rule(self.config, path)
+        if rule is None:
+            return
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return  # renamed or removed again before the batch was handled
+
+        digest = hashlib.sha256(body).hexdigest()
+        if self.hashes.get(path) == digest:
+            self.stats["unchanged"] += 1
+            return
+
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                data = self.parse(path, rule["format"], body, rule)
+            os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+            save_replay(data, output, ensure_ascii=False, minify=rule.get("minify", False))
+        except (Exception, SystemExit) as e:
+            self.stats["failed"] += 1
+            print(f"[FAIL] {path}: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+
+        self.hashes[path] = digest
+        self.stats["converted"] += 1
+        message = f"convert {time.perf_counter() - start:.2f}s"
+        if timed:
+            latency = time.time() - mtime
+            self.latencies.append(latency)
+            message += f", {latency:.2f}s after write"
+        print(f"[{time.strftime('%H:%M:%S')}] {path} -> {output}: {len(data['teams'])} teams "
+              f"({message})")
+
+    def parse(self, path, fmt, body, metadata):
+        # Successive snapshots of one page mostly repeat rows; the formats
+        # with an incremental parser only reparse the rows that changed
+        if fmt not in PARSERS:
+            return replay_formats.convert(fmt, body, metadata)
+        if path not in self.parsers:
+            self.parsers[path] = IncrementalParser(fmt)
+        return replay_formats.apply_metadata(self.parsers[path].parse_html(body), metadata)
+
+    def convert_stale(self):
+        """Convert every matching snapshot whose output is missing or older."""
+        for path in sorted(walk_files(self.config["watch"])):
+            _, output = match_rule(self.config, path)
+            if output and (not os.path.exists(output)
+                           or os.path.getmtime(output) < os.path.getmtime(path)):
+                self.convert(path, timed=False)
+
+    def summary(self):
+        line = ", ".join(f"{name} {n}" for name, n in self.stats.items())
+        if self.latencies:
+            line += (f"; write-to-output latency median {statistics.median(self.latencies):.2f}s, "
+                     f"max {max(self.latencies):.2f}s")
+        return line
+
+
+def watch(config, poll=None, debounce=None, max_batches=None):
+    """
+    Convert stale snapshots, then every batch of changes until interrupted
+    (or for `max_batches` batches). Returns the Converter.
+    """
+    converter = Converter(config)
+
+    # The watcher comes first, so a snapshot written while the stale ones
+    # are converted is seen as a change
+    watcher = make_watcher(config["watch"], poll)
+    debounce = debounce if debounce is not None else config.get("debounce", DEFAULT_DEBOUNCE)
+    try:
+        converter.convert_stale()
+        print(f"Watching {config['watch']} ({type(watcher).__name__}, debounce {debounce}s)",
+              file=sys.stderr)
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            for path in sorted(next_batch(watcher, debounce)):
+                converter.convert(path)
+            batches += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        print(converter.summary(), file=sys.stderr)
+    return converter
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    poll = None
+    if "--poll" in args:
+        i = args.index("--poll")
+        poll = float(args[i + 1])
+        del args[i:i + 2]
+
+    debounce = None
+    if "--debounce" in args:
+        i = args.index("--debounce")
+        debounce = float(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) != 1:
+        print("Usage: python watch_replay.py <config.json> [--poll SECONDS] [--debounce SECONDS]")
+        sys.exit(1)
+
+    watch(load_config(args[0]), poll, debounce)